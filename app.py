@@ -5,6 +5,7 @@ from src.agents.orchestrator import Orchestrator
 from src.agents.advisor_agent import AdvisorAgent
 from src.agents.cover_letter_agent import CoverLetterAgent
 from src.agents.interview_agent import InterviewAgent
+from src.database.jobs_db import fetch_jobs_by_ids
 from streamlit_mic_recorder import mic_recorder
 import openai
 import hashlib
@@ -157,9 +158,10 @@ def init_agents():
 
 agents = init_agents()
  
-def get_full_job_data(doc, agents):
+def get_full_job_data(doc, job=None):
     """
     Merges data from RAG (Qdrant) and SQL (SQLite) to provide complete job info.
+    `job` is the JobRecord for the document's sql_id, if one was found.
     """
     data = doc.metadata.copy()
     
@@ -173,31 +175,14 @@ def get_full_job_data(doc, agents):
     if 'job_title' in data and 'title' not in data: data['title'] = data['job_title']
     if 'company_name' in data and 'company' not in data: data['company'] = data['company_name']
     
-    # Try to fetch more details from SQL if sql_id exists
     sql_id = data.get('sql_id')
-    if sql_id is not None:
-        try:
-            db = agents["orchestrator"].sql_agent.db
-            sql_query = f"SELECT * FROM jobs_table WHERE id = {sql_id}"
-            res = db.run(sql_query)
-            # res is usually a string representation of list of tuples from langchain SQLDatabase
-            # Example: "[(0, 'Title', 'Company', 'Location', 'Type', None, None)]"
-            import ast
-            res_list = ast.literal_eval(res)
-            if res_list and len(res_list) > 0:
-                row = res_list[0]
-                # Mapping: (id, job_title, company_name, clean_location, work_type, min_salary, max_salary)
-                data['location'] = row[3] if len(row) > 3 else data.get('location')
-                data['type'] = row[4] if len(row) > 4 else data.get('type')
-                
-                min_s = row[5] if len(row) > 5 else None
-                max_s = row[6] if len(row) > 6 else None
-                if min_s or max_s:
-                    data['salary'] = f"{min_s or '?'}-{max_s or '?'}"
-                else:
-                    data['salary'] = data.get('salary', 'Competitive')
-        except Exception as e:
-            print(f"Error fetching SQL data: {e}")
+    if job is not None:
+        data['location'] = job.clean_location or data.get('location')
+        data['type'] = job.work_type or data.get('type')
+        if job.min_salary or job.max_salary:
+            data['salary'] = f"{job.min_salary or '?'}-{job.max_salary or '?'}"
+        else:
+            data['salary'] = data.get('salary', 'Competitive')
             
     # Final normalization
     return {
@@ -210,6 +195,26 @@ def get_full_job_data(doc, agents):
         "sql_id": sql_id
     }
 
+def get_full_jobs_data(docs, agents):
+    """
+    Builds job cards for all retrieved documents, fetching their SQL details in a single query.
+    """
+    jobs = {}
+    sql_ids = [doc.metadata.get('sql_id') for doc in docs]
+    try:
+        jobs = fetch_jobs_by_ids(sql_ids, db_path=agents["orchestrator"].sql_agent.db_path)
+    except Exception as e:
+        print(f"Error fetching SQL data: {e}")
+    
+    cards = []
+    for doc, sql_id in zip(docs, sql_ids):
+        try:
+            job = jobs.get(int(sql_id)) if sql_id is not None else None
+        except (TypeError, ValueError):
+            job = None
+        cards.append(get_full_job_data(doc, job))
+    return cards
+
 # Initialize Session State
 if "track" not in st.session_state:
     st.session_state.track = "🚀 Career Co-Pilot"
@@ -288,7 +293,7 @@ if st.session_state.track == "🚀 Career Co-Pilot":
                         # Retrieve Jobs
                         st.write("Searching for matching opportunities...")
                         job_docs = agents["advisor"].rag_agent.retrieve_documents(search_query, limit=6)
-                        st.session_state.jobs_list = [get_full_job_data(doc, agents) for doc in job_docs]
+                        st.session_state.jobs_list = get_full_jobs_data(job_docs, agents)
                         
                         # Initial Consultation Report
                         st.write("Generating your career roadmap...")
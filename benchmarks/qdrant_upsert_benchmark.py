@@ -0,0 +1,128 @@
+"""
+Benchmark: Qdrant bulk loading across batch sizes and parallelism.
+
+Loads random 1536-d vectors (the size of text-embedding-3-small) into a
+throwaway collection and compares:
+
+  upload_points   notebook style: every PointStruct built in memory, one call
+  bulk loader     QdrantBulkLoader streaming points, wait=False + final barrier
+
+against local mode (QdrantClient(path=...), like data/qdrant_storage) and,
+when --url or QDRANT_URL is given, a Qdrant server.
+
+Usage:
+    python benchmarks/qdrant_upsert_benchmark.py --points 20000
+    python benchmarks/qdrant_upsert_benchmark.py --url http://localhost:6333 --batch-sizes 128 256 512 1024
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from qdrant_client import QdrantClient  # noqa: E402
+from qdrant_client.http import models  # noqa: E402
+
+from src.database.setup_qdrant import is_local_client  # noqa: E402
+from src.ingestion.qdrant_loader import QdrantBulkLoader  # noqa: E402
+
+COLLECTION = "upsert_benchmark"
+DIMS = 1536
+
+
+def reset_collection(client: QdrantClient):
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(
+        collection_name=COLLECTION,
+        vectors_config=models.VectorParams(size=DIMS, distance=models.Distance.COSINE),
+    )
+
+
+def generate_points(count: int, seed: int = 0):
+    """Yields points lazily, like the embedding stage of the ingestion pipeline."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, count, 1000):
+        block = rng.standard_normal((min(1000, count - start), DIMS), dtype=np.float32)
+        for offset, vector in enumerate(block):
+            i = start + offset
+            yield models.PointStruct(id=i, vector=vector.tolist(), payload={"sql_id": i, "title": f"Job {i}"})
+
+
+def measure(label: str, func, count: int, trace_memory: bool):
+    # tracemalloc slows allocation-heavy code down a lot, so memory is only traced on request
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    line = f"  {label:<28} {elapsed:7.2f} s  {count / elapsed:>9,.0f} points/s"
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += f"  peak {peak / 1024 / 1024:7.1f} MB"
+    print(line)
+
+
+def run_suite(name: str, client: QdrantClient, count: int, batch_sizes: list, parallels: list, trace_memory: bool):
+    print(f"\n{name} ({count:,} points)")
+
+    def upload_all():
+        points = list(generate_points(count))
+        client.upload_points(collection_name=COLLECTION, points=points, batch_size=256, wait=True)
+
+    reset_collection(client)
+    measure("upload_points (in memory)", upload_all, count, trace_memory)
+
+    # Local mode always runs with parallel=1
+    effective = sorted({1 if is_local_client(client) else p for p in parallels})
+    for parallel in effective:
+        for batch_size in batch_sizes:
+            reset_collection(client)
+
+            def bulk_load():
+                with QdrantBulkLoader(client, COLLECTION, batch_size=batch_size, parallel=parallel) as loader:
+                    loader.add_many(generate_points(count))
+
+            measure(f"bulk batch={batch_size} par={parallel}", bulk_load, count, trace_memory)
+            assert client.count(COLLECTION, exact=True).count == count
+
+    client.delete_collection(COLLECTION)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[64, 256, 1024])
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--local-path", default=None,
+                        help="Local storage directory (default: a temporary directory, so data/qdrant_storage is untouched)")
+    parser.add_argument("--url", default=os.getenv("QDRANT_URL"), help="Qdrant server URL")
+    parser.add_argument("--trace-memory", action="store_true", help="Also report peak Python memory (slower)")
+    args = parser.parse_args()
+
+    local_path = args.local_path or tempfile.mkdtemp(prefix="qdrant_bench_")
+    try:
+        run_suite(f"local mode ({local_path})", QdrantClient(path=local_path), args.points, args.batch_sizes,
+                  args.parallel, args.trace_memory)
+    finally:
+        if not args.local_path:
+            shutil.rmtree(local_path, ignore_errors=True)
+
+    if args.url:
+        server = QdrantClient(url=args.url, api_key=os.getenv("QDRANT_API_KEY"))
+        run_suite(f"server ({args.url})", server, args.points, args.batch_sizes, args.parallel, args.trace_memory)
+    else:
+        print("\nserver: skipped (pass --url or set QDRANT_URL)")
+
+
+if __name__ == "__main__":
+    main()
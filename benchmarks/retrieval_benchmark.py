@@ -0,0 +1,159 @@
+"""
+Benchmark: latency and recall of vector, lexical (BM25) and hybrid retrieval.
+
+Ingests data/raw/jobs.jsonl into a temporary jobs.db and BM25 index (no
+Qdrant) and runs two query sets against every mode:
+
+  titles    the job title of sampled postings; relevant = every canonical
+            posting with the same normalized title (title_key)
+  skills    single terms that occur in 2-20 postings (tool and skill names,
+            Indonesian role words); relevant = the postings containing them
+
+and reports recall@k and per-query latency. Vector and hybrid need
+OPENAI_API_KEY: the canonical postings are embedded (through the on-disk
+embedding cache, so reruns are free) into an in-memory Qdrant collection, and
+query latency includes the embedding round trip. Without a key only the
+lexical mode runs.
+
+Usage:
+    python benchmarks/retrieval_benchmark.py --queries 100 --k 5
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+from collections import defaultdict
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.database.jobs_db import JOBS_TABLE  # noqa: E402
+from src.ingestion.pipeline import EMBEDDING_MODEL, VECTOR_SIZE, run_pipeline  # noqa: E402
+from src.ingestion.schema import build_page_content  # noqa: E402
+from src.retrieval.bm25 import BM25Index, build_index, tokenize  # noqa: E402
+from src.retrieval.fusion import reciprocal_rank_fusion  # noqa: E402
+
+COLLECTION = "retrieval_benchmark"
+CANDIDATES = 20
+
+
+def canonical_rows(db_path: str) -> list:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(r) for r in conn.execute(
+        f"SELECT id, job_title, title_key, company_name, clean_location, job_description FROM {JOBS_TABLE} "
+        f"WHERE id NOT IN (SELECT alias_id FROM job_aliases) ORDER BY id"
+    )]
+    conn.close()
+    return rows
+
+
+def query_sets(rows: list, count: int, seed: int = 0) -> dict:
+    """{"titles": [(query, relevant ids)], "skills": [...]}."""
+    rng = random.Random(seed)
+    by_title = defaultdict(set)
+    for row in rows:
+        if row["title_key"]:
+            by_title[row["title_key"]].add(row["id"])
+    sampled = rng.sample(rows, min(count, len(rows)))
+    titles = [(row["job_title"], by_title[row["title_key"]]) for row in sampled if row["title_key"]]
+
+    postings = defaultdict(set)
+    for row in rows:
+        for term in set(tokenize(build_page_content(row))):
+            postings[term].add(row["id"])
+    rare = sorted(term for term, ids in postings.items() if 2 <= len(ids) <= 20 and len(term) > 3 and term.isalpha())
+    skills = [(term, postings[term]) for term in rng.sample(rare, min(count, len(rare)))]
+    return {"titles": titles, "skills": skills}
+
+
+def recall_at_k(retrieved: list, relevant: set, k: int) -> float:
+    return len(set(retrieved[:k]) & relevant) / min(k, len(relevant))
+
+
+def build_vector_search(rows: list):
+    """Embeds the postings into an in-memory collection; returns query -> ranked ids, or None without an API key."""
+    if not os.getenv("OPENAI_API_KEY"):
+        return None
+    from langchain_openai import OpenAIEmbeddings
+    from qdrant_client import QdrantClient
+    from qdrant_client.http import models
+    from src.database.embedding_cache import CachedEmbeddings
+
+    embeddings = CachedEmbeddings(OpenAIEmbeddings(model=EMBEDDING_MODEL))
+    client = QdrantClient(":memory:")
+    client.create_collection(COLLECTION, vectors_config=models.VectorParams(size=VECTOR_SIZE, distance=models.Distance.COSINE))
+    vectors = embeddings.embed_documents([build_page_content(row) for row in rows])
+    client.upload_points(COLLECTION, [models.PointStruct(id=row["id"], vector=v) for row, v in zip(rows, vectors)])
+    # Queries go to the API directly: the benchmark measures an uncached round trip
+    query_embeddings = embeddings.embeddings
+
+    def search(query: str, limit: int) -> list:
+        vector = query_embeddings.embed_query(query)
+        return [p.id for p in client.query_points(COLLECTION, query=vector, limit=limit).points]
+
+    return search
+
+
+def run_mode(name: str, search, queries: list, k: int):
+    latencies, recalls = [], []
+    for query, relevant in queries:
+        started = time.perf_counter()
+        retrieved = search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(recall_at_k(retrieved, relevant, k))
+    print(f"  {name:<10} recall@{k} {np.mean(recalls):6.3f}   "
+          f"p50 {np.percentile(latencies, 50):8.2f} ms   p95 {np.percentile(latencies, 95):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=100, help="Queries per query set")
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="retrieval_bench_")
+    try:
+        db_path = os.path.join(workdir, "jobs.db")
+        index_path = os.path.join(workdir, "bm25_index")
+        run_pipeline(db_path=db_path, skip_qdrant=True, full=True, skip_snapshot=True, skip_bm25=True)
+        meta = build_index(db_path, index_path)
+        index = BM25Index(index_path)
+        rows = canonical_rows(db_path)
+        print(f"\n{len(rows):,} canonical postings, {meta['terms']:,} terms, index built in {meta['seconds']:.2f}s")
+
+        vector_search = build_vector_search(rows)
+        if vector_search is None:
+            print("  OPENAI_API_KEY not set: vector and hybrid modes skipped")
+
+        def lexical(query):
+            return [doc_id for doc_id, _ in index.search(query, args.k)]
+
+        def vector(query):
+            return vector_search(query, args.k)
+
+        def hybrid(query):
+            dense = vector_search(query, CANDIDATES)
+            sparse = [doc_id for doc_id, _ in index.search(query, CANDIDATES)]
+            return reciprocal_rank_fusion([dense, sparse], limit=args.k)
+
+        modes = [("lexical", lexical)]
+        if vector_search is not None:
+            modes += [("vector", vector), ("hybrid", hybrid)]
+        for set_name, queries in query_sets(rows, args.queries).items():
+            print(f"\n{set_name} ({len(queries)} queries)")
+            for name, search in modes:
+                run_mode(name, search, queries, args.k)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark: loading processed jobs for analytics (CSV vs. SQLite vs. Parquet).
+
+Ingests data/raw/jobs.jsonl into a temporary jobs.db (no Qdrant), replicates
+its rows up to --rows, and times loading the table into pandas from:
+
+  csv       notebook-style jobs_clean.csv (pd.read_csv)
+  sqlite    pd.read_sql("SELECT * FROM jobs_table")
+  parquet   load_jobs_table / load_jobs_frame on the partitioned snapshot
+            (full table, and the analytics columns only)
+
+Usage:
+    python benchmarks/snapshot_benchmark.py --rows 500000
+"""
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.database.jobs_db import JOBS_TABLE  # noqa: E402
+from src.database.jobs_snapshot import SNAPSHOT_SCHEMA, load_jobs_frame, load_jobs_table  # noqa: E402
+from src.ingestion.parquet_snapshot import write_snapshot  # noqa: E402
+from src.ingestion.pipeline import run_pipeline  # noqa: E402
+from src.ingestion.schema import JOB_COLUMNS  # noqa: E402
+
+ANALYTICS_COLUMNS = ["clean_location", "region", "work_type", "min_salary", "max_salary", "salary_mid"]
+
+
+def timed(label: str, func):
+    started = time.perf_counter()
+    result = func()
+    print(f"  {label:<28} {(time.perf_counter() - started) * 1000:10.1f} ms")
+    return result
+
+
+def replicate(db_path: str, rows: int):
+    """Copies jobs_table onto itself (with fresh ids) until it has at least `rows` rows."""
+    conn = sqlite3.connect(db_path)
+    columns = ", ".join(c for c in JOB_COLUMNS if c != "id")
+    count = conn.execute(f"SELECT COUNT(*) FROM {JOBS_TABLE}").fetchone()[0]
+    while count < rows:
+        conn.execute(f"INSERT INTO {JOBS_TABLE} ({columns}) SELECT {columns} FROM {JOBS_TABLE} LIMIT ?", (rows - count,))
+        count = conn.execute(f"SELECT COUNT(*) FROM {JOBS_TABLE}").fetchone()[0]
+    conn.commit()
+    conn.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="snapshot_bench_")
+    try:
+        db_path = os.path.join(workdir, "jobs.db")
+        snapshot_path = os.path.join(workdir, "jobs_parquet")
+        csv_path = os.path.join(workdir, "jobs_clean.csv")
+
+        run_pipeline(db_path=db_path, skip_qdrant=True, full=True, dedup=False, skip_snapshot=True)
+        rows = replicate(db_path, args.rows)
+        print(f"\n{rows:,} rows")
+
+        conn = sqlite3.connect(db_path)
+        pd.read_sql(f"SELECT * FROM {JOBS_TABLE}", conn).to_csv(csv_path, index=False)
+        write_snapshot(db_path, snapshot_path)
+        size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(snapshot_path) for f in files)
+        print(f"  csv {os.path.getsize(csv_path) / 1e6:.1f} MB, parquet {size / 1e6:.1f} MB\n")
+
+        timed("csv (pd.read_csv)", lambda: pd.read_csv(csv_path))
+        timed("sqlite (pd.read_sql)", lambda: pd.read_sql(f"SELECT * FROM {JOBS_TABLE}", conn))
+        # Passing columns bypasses the per-process cache, so these are real loads
+        all_columns = SNAPSHOT_SCHEMA.names
+        timed("parquet -> arrow", lambda: load_jobs_table(snapshot_path, columns=all_columns))
+        timed("parquet -> pandas", lambda: load_jobs_frame(snapshot_path, columns=all_columns))
+        load_jobs_table(snapshot_path)
+        timed("parquet -> arrow (cached)", lambda: load_jobs_table(snapshot_path))
+        timed("parquet analytics columns", lambda: load_jobs_frame(snapshot_path, columns=ANALYTICS_COLUMNS))
+        conn.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
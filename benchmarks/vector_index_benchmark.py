@@ -0,0 +1,106 @@
+"""
+Benchmark: top-k search on the memory-mapped vector index vs. Qdrant local mode.
+
+Generates clustered random 1536-d vectors (the size of text-embedding-3-small),
+writes them with write_index() and measures per-query latency and recall@k
+(against exhaustive search) of:
+
+  flat            exhaustive dot products over the mapped vectors.npy
+  flat, batched   the same, --batch queries per matrix multiply
+  ivf nprobe=N    inverted-file index, scanning the N nearest clusters
+  qdrant local    QdrantClient(path=...) with the same vectors (--qdrant)
+
+Usage:
+    python benchmarks/vector_index_benchmark.py --points 100000 --qdrant
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.retrieval.vector_index import MmapVectorIndex, write_index  # noqa: E402
+
+DIMS = 1536
+CLUSTERS = 256
+COLLECTION = "vector_index_benchmark"
+
+
+def generate_batches(count: int, seed: int = 0, batch: int = 10_000):
+    """Yields (ids, vectors) around CLUSTERS random centres, like topical job postings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((CLUSTERS, DIMS), dtype=np.float32)
+    for start in range(0, count, batch):
+        size = min(batch, count - start)
+        noise = rng.standard_normal((size, DIMS), dtype=np.float32)
+        yield np.arange(start, start + size), centres[rng.integers(0, CLUSTERS, size)] + 0.8 * noise
+
+
+def timed_queries(label: str, search, queries: np.ndarray, truth: list, k: int):
+    started = time.perf_counter()
+    results = search(queries)
+    per_query = (time.perf_counter() - started) * 1000 / len(queries)
+    recall = np.mean([len({i for i, _ in got} & {i for i, _ in want}) / k for got, want in zip(results, truth)])
+    print(f"  {label:<22} {per_query:8.2f} ms/query   recall@{k} {recall:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=32, help="Queries per matrix multiply in the batched run")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--qdrant", action="store_true", help="Also load the vectors into Qdrant local mode")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="vector_bench_")
+    try:
+        flat_path, ivf_path = os.path.join(workdir, "flat"), os.path.join(workdir, "ivf")
+        write_index(generate_batches(args.points), args.points, flat_path, lists=0)
+        meta = write_index(generate_batches(args.points), args.points, ivf_path, lists=int(np.sqrt(args.points)))
+        flat, ivf = MmapVectorIndex(flat_path), MmapVectorIndex(ivf_path)
+        print(f"\n{args.points:,} vectors x {DIMS} dims ({flat.vectors.nbytes / 1e6:.0f} MB mapped), "
+              f"{meta['lists']} IVF lists built in {meta['seconds']:.1f}s\n")
+
+        rng = np.random.default_rng(1)
+        queries = np.asarray(flat.vectors[rng.integers(0, args.points, args.queries)])
+        queries = queries + 0.3 * rng.standard_normal(queries.shape, dtype=np.float32)
+        truth = flat.search_batch(queries, args.k)
+
+        timed_queries("flat", lambda q: [flat.search(v, args.k) for v in q], queries, truth, args.k)
+        timed_queries(f"flat, batched x{args.batch}", lambda q: [
+            hit for start in range(0, len(q), args.batch) for hit in flat.search_batch(q[start:start + args.batch], args.k)
+        ], queries, truth, args.k)
+        for nprobe in args.nprobe:
+            timed_queries(f"ivf nprobe={nprobe}", lambda q: [ivf.search(v, args.k, nprobe) for v in q],
+                          queries, truth, args.k)
+
+        if args.qdrant:
+            from qdrant_client import QdrantClient
+            from qdrant_client.http import models
+
+            client = QdrantClient(path=os.path.join(workdir, "qdrant"))
+            client.create_collection(COLLECTION, vectors_config=models.VectorParams(size=DIMS, distance=models.Distance.COSINE))
+            for ids, vectors in generate_batches(args.points):
+                client.upload_points(COLLECTION, [
+                    models.PointStruct(id=int(i), vector=v.tolist()) for i, v in zip(ids, vectors)
+                ], wait=True)
+            timed_queries("qdrant local", lambda q: [
+                [(p.id, p.score) for p in client.query_points(COLLECTION, query=v.tolist(), limit=args.k).points]
+                for v in q
+            ], queries, truth, args.k)
+            client.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
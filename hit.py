@@ -7,6 +7,7 @@ import requests
 import json
 import base64
 import os
+import time
 
 BASE_URL = "http://localhost:8000"
 
@@ -78,6 +79,60 @@ def test_chat():
         except Exception as e:
             print_error(f"Failed: {e}\n")
 
+# ==========================================
+# TEST 2b: CHAT STREAM (Server-Sent Events)
+# ==========================================
+def test_chat_stream():
+    print_header("TEST 2b: Chat Stream (SSE)")
+    
+    query = "How many jobs are in the database?"
+    print_info(f"Streaming: {query}")
+    
+    try:
+        start = time.perf_counter()
+        first_token_at = None
+        answer = ""
+        status = None
+        
+        with requests.post(
+            f"{BASE_URL}/chat/stream",
+            json={"message": query},
+            stream=True,
+            timeout=60
+        ) as response:
+            response.raise_for_status()
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or line.startswith(":"):
+                    continue
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data = json.loads(line[len("data:"):])
+                    if event == "content":
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter() - start
+                        answer += data.get("text", "")
+                    elif event == "thought":
+                        print(f"  💭 {data.get('text', '')[:100]}")
+                    elif event == "error":
+                        print_error(f"Stream error: {data.get('detail')}")
+                    elif event == "done":
+                        status = data.get("status")
+                        break
+        
+        total = time.perf_counter() - start
+        if status != "success":
+            print_error(f"Stream ended with status: {status}\n")
+            return
+        print_success("Stream completed")
+        if first_token_at is not None:
+            print_info(f"Time to first token: {first_token_at:.2f}s (total {total:.2f}s)")
+        print(f"  {answer[:200]}...\n")
+        
+    except Exception as e:
+        print_error(f"Failed: {e}\n")
+
 # ==========================================
 # TEST 3: CV ANALYSIS
 # ==========================================
@@ -278,6 +333,7 @@ def run_all_tests():
     
     # Test 2: Chat
     test_chat()
+    test_chat_stream()
     
     # Test 3: CV Analysis
     if components.get('advisor_agent') == 'active':
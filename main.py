@@ -4,15 +4,17 @@ Career AI Agent - FastAPI Application
 
 import os
 import sys
+import json
+import asyncio
 import logging
 import base64
 import tempfile
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
@@ -23,6 +25,8 @@ sys.path.insert(0, os.path.join(current_dir, 'src'))
 
 load_dotenv()
 
+from src.utils.executors import init_pools, run_in_pool, pool_stats, shutdown_pools, PoolSaturatedError
+
 # Setup Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -276,6 +280,9 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("⚠️ InterviewAgent class not available")
     
+    # Per-worker execution pools for blocking agent calls
+    init_pools()
+    
     logger.info("=" * 70)
     logger.info(f"✅ Server READY! Active agents: {len(agents)}")
     logger.info(f"📋 Available: {', '.join(agents.keys())}")
@@ -285,6 +292,7 @@ async def lifespan(app: FastAPI):
     yield
     
     # Cleanup
+    shutdown_pools()
     agents.clear()
     logger.info("🛑 Server shutdown complete")
 
@@ -344,6 +352,24 @@ class InterviewResponse(BaseModel):
     interviewer_response: str
     status: str
 
+# ========================================
+# EXECUTION HELPERS
+# ========================================
+
+async def run_agent_call(pool_name: str, func, *args, **kwargs):
+    """
+    Runs a blocking agent call on its execution pool so the event loop stays free.
+    A saturated pool is reported as 503 so clients can back off and retry.
+    """
+    try:
+        return await run_in_pool(pool_name, func, *args, **kwargs)
+    except PoolSaturatedError as e:
+        logger.warning(f"⚠️ {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server busy ({e.pool_name} queue full). Please retry shortly."
+        )
+
 # ========================================
 # ENDPOINTS
 # ========================================
@@ -365,10 +391,15 @@ async def root():
         "endpoints": {
             "health": "GET /health",
             "chat": "POST /chat",
+            "chat_stream": "POST /chat/stream (Server-Sent Events)",
             "cv_analysis": "POST /cv/analyze",
             "cover_letter": "POST /cover-letter/generate",
             "interview_start": "GET /interview/start",
             "interview_chat": "POST /interview/chat",
+            "executor_metrics": "GET /metrics/executors",
+            "sql_metrics": "GET /metrics/sql",
+            "rag_metrics": "GET /metrics/rag",
+            "job_stats": "GET /stats/summary, /stats/locations, /stats/work-types, /stats/companies, /stats/titles/{title}",
             "docs": "GET /docs",
             "redoc": "GET /redoc"
         },
@@ -406,6 +437,7 @@ async def health_check():
         "status": status_val,
         "details": f"{active_count}/{total_count} components active",
         "components": components,
+        "executors": pool_stats(),
         "timestamp": __import__('datetime').datetime.now().isoformat()
     }
 
@@ -431,7 +463,8 @@ async def chat_endpoint(request: ChatRequest):
         logger.info(f"💬 Chat: {request.message[:80]}...")
         
         # Orchestrator will handle routing
-        response = orchestrator.route_query(request.message)
+        # Native async path: the event loop is only held while awaiting I/O
+        response = await orchestrator.aroute_query(request.message)
         
         return ChatResponse(
             query=request.message,
@@ -439,6 +472,8 @@ async def chat_endpoint(request: ChatRequest):
             status="success"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Chat error: {e}")
         logger.exception("Full traceback:")
@@ -447,6 +482,120 @@ async def chat_endpoint(request: ChatRequest):
             detail=f"Chat processing failed: {str(e)}"
         )
 
+# How often the SSE loop checks for a client disconnect while the agent is busy
+SSE_POLL_SECONDS = float(os.getenv("SSE_POLL_SECONDS", "1.0"))
+# Idle time before a keep-alive comment is sent (keeps proxies from closing the stream)
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+
+def format_sse(event: str, payload) -> str:
+    """Encodes one Server-Sent Event. String payloads are wrapped as {"text": ...}."""
+    data = payload if isinstance(payload, dict) else {"text": payload}
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/chat/stream", tags=["Chat"])
+async def chat_stream_endpoint(request: ChatRequest, http_request: Request):
+    """
+    Streaming chat endpoint - Server-Sent Events
+    
+    Emits the orchestrator's events as they happen:
+    - `thought`: tool usage / SQL / knowledge-base search progress
+    - `content`: answer tokens (`{"text": "..."}`)
+    - `metadata`: latency and token usage, sent once at the end
+    - `error`: the run failed (`{"detail": "..."}`)
+    - `done`: end of stream (`{"status": "success"}`, or `"error"` after an `error` event)
+    
+    The agent run is cancelled as soon as the client disconnects.
+    
+    **Usage Example (Python):**
+    ```python
+    import requests
+    
+    with requests.post(
+        "http://localhost:8000/chat/stream",
+        json={"message": "How many Python jobs are there?"},
+        stream=True
+    ) as r:
+        for line in r.iter_lines(decode_unicode=True):
+            if line:
+                print(line)
+    ```
+    """
+    orchestrator = agents.get("orchestrator")
+    
+    if not orchestrator:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Chat service unavailable. Orchestrator not initialized."
+        )
+    
+    logger.info(f"💬 Chat stream: {request.message[:80]}...")
+    
+    async def event_source():
+        queue = asyncio.Queue(maxsize=256)
+        done_marker = object()
+        
+        async def produce():
+            try:
+                async for event, payload in orchestrator.astream_query(request.message):
+                    await queue.put((event, payload))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Chat stream error: {e}")
+                await queue.put(("error", {"detail": f"Chat processing failed: {str(e)}"}))
+            await queue.put(done_marker)
+        
+        producer = asyncio.create_task(produce())
+        pending_get = None
+        idle = 0.0
+        failed = False
+        try:
+            while True:
+                if pending_get is None:
+                    pending_get = asyncio.ensure_future(queue.get())
+                finished, _ = await asyncio.wait({pending_get}, timeout=SSE_POLL_SECONDS)
+                
+                if not finished:
+                    if await http_request.is_disconnected():
+                        logger.info("🔌 Chat stream client disconnected, cancelling agent run")
+                        break
+                    idle += SSE_POLL_SECONDS
+                    if idle >= SSE_KEEPALIVE_SECONDS:
+                        idle = 0.0
+                        yield ": keep-alive\n\n"
+                    continue
+                
+                item = pending_get.result()
+                pending_get = None
+                idle = 0.0
+                
+                if item is done_marker:
+                    yield format_sse("done", {"status": "error" if failed else "success"})
+                    break
+                
+                event, payload = item
+                failed = failed or event == "error"
+                yield format_sse(event, payload)
+        finally:
+            # Runs on normal completion, on disconnect and when Starlette cancels the response
+            if pending_get is not None:
+                pending_get.cancel()
+            if not producer.done():
+                producer.cancel()
+                with suppress(asyncio.CancelledError):
+                    await producer
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            # Disable response buffering in nginx / Cloud Run front-ends
+            "X-Accel-Buffering": "no",
+        },
+    )
+
 @app.post("/cv/analyze", response_model=CVAnalysisResponse, tags=["CV Analysis"])
 async def analyze_cv(request: CVAnalysisRequest):
     """
@@ -507,7 +656,7 @@ async def analyze_cv(request: CVAnalysisRequest):
         
         try:
             # Analyze using AdvisorAgent
-            recommendation = advisor.analyze_and_recommend(temp_path)
+            recommendation = await run_agent_call("cv", advisor.analyze_and_recommend, temp_path)
             
             return CVAnalysisResponse(
                 analysis=recommendation,
@@ -600,7 +749,9 @@ async def generate_cover_letter(request: CoverLetterRequest):
         
         try:
             # Generate cover letter
-            cover_letter = cover_letter_agent.generate_cover_letter(
+            cover_letter = await run_agent_call(
+                "cover_letter",
+                cover_letter_agent.generate_cover_letter,
                 cv_path=temp_path,
                 job_description=request.job_description
             )
@@ -716,7 +867,9 @@ async def interview_chat(request: InterviewRequest):
         logger.info(f"🎤 Interview: {request.candidate_answer[:50]}...")
         
         # Get interviewer response
-        response = interview_agent.get_response(
+        response = await run_agent_call(
+            "interview",
+            interview_agent.get_response,
             history=request.conversation_history or "",
             user_answer=request.candidate_answer,
             job_description=request.job_description or "General position",
@@ -728,6 +881,8 @@ async def interview_chat(request: InterviewRequest):
             status="success"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Interview error: {e}")
         logger.exception("Full traceback:")
@@ -736,6 +891,76 @@ async def interview_chat(request: InterviewRequest):
             detail=f"Interview processing failed: {str(e)}"
         )
 
+@app.get("/metrics/executors", tags=["Health"])
+async def executor_metrics():
+    """
+    Queue depth, utilisation and wait times of the agent execution pools.
+    
+    Metrics are per worker process (see `pid`); with `--workers 2` each
+    worker reports its own pools.
+    """
+    return pool_stats()
+
+@app.get("/metrics/sql", tags=["Health"])
+async def sql_metrics():
+    """Hit/miss counters of the SQL agent's fast path (per worker process)."""
+    orchestrator = agents.get("orchestrator")
+    if not orchestrator:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Orchestrator not initialized."
+        )
+    return {"pid": os.getpid(), **orchestrator.sql_agent.stats()}
+
+@app.get("/metrics/rag", tags=["Health"])
+async def rag_metrics():
+    """Hit/miss counters of the RAG agent's query-vector and embedding caches (per worker process)."""
+    orchestrator = agents.get("orchestrator")
+    if not orchestrator:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Orchestrator not initialized."
+        )
+    return {"pid": os.getpid(), **orchestrator.rag_agent.stats()}
+
+def _job_stats():
+    from src.database.job_stats import get_job_stats
+    stats = get_job_stats()
+    if not stats.available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Aggregate tables missing. Re-run the ingestion pipeline (python -m src.ingestion.pipeline)."
+        )
+    return stats
+
+@app.get("/stats/summary", tags=["Job Stats"])
+async def stats_summary():
+    """Totals of the job market snapshot (precomputed at ingestion)."""
+    return _job_stats().summary()
+
+@app.get("/stats/locations", tags=["Job Stats"])
+async def stats_locations(limit: int = 20):
+    """Job counts and average salary per location, largest first."""
+    return _job_stats().jobs_by_location(limit)
+
+@app.get("/stats/work-types", tags=["Job Stats"])
+async def stats_work_types():
+    """Job counts and average salary per work type."""
+    return _job_stats().jobs_by_work_type()
+
+@app.get("/stats/companies", tags=["Job Stats"])
+async def stats_companies(limit: int = 20):
+    """Companies with the most postings."""
+    return _job_stats().top_companies(limit)
+
+@app.get("/stats/titles/{title}", tags=["Job Stats"])
+async def stats_title(title: str):
+    """Posting count and monthly salary percentiles for a job title."""
+    row = _job_stats().title_stats(title)
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No postings titled '{title}'.")
+    return row
+
 @app.get("/test", tags=["Testing"])
 async def test_endpoint():
     """Simple test endpoint for debugging"""
@@ -38,12 +38,14 @@ class Orchestrator:
             Tool(
                 name="sql_job_stats",
                 func=self.sql_agent.run,
+                coroutine=self.sql_agent.arun,
                 description="""Use for queries requiring statistical data, numbers, or lists of jobs from the SQL database. 
                 Examples: 'How many Python vacancies are there?', 'Show 5 Data Science jobs'."""
             ),
             Tool(
                 name="rag_career_advice",
                 func=self.rag_agent.run,
+                coroutine=self.rag_agent.arun,
                 description="""Use for descriptive queries about job qualification details, career advice, company information, 
                 or general career knowledge from documents."""
             )
@@ -129,17 +131,87 @@ class Orchestrator:
             logger.error(f"Orchestrator Error: {str(e)}")
             return f"Sorry, there was a technical issue: {str(e)}"
 
+    async def aroute_query(self, user_query: str, chat_history: any = None) -> str:
+        """
+        Async twin of route_query, built on ainvoke.
+        """
+        try:
+            formatted_history = self._convert_history(chat_history)
+            messages = formatted_history + [HumanMessage(content=user_query)]
+                
+            logger.info(f"Master Agent processing async query: {user_query}")
+            
+            response = await self.agent.ainvoke(
+                {"messages": messages},
+                config={"callbacks": [self.langfuse_handler]}
+            )
+            
+            return response["messages"][-1].content
+
+        except Exception as e:
+            logger.error(f"Orchestrator Error: {str(e)}")
+            return f"Sorry, there was a technical issue: {str(e)}"
+
+    def _translate_stream_chunk(self, mode, data, tracker: dict):
+        """
+        Turns one (mode, data) chunk of the multi-mode agent stream into
+        ('thought' | 'content', payload) events. `tracker` carries the active
+        sub-agent and token usage across chunks.
+        """
+        from langchain_core.messages import AIMessage, ToolMessage
+
+        if mode == "updates":
+            for node_name, state in data.items():
+                if state and "messages" in state:
+                    msg = state["messages"][-1]
+                    
+                    # Detect Tool Usage
+                    if isinstance(msg, AIMessage) and msg.tool_calls:
+                        for tc in msg.tool_calls:
+                            yield "thought", f"🛠️ **Using tool:** `{tc['name']}`"
+                    elif isinstance(msg, ToolMessage):
+                        content_snippet = msg.content[:300] + "..." if len(msg.content) > 300 else msg.content
+                        yield "thought", f"✅ **Tool finished.** Output: \n```\n{content_snippet}\n```"
+
+        elif mode == "custom":
+            if isinstance(data, dict):
+                event_type = data.get("type")
+                content = data.get("content")
+                if event_type == "sql_query":
+                    yield "thought", f"🔍 **Generating SQL:**\n```sql\n{content}\n```"
+                elif event_type == "rag_search":
+                    yield "thought", f"📖 **Searching Knowledge Base for:** `{content}`"
+
+        elif mode == "messages":
+            token, metadata = data
+            tags = metadata.get("tags", [])
+            
+            # Update Usage Metadata
+            if hasattr(token, "usage_metadata") and token.usage_metadata:
+                tracker["input_tokens"] = token.usage_metadata.get("input_tokens", tracker["input_tokens"])
+                tracker["output_tokens"] = token.usage_metadata.get("output_tokens", tracker["output_tokens"])
+            
+            # Track which agent is speaking
+            if tags:
+                this_agent = tags[0]
+                if this_agent != tracker["current_agent"] and this_agent in ["sql_agent", "rag_agent"]:
+                    yield "thought", f"🤖 **{this_agent.replace('_', ' ').title()}** starts processing..."
+                    tracker["current_agent"] = this_agent
+                elif "orchestrator" in tags:
+                    tracker["current_agent"] = "orchestrator"
+            if hasattr(token, "content") and token.content:
+                # Output ONLY content tagged with 'orchestrator' to hide internal agent dialogue
+                if tags and "orchestrator" in tags:
+                    yield "content", token.content
+
     def stream_query(self, user_query: str, chat_history: any = None):
         """
         Streaming version of route_query with deep transparency and sub-agent tracking.
         """
         import time
-        from langchain_core.messages import AIMessage, ToolMessage, BaseMessage
         
         start_time = time.perf_counter()
-        total_input_tokens = 0
-        total_output_tokens = 0
-        current_agent = "orchestrator"
+        tracker = {"current_agent": "orchestrator", "input_tokens": 0, "output_tokens": 0}
         
         try:
             formatted_history = self._convert_history(chat_history)
@@ -154,61 +226,55 @@ class Orchestrator:
                 config={"callbacks": [self.langfuse_handler]},
                 subgraphs=True
             ):
-                if mode == "updates":
-                    for node_name, state in data.items():
-                        if "messages" in state:
-                            msg = state["messages"][-1]
-                            
-                            # Detect Tool Usage
-                            if isinstance(msg, AIMessage) and msg.tool_calls:
-                                for tc in msg.tool_calls:
-                                    yield "thought", f"🛠️ **Using tool:** `{tc['name']}`"
-                            elif isinstance(msg, ToolMessage):
-                                content_snippet = msg.content[:300] + "..." if len(msg.content) > 300 else msg.content
-                                yield "thought", f"✅ **Tool finished.** Output: \n```\n{content_snippet}\n```"
-
-                elif mode == "custom":
-                    if isinstance(data, dict):
-                        event_type = data.get("type")
-                        content = data.get("content")
-                        if event_type == "sql_query":
-                            yield "thought", f"🔍 **Generating SQL:**\n```sql\n{content}\n```"
-                        elif event_type == "rag_search":
-                            yield "thought", f"📖 **Searching Knowledge Base for:** `{content}`"
-
-                elif mode == "messages":
-                    token, metadata = data
-                    tags = metadata.get("tags", [])
-                    
-                    # Update Usage Metadata
-                    if hasattr(token, "usage_metadata") and token.usage_metadata:
-                        total_input_tokens = token.usage_metadata.get("input_tokens", total_input_tokens)
-                        total_output_tokens = token.usage_metadata.get("output_tokens", total_output_tokens)
-                    
-                    # Track which agent is speaking
-                    if tags:
-                        this_agent = tags[0]
-                        if this_agent != current_agent and this_agent in ["sql_agent", "rag_agent"]:
-                            yield "thought", f"🤖 **{this_agent.replace('_', ' ').title()}** starts processing..."
-                            current_agent = this_agent
-                        elif "orchestrator" in tags:
-                            current_agent = "orchestrator"
-                    if hasattr(token, "content") and token.content:
-                        # Output ONLY content tagged with 'orchestrator' to hide internal agent dialogue
-                        if tags and "orchestrator" in tags:
-                            yield "content", token.content
+                yield from self._translate_stream_chunk(mode, data, tracker)
 
             # Final Metadata
             yield "metadata", {
                 "latency": time.perf_counter() - start_time,
-                "input_tokens": total_input_tokens,
-                "output_tokens": total_output_tokens
+                "input_tokens": tracker["input_tokens"],
+                "output_tokens": tracker["output_tokens"]
             }
 
         except Exception as e:
             logger.error(f"Orchestrator Deep Stream Error: {str(e)}")
             yield "content", f"Sorry, there was a technical issue during streaming: {str(e)}"
 
+    async def astream_query(self, user_query: str, chat_history: any = None):
+        """
+        Async twin of stream_query, built on astream. Yields the same
+        ('thought' | 'content' | 'metadata', payload) events, but a failed run
+        raises instead of yielding an apology, so callers can report it as an error.
+        """
+        import time
+        
+        start_time = time.perf_counter()
+        tracker = {"current_agent": "orchestrator", "input_tokens": 0, "output_tokens": 0}
+        
+        try:
+            formatted_history = self._convert_history(chat_history)
+            messages = formatted_history + [HumanMessage(content=user_query)]
+            
+            logger.info(f"Master Agent deep streaming async query: {user_query}")
+            
+            async for _, mode, data in self.agent.astream(
+                {"messages": messages},
+                stream_mode=["updates", "messages", "custom"],
+                config={"callbacks": [self.langfuse_handler]},
+                subgraphs=True
+            ):
+                for event in self._translate_stream_chunk(mode, data, tracker):
+                    yield event
+
+            yield "metadata", {
+                "latency": time.perf_counter() - start_time,
+                "input_tokens": tracker["input_tokens"],
+                "output_tokens": tracker["output_tokens"]
+            }
+
+        except Exception as e:
+            logger.error(f"Orchestrator Deep Stream Error: {str(e)}")
+            raise
+
 if __name__ == "__main__":
     orchestrator = Orchestrator()
     # Test simple query
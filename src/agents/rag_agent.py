@@ -3,16 +3,26 @@ import sys
 
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+import asyncio
 import logging
+import threading
 from typing import List, Optional
 from dotenv import load_dotenv
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 
-from src.database.setup_qdrant import get_qdrant_client
+from src.database.setup_qdrant import get_qdrant_client, get_async_qdrant_client
+from src.database.embedding_cache import CachedEmbeddings
+from src.retrieval.bm25 import get_bm25_index
+from src.retrieval.documents import fetch_payloads
+from src.retrieval.filters import JobFilter
+from src.retrieval.fusion import reciprocal_rank_fusion
+from src.retrieval.query_parser import get_query_parser
+from src.retrieval.vector_index import get_vector_index
+from src.utils.cache import LRUCache
 from langfuse.langchain import CallbackHandler
 from langchain.agents import create_agent
 from langchain_core.callbacks import StdOutCallbackHandler
@@ -23,16 +33,52 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+DEFAULT_QUERY_CACHE_SIZE = 1024
+DEFAULT_QUERY_CACHE_TTL = 3600  # seconds
+
+# qdrant: the collection (server, or local storage without QDRANT_URL);
+# mmap: the memory-mapped index of src/retrieval/vector_index.py (no Qdrant at all)
+VECTOR_BACKENDS = ("qdrant", "mmap")
+DEFAULT_VECTOR_BACKEND = "qdrant"
+
+# vector: dense search only; hybrid: dense + BM25 fused by reciprocal rank;
+# lexical: BM25 only (no embedding); auto: lexical for keyword-like queries, else hybrid
+RETRIEVAL_MODES = ("auto", "vector", "hybrid", "lexical")
+DEFAULT_RETRIEVAL_MODE = "auto"
+# Candidates taken from each list before fusion
+MIN_FUSION_CANDIDATES = 20
+
 class RAGAgent:
     def __init__(self, collection_name: str = "job_market"):
         """
-        Initializes the RAG Agent with a Qdrant client, Embedding model, and LLM.
+        Initializes the RAG Agent with a vector backend (Qdrant or the mmap index), Embedding model, and LLM.
         """
         self.collection_name = collection_name
-        self.client = get_qdrant_client()
+        self.vector_backend = os.getenv("VECTOR_BACKEND", DEFAULT_VECTOR_BACKEND).lower()
+        if self.vector_backend not in VECTOR_BACKENDS:
+            logger.warning(f"Unknown VECTOR_BACKEND '{self.vector_backend}', using '{DEFAULT_VECTOR_BACKEND}'")
+            self.vector_backend = DEFAULT_VECTOR_BACKEND
+        # The mmap backend never opens Qdrant, so it takes no local storage lock
+        self.client = get_qdrant_client() if self.vector_backend == "qdrant" else None
+        # Created lazily on first async retrieval (None in local storage mode)
+        self._async_client = None
+        self._async_client_checked = False
         
         api_key = os.getenv("OPENAI_API_KEY")
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key)
+        # Repeated queries are served from the on-disk embedding cache
+        self.embeddings = CachedEmbeddings(OpenAIEmbeddings(model="text-embedding-3-small", api_key=api_key))
+        # In-memory front of that cache: a query re-embedded within one request
+        # (repeated tool calls, the Streamlit landing flow) skips the SQLite lookup too
+        self.query_vectors = LRUCache(
+            max_items=int(os.getenv("RAG_QUERY_CACHE_SIZE", DEFAULT_QUERY_CACHE_SIZE)),
+            ttl=float(os.getenv("RAG_QUERY_CACHE_TTL", DEFAULT_QUERY_CACHE_TTL)),
+        )
+        self.retrieval_mode = os.getenv("RAG_RETRIEVAL_MODE", DEFAULT_RETRIEVAL_MODE).lower()
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            logger.warning(f"Unknown RAG_RETRIEVAL_MODE '{self.retrieval_mode}', using '{DEFAULT_RETRIEVAL_MODE}'")
+            self.retrieval_mode = DEFAULT_RETRIEVAL_MODE
+        self._mode_counts = {mode: 0 for mode in RETRIEVAL_MODES if mode != "auto"}
+        self._mode_lock = threading.Lock()
         self.llm = ChatOpenAI(
             model="gpt-4o-mini", 
             temperature=0, 
@@ -43,10 +89,8 @@ class RAGAgent:
         # Initialize Langfuse CallbackHandler
         self.langfuse_handler = CallbackHandler()
 
-        # Define the search tool for the agent
-        @tool
-        def search_knowledge_base(query: str) -> str:
-            """Searches the career knowledge base for relevant documents and information."""
+        # Define the search tool for the agent (sync + async implementations)
+        def emit_search_event(query: str):
             try:
                 from langgraph.config import get_stream_writer
                 writer = get_stream_writer()
@@ -54,20 +98,55 @@ class RAGAgent:
                     writer({"type": "rag_search", "content": query})
             except Exception:
                 pass
-            
-            docs = self.retrieve_documents(query)
+
+        def format_docs(docs: List[Document]) -> str:
             if not docs:
                 return "No specific data found in the knowledge base."
             return "\n\n".join([doc.page_content for doc in docs])
 
-        self.tools = [search_knowledge_base]
+        def search_knowledge_base(query: str, location: Optional[str] = None, work_type: Optional[str] = None,
+                                  work_arrangement: Optional[str] = None, company: Optional[str] = None,
+                                  min_salary: Optional[float] = None, max_salary: Optional[float] = None,
+                                  posted_within_days: Optional[int] = None) -> str:
+            """Searches the career knowledge base for relevant documents and information."""
+            emit_search_event(query)
+            return format_docs(self.retrieve_documents(
+                query, location=location, work_type=work_type, work_arrangement=work_arrangement, company=company,
+                min_salary=min_salary, max_salary=max_salary, posted_within_days=posted_within_days,
+            ))
+
+        async def asearch_knowledge_base(query: str, location: Optional[str] = None, work_type: Optional[str] = None,
+                                         work_arrangement: Optional[str] = None, company: Optional[str] = None,
+                                         min_salary: Optional[float] = None, max_salary: Optional[float] = None,
+                                         posted_within_days: Optional[int] = None) -> str:
+            """Searches the career knowledge base for relevant documents and information."""
+            emit_search_event(query)
+            return format_docs(await self.aretrieve_documents(
+                query, location=location, work_type=work_type, work_arrangement=work_arrangement, company=company,
+                min_salary=min_salary, max_salary=max_salary, posted_within_days=posted_within_days,
+            ))
+
+        self.tools = [
+            StructuredTool.from_function(
+                func=search_knowledge_base,
+                coroutine=asearch_knowledge_base,
+                name="search_knowledge_base",
+                description=(
+                    "Searches the career knowledge base (job postings) for relevant documents and information. "
+                    "Optional filters narrow the search to matching postings: location (city or province, e.g. "
+                    "'Jakarta'), work_type ('Full time', 'Kontrak/Temporer', 'Paruh waktu', 'Kasual'), "
+                    "work_arrangement ('remote', 'hybrid', 'on-site'), company, min_salary / max_salary "
+                    "(monthly IDR, e.g. 10000000 for 10 jt) and posted_within_days."
+                )
+            )
+        ]
         
         system_prompt = """You are a professional Career Assistant. 
         Your task is to answer user questions using the 'search_knowledge_base' tool.
         
         INSTRUCTIONS:
         1. LANGUAGE: ALWAYS respond in the SAME LANGUAGE as the user's latest query. If retrieved info is in a different language, translate it.
-        2. SMART SEARCH: Use the tool to find relevant data.
+        2. SMART SEARCH: Use the tool to find relevant data. When the user restricts location, work type, remote/hybrid/on-site, company, salary or recency, pass those as the tool's filter arguments instead of only putting them in the query.
         3. FALLBACK: If the tool returns no specific data, provide a high-quality response based on your general career knowledge.
         4. TONE: Maintain a friendly, professional, and encouraging persona.
         
@@ -81,31 +160,253 @@ class RAGAgent:
             system_prompt=system_prompt
         )
 
-    def retrieve_documents(self, query: str, limit: int = 3) -> List[Document]:
+    @staticmethod
+    def _to_documents(points) -> List[Document]:
+        documents = []
+        for hit in points:
+            payload = hit.payload
+            page_content = payload.get("page_content", payload.get("text", payload.get("content", str(payload))))
+            metadata = hit.payload
+            documents.append(Document(page_content=page_content, metadata=metadata))
+        return documents
+
+    @staticmethod
+    def _query_key(query: str) -> str:
+        return " ".join(query.split())
+
+    def embed_query(self, query: str) -> List[float]:
         """
-        Embeds the query and searches the Qdrant collection.
-        Returns a list of LangChain Documents.
+        Query vector from the in-memory LRU, then the on-disk embedding cache,
+        then the embedding API.
+        """
+        key = self._query_key(query)
+        vector = self.query_vectors.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(key)
+            self.query_vectors.put(key, vector)
+        return vector
+
+    async def aembed_query(self, query: str) -> List[float]:
+        key = self._query_key(query)
+        vector = self.query_vectors.get(key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(key)
+            self.query_vectors.put(key, vector)
+        return vector
+
+    def stats(self) -> dict:
+        """Retrievals per mode and hit/miss counters of the query-vector LRU and the on-disk embedding cache."""
+        with self._mode_lock:
+            modes = dict(self._mode_counts)
+        return {
+            "vector_backend": self.vector_backend,
+            "retrieval_mode": self.retrieval_mode,
+            "retrievals": modes,
+            "query_vectors": self.query_vectors.stats(),
+            "embedding_cache": self.embeddings.cache.stats(),
+        }
+
+    def _plan(self, query: str, mode: Optional[str]):
+        """Resolves the retrieval mode for a query; returns (mode, BM25 index or None)."""
+        mode = (mode or self.retrieval_mode).lower()
+        index = get_bm25_index() if mode != "vector" else None
+        if index is None:
+            mode = "vector"  # no BM25 index built yet
+        elif mode == "auto":
+            mode = "lexical" if index.is_keyword_query(query) else "hybrid"
+        with self._mode_lock:
+            self._mode_counts[mode] += 1
+        return mode, index
+
+    @staticmethod
+    def _fusion_candidates(limit: int) -> int:
+        return max(limit * 4, MIN_FUSION_CANDIDATES)
+
+    @staticmethod
+    def _job_documents(hits, score_key: str) -> List[Document]:
+        """Documents for (jobs_table.id, score) hits, with the same payload shape as the Qdrant points."""
+        payloads = fetch_payloads([doc_id for doc_id, _ in hits])
+        documents = []
+        for doc_id, score in hits:
+            payload = payloads.get(doc_id)
+            if payload is None:
+                continue  # deleted since the index was built
+            documents.append(Document(page_content=payload["page_content"],
+                                      metadata={**payload, score_key: round(score, 4)}))
+        return documents
+
+    def _allowed_ids(self, job_filter: JobFilter, mode: str):
+        """
+        Ids of the postings passing the filter, for the searches that cannot
+        evaluate it themselves (BM25, the mmap index); Qdrant filters its payloads.
+        """
+        if not job_filter or (mode == "vector" and self.vector_backend == "qdrant"):
+            return None
+        return job_filter.matching_ids()
+
+    def _qdrant_filter(self, job_filter: JobFilter):
+        """
+        Payload filter for the Qdrant backend. Near-duplicate aliases are not in
+        the collection, so canonical postings with a matching alias pass by id.
+        """
+        if not job_filter or self.vector_backend != "qdrant":
+            return None
+        return job_filter.to_qdrant(canonical_ids=job_filter.alias_canonical_ids())
+
+    def _vector_documents(self, query_vector: List[float], limit: int, query_filter=None,
+                          allowed_ids=None) -> List[Document]:
+        """Dense search on the configured backend."""
+        if self.vector_backend == "mmap":
+            index = get_vector_index()
+            if index is None:
+                raise RuntimeError("VECTOR_BACKEND=mmap but no vector index has been built; run the ingestion pipeline")
+            return self._job_documents(index.search(query_vector, limit, allowed_ids=allowed_ids), "score")
+        return self._to_documents(self.client.query_points(
+            collection_name=self.collection_name,
+            query=query_vector,
+            query_filter=query_filter,
+            limit=limit
+        ).points)
+
+    async def _avector_documents(self, query_vector: List[float], limit: int, query_filter=None,
+                                 allowed_ids=None) -> List[Document]:
+        if self.vector_backend == "qdrant":
+            async_client = self._get_async_client()
+            if async_client is not None:
+                response = await async_client.query_points(
+                    collection_name=self.collection_name,
+                    query=query_vector,
+                    query_filter=query_filter,
+                    limit=limit
+                )
+                return self._to_documents(response.points)
+        # Qdrant local mode and the mmap index are searched in a worker thread
+        return await asyncio.to_thread(self._vector_documents, query_vector, limit, query_filter, allowed_ids)
+
+    def _fuse(self, dense: List[Document], hits, limit: int) -> List[Document]:
+        """Reciprocal-rank fusion of dense results and BM25 hits (both keyed by jobs_table.id)."""
+        by_id = {doc.metadata.get("sql_id"): doc for doc in dense}
+        fused = reciprocal_rank_fusion([list(by_id), [doc_id for doc_id, _ in hits]], limit=limit)
+        scores = dict(hits)
+        lexical = {doc.metadata["sql_id"]: doc for doc in
+                   self._job_documents([(i, scores[i]) for i in fused if i not in by_id], "bm25_score")}
+        return [by_id.get(i) or lexical[i] for i in fused if i in by_id or i in lexical]
+
+    @staticmethod
+    def _understand(query: str, filters: dict, parse_query: bool):
+        """
+        Search text and JobFilter for a query: the explicit filter arguments plus,
+        with parse_query, the constraints the query parser finds in the text
+        (explicit arguments win). Returns (text, job_filter, parsed filters used).
+        """
+        if not parse_query:
+            return query, JobFilter(**filters), False
+        parsed = get_query_parser().parse(query)
+        added = {name: value for name, value in parsed.filters.items() if filters.get(name) is None}
+        return parsed.text, JobFilter(**{**filters, **added}), bool(added)
+
+    def retrieve_documents(self, query: str, limit: int = 3, mode: str = None,
+                           location=None, work_type=None, work_arrangement=None, company=None,
+                           min_salary: float = None, max_salary: float = None,
+                           posted_within_days: float = None, parse_query: bool = True) -> List[Document]:
+        """
+        Searches the knowledge base (mode: see RETRIEVAL_MODES, default
+        RAG_RETRIEVAL_MODE). Returns a list of LangChain Documents.
+        
+        The filter arguments (see src/retrieval/filters.py; location, work type,
+        arrangement and company accept one value or a list) are applied inside
+        the search, so all `limit` results match them. With parse_query,
+        constraints written in the query itself ("remote", "di Jakarta",
+        "di atas 10 jt"; src/retrieval/query_parser.py) become filters too and
+        only the rest of the text is searched; if those parsed filters leave no
+        results, the query is searched without them.
         """
         try:
-            query_vector = self.embeddings.embed_query(query)
-            
-            search_results = self.client.query_points(
-                collection_name=self.collection_name,
-                query=query_vector,
-                limit=limit
-            ).points
-            
-            documents = []
-            for hit in search_results:
-                page_content = hit.payload.get("text", hit.payload.get("content", str(hit.payload)))
-                metadata = hit.payload
-                documents.append(Document(page_content=page_content, metadata=metadata))
-            
+            filters = dict(location=location, work_type=work_type, work_arrangement=work_arrangement,
+                           company=company, min_salary=min_salary, max_salary=max_salary,
+                           posted_within_days=posted_within_days)
+            text, job_filter, parsed = self._understand(query, filters, parse_query)
+            documents = self._search(text, limit, mode, job_filter)
+            if not documents and parsed:
+                logger.info(f"No results with the filters parsed from '{query}', searching without them")
+                documents = self._search(query, limit, mode, JobFilter(**filters))
             return documents
         except Exception as e:
             logger.error(f"Error during retrieval: {e}")
             return []
 
+    def _search(self, query: str, limit: int, mode: Optional[str], job_filter: JobFilter) -> List[Document]:
+        mode, index = self._plan(query, mode)
+        allowed_ids = self._allowed_ids(job_filter, mode)
+        query_filter = self._qdrant_filter(job_filter) if mode != "lexical" else None
+        if mode == "lexical":
+            return self._job_documents(index.search(query, limit, allowed_ids), "bm25_score")
+
+        query_vector = self.embed_query(query)
+        
+        if mode == "hybrid":
+            candidates = self._fusion_candidates(limit)
+            dense = self._vector_documents(query_vector, candidates, query_filter, allowed_ids)
+            return self._fuse(dense, index.search(query, candidates, allowed_ids), limit)
+        return self._vector_documents(query_vector, limit, query_filter, allowed_ids)
+
+    def _get_async_client(self):
+        if not self._async_client_checked:
+            self._async_client = get_async_qdrant_client()
+            self._async_client_checked = True
+        return self._async_client
+
+    async def aretrieve_documents(self, query: str, limit: int = 3, mode: str = None,
+                                  location=None, work_type=None, work_arrangement=None, company=None,
+                                  min_salary: float = None, max_salary: float = None,
+                                  posted_within_days: float = None, parse_query: bool = True) -> List[Document]:
+        """
+        Async twin of retrieve_documents: awaits the embedding call and the vector search.
+        Falls back to a worker thread for Qdrant local mode and the mmap backend.
+        In hybrid mode the BM25 search runs in a thread while the query is embedded.
+        """
+        try:
+            filters = dict(location=location, work_type=work_type, work_arrangement=work_arrangement,
+                           company=company, min_salary=min_salary, max_salary=max_salary,
+                           posted_within_days=posted_within_days)
+            # The parser loads its location vocabulary from jobs.db: keep it off the event loop
+            text, job_filter, parsed = await asyncio.to_thread(self._understand, query, filters, parse_query)
+            documents = await self._asearch(text, limit, mode, job_filter)
+            if not documents and parsed:
+                logger.info(f"No results with the filters parsed from '{query}', searching without them")
+                documents = await self._asearch(query, limit, mode, JobFilter(**filters))
+            return documents
+        except Exception as e:
+            logger.error(f"Error during async retrieval: {e}")
+            return []
+
+    async def _asearch(self, query: str, limit: int, mode: Optional[str], job_filter: JobFilter) -> List[Document]:
+        # The first call loads the BM25 index from disk
+        mode, index = await asyncio.to_thread(self._plan, query, mode)
+        allowed_ids = await asyncio.to_thread(self._allowed_ids, job_filter, mode) if job_filter else None
+        query_filter = (await asyncio.to_thread(self._qdrant_filter, job_filter)
+                        if job_filter and mode != "lexical" else None)
+        if mode == "lexical":
+            return await asyncio.to_thread(
+                lambda: self._job_documents(index.search(query, limit, allowed_ids), "bm25_score")
+            )
+
+        candidates = self._fusion_candidates(limit) if mode == "hybrid" else limit
+        lexical = (asyncio.ensure_future(asyncio.to_thread(index.search, query, candidates, allowed_ids))
+                   if mode == "hybrid" else None)
+        try:
+            query_vector = await self.aembed_query(query)
+            dense = await self._avector_documents(query_vector, candidates, query_filter, allowed_ids)
+        except Exception:
+            if lexical is not None:
+                lexical.cancel()
+            raise
+        
+        if lexical is not None:
+            hits = await lexical
+            return await asyncio.to_thread(self._fuse, dense, hits, limit)
+        return dense
+
     def run(self, query: str) -> str:
         """
         End-to-end RAG run using an Agent to show thinking steps.
@@ -121,6 +422,21 @@ class RAGAgent:
             logger.error(f"Error in RAG Agent: {e}")
             return f"Sorry, there was a technical issue while searching: {str(e)}"
 
+    async def arun(self, query: str) -> str:
+        """
+        Async twin of run, built on ainvoke.
+        """
+        logger.info(f"RAG Agent received async query: {query}")
+        try:
+            response = await self.agent_executor.ainvoke(
+                {"messages": [("user", query)]},
+                config={"callbacks": [self.langfuse_handler]}
+            )
+            return response["messages"][-1].content
+        except Exception as e:
+            logger.error(f"Error in RAG Agent: {e}")
+            return f"Sorry, there was a technical issue while searching: {str(e)}"
+
 if __name__ == "__main__":
     agent = RAGAgent()
     print(agent.run("What are the soft skills for Python developers?"))
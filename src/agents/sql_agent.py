@@ -1,11 +1,43 @@
 from langchain_community.agent_toolkits import create_sql_agent
 from langchain_community.utilities import SQLDatabase
 from langchain_community.agent_toolkits.sql.toolkit import SQLDatabaseToolkit
-from langchain_openai import ChatOpenAI
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
 import os
 import logging
+import asyncio
+import contextvars
 from dotenv import load_dotenv
 
+from src.database.schema_catalog import SchemaCatalog
+from src.database.query_cache import QueryResultCache
+from src.database.jobs_db import create_readonly_engine
+from src.database.job_stats import get_job_stats
+from src.database.sql_guard import SQLGuard
+from src.database.semantic_cache import SemanticSQLCache
+from src.database.embedding_cache import CachedEmbeddings
+from src.retrieval.query_parser import get_query_parser
+from .sql_intents import SQLFastPath
+
+# Introspection tools made redundant by the precomputed schema catalog
+INTROSPECTION_TOOLS = {"sql_db_list_tables", "sql_db_schema"}
+
+# SQL statements that ran successfully during the current agent run (for the semantic cache)
+_executed_queries = contextvars.ContextVar("executed_queries", default=None)
+
+# Used when the semantic cache supplies the SQL: one LLM call to phrase the result
+SEMANTIC_ANSWER_PROMPT = ChatPromptTemplate.from_template(
+    """You answer questions about a database of job postings.
+
+    Question: {question}
+    SQL query that was run: {sql}
+    Query result: {result}
+
+    Answer the question using ONLY the query result above.
+    Respond in the SAME LANGUAGE as the question (Indonesian or English)."""
+)
+
 # Konfigurasi Logging agar kita bisa lihat error di Streamlit Cloud Logs
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,8 +65,25 @@ class SQLAgent:
             raise FileNotFoundError(f"Database not found at {db_path}")
 
         # 4. Koneksi Database
-        db_uri = f"sqlite:///{db_path}"
-        self.db = SQLDatabase.from_uri(db_uri)
+        self.db_path = db_path
+        # Read-only, per-thread pooled connections (mode=ro + query_only: generated SQL cannot write)
+        self.db = SQLDatabase(create_readonly_engine(db_path))
+        
+        # Schema + data dictionary, rebuilt only when jobs.db changes on disk
+        self.catalog = SchemaCatalog(db_path)
+        
+        # Result cache for repeated SQL, dropped automatically when jobs.db is rewritten
+        self.query_cache = QueryResultCache(db_path)
+        
+        # Plan check, time budget and row/byte caps for generated SQL
+        self.sql_guard = SQLGuard(db_path, catalog=self.catalog)
+        
+        # Aggregate tables materialized at ingestion (O(1) stats lookups)
+        self.job_stats = get_job_stats(db_path)
+
+        # Deterministic fast path for common stats questions (no LLM round trips)
+        self.fast_path = SQLFastPath(db_path, catalog=self.catalog, result_cache=self.query_cache,
+                                     job_stats=self.job_stats)
         
         # 5. Initialize LLM & Toolkit
         from langfuse.langchain import CallbackHandler
@@ -56,27 +105,48 @@ class SQLAgent:
         self.tools = []
         for t in original_tools:
             if t.name == "sql_db_query":
-                def create_wrapped_tool(original_tool):
-                    def wrapped_query(query: str, **kwargs):
-                        try:
-                            writer = get_stream_writer()
-                            if writer:
-                                writer({"type": "sql_query", "content": query})
-                        except Exception:
-                            pass # get_stream_writer might fail outside stream context
-                        return original_tool.run(query, **kwargs)
-                    return wrapped_query
+                def emit_query_event(query: str):
+                    try:
+                        writer = get_stream_writer()
+                        if writer:
+                            writer({"type": "sql_query", "content": query})
+                    except Exception:
+                        pass # get_stream_writer might fail outside stream context
+
+                def wrapped_query(query: str, **kwargs):
+                    emit_query_event(query)
+                    return self._execute_sql(query)
+
+                async def awrapped_query(query: str, **kwargs):
+                    emit_query_event(query)
+                    return await self._aexecute_sql(query)
                 
                 new_tool = Tool(
                     name=t.name,
-                    func=create_wrapped_tool(t),
+                    func=wrapped_query,
+                    coroutine=awrapped_query,
                     description=t.description
                 )
                 self.tools.append(new_tool)
-            else:
+            elif t.name not in INTROSPECTION_TOOLS:
                 self.tools.append(t)
         
-        # 7. Define System Prompt
+        # Semantic NL->SQL cache (optional: the agent works without it)
+        self.embeddings = CachedEmbeddings(
+            OpenAIEmbeddings(model="text-embedding-3-small", api_key=os.getenv("OPENAI_API_KEY"))
+        )
+        try:
+            self.semantic_cache = SemanticSQLCache()
+        except Exception as e:
+            logger.warning(f"Semantic SQL cache disabled: {e}")
+            self.semantic_cache = None
+        self.semantic_answer_chain = SEMANTIC_ANSWER_PROMPT | self.llm | StrOutputParser()
+        
+        # 7-8. Build the agent around the current schema catalog
+        self._build_agent()
+
+    def _build_agent(self):
+        """(Re)creates the agent with the schema catalog embedded in its system prompt."""
         system_prompt = """
         You are an agent designed to interact with a SQL database.
         Given an input question, create a syntactically correct {dialect} query to run,
@@ -85,19 +155,28 @@ class SQLAgent:
         query to at most {top_k} results.
 
         You MUST double check your query before executing it. If you get an error while
-        executing a query, rewrite the query and try again.
+        executing a query, rewrite the query and try again. Errors from the query tool
+        are JSON with an "error" code, a "message" and a "hint" on how to rewrite the query
+        (e.g. the query would scan too many rows or exceeded its time budget); follow the hint.
+        Results are capped in size, so prefer COUNT/GROUP BY/LIMIT over returning many rows.
         DO NOT make any DML statements (INSERT, UPDATE, DELETE, DROP etc.).
 
-        To start you should ALWAYS look at the tables in the database to see what you
-        can query. Do NOT skip this step.
-        Then you should query the schema of the most relevant tables.
+        The complete schema and data dictionary of the database is given below and is
+        always up to date, so you do NOT need to list tables or fetch schemas. Use the
+        exact spelling of the listed values when filtering categorical columns
+        (use LIKE for partial matches such as a city name). For keywords or skills in
+        job titles and descriptions, filter through the full-text index (MATCH) instead
+        of LIKE '%...%' on job_description, and use salary_low / salary_high / salary_mid
+        for salary filters and averages.
+        The stats_* tables hold precomputed aggregates (jobs per location, work type,
+        company and normalized title, salary percentiles per title). Prefer them over
+        aggregating jobs_table for whole-market counts, rankings and salary distributions.
         Finally, formulate your answer in the SAME LANGUAGE as the user's original question (Indonesian or English).
         """.format(
             dialect=self.db.dialect,
             top_k=5,
-        )
+        ) + "\n        DATABASE SCHEMA AND DATA DICTIONARY:\n" + self.catalog.text
 
-        # 8. Create Agent using create_agent
         from langchain.agents import create_agent
         self.agent_executor = create_agent(
             model=self.llm,
@@ -105,13 +184,163 @@ class SQLAgent:
             system_prompt=system_prompt
         )
 
+    def _ensure_fresh_schema(self):
+        """Rebuilds the agent prompt when ingestion has rewritten the database."""
+        try:
+            if self.catalog.refresh():
+                logger.info("jobs.db changed on disk, rebuilding SQL agent prompt")
+                self._build_agent()
+        except Exception as e:
+            logger.warning(f"Could not refresh schema catalog: {e}")
+
+    # ---------- SQL execution ----------
+
+    @staticmethod
+    def _is_success(result) -> bool:
+        # The toolkit reports failures as "Error: ..." strings
+        return isinstance(result, str) and not result.startswith("Error")
+
+    def _record_success(self, query: str, result):
+        if self._is_success(result):
+            executed = _executed_queries.get()
+            if executed is not None:
+                executed.append(query)
+
+    def _execute_sql(self, query: str) -> str:
+        """Runs LLM-generated SQL through the result cache and the SQL guard. Errors are never cached."""
+        result = self.query_cache.get(query)
+        if result is None:
+            result = self.sql_guard.run(query)
+            if self._is_success(result):
+                self.query_cache.put(query, result)
+        self._record_success(query, result)
+        return result
+
+    async def _aexecute_sql(self, query: str) -> str:
+        result = self.query_cache.get(query)
+        if result is None:
+            result = await asyncio.to_thread(self.sql_guard.run, query)
+            if self._is_success(result):
+                self.query_cache.put(query, result)
+        self._record_success(query, result)
+        return result
+
+    # ---------- semantic cache ----------
+
+    def _cache_lookup(self, query: str, vector):
+        """Semantic cache lookup; the locations and work types in the question must be in the cached SQL."""
+        filters = get_query_parser(self.db_path).parse(query).filters
+        entities = [value for key in ("location", "work_type", "work_arrangement") for value in filters.get(key, [])]
+        return self.semantic_cache.lookup(query, vector, entities)
+
+    def _semantic_lookup(self, query: str):
+        """Returns (question vector, cache entry or None); (None, None) when the cache is off."""
+        if self.semantic_cache is None:
+            return None, None
+        try:
+            vector = self.embeddings.embed_query(query)
+            return vector, self._cache_lookup(query, vector)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None, None
+
+    async def _asemantic_lookup(self, query: str):
+        if self.semantic_cache is None:
+            return None, None
+        try:
+            vector = await self.embeddings.aembed_query(query)
+            # The lookup parses the question and updates hit counters in SQLite: keep it off the event loop
+            return vector, await asyncio.to_thread(self._cache_lookup, query, vector)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None, None
+
+    def _remember_sql(self, query: str, vector, executed: list):
+        """Stores the last successful statement of an agent run for future paraphrases."""
+        if self.semantic_cache is not None and vector is not None and executed:
+            try:
+                self.semantic_cache.store(query, vector, executed[-1])
+            except Exception as e:
+                logger.warning(f"Could not store semantic cache entry: {e}")
+
+    def _semantic_result(self, entry: dict, result: str):
+        if self._is_success(result):
+            logger.info(f"Semantic SQL cache hit (similarity {entry['similarity']:.3f}) for: {entry['question']}")
+            return True
+        # Stored SQL no longer runs (e.g. schema changed): drop it and use the agent
+        self.semantic_cache.invalidate(entry["id"])
+        return False
+
+    # ---------- entry points ----------
+
+    def stats(self) -> dict:
+        """Hit/miss counters of the fast path and the result, semantic and embedding caches."""
+        return {
+            "fast_path": self.fast_path.stats(),
+            "result_cache": self.query_cache.stats(),
+            "sql_guard": self.sql_guard.stats(),
+            "semantic_cache": self.semantic_cache.stats() if self.semantic_cache else None,
+            "embedding_cache": self.embeddings.cache.stats(),
+        }
+
     def run(self, query: str) -> str:
         """Standard execution (legacy/sync)"""
+        self._ensure_fresh_schema()
+        fast_answer = self.fast_path.try_answer(query)
+        if fast_answer is not None:
+            return fast_answer
         try:
-            response = self.agent_executor.invoke(
-                {"messages": [("user", query)]},
-                config={"callbacks": [self.langfuse_handler]}
-            )
+            vector, entry = self._semantic_lookup(query)
+            if entry is not None:
+                result = self._execute_sql(entry["sql"])
+                if self._semantic_result(entry, result):
+                    return self.semantic_answer_chain.invoke(
+                        {"question": query, "sql": entry["sql"], "result": result},
+                        config={"callbacks": [self.langfuse_handler]}
+                    )
+            
+            executed = []
+            token = _executed_queries.set(executed)
+            try:
+                response = self.agent_executor.invoke(
+                    {"messages": [("user", query)]},
+                    config={"callbacks": [self.langfuse_handler]}
+                )
+            finally:
+                _executed_queries.reset(token)
+            self._remember_sql(query, vector, executed)
+            return response["messages"][-1].content
+        except Exception as e:
+            logger.error(f"Error executing query: {str(e)}")
+            return f"Database error: {str(e)}"
+
+    async def arun(self, query: str) -> str:
+        """Async execution built on ainvoke"""
+        # Both read jobs.db (the fast path is the most frequent answer): keep them off the event loop
+        await asyncio.to_thread(self._ensure_fresh_schema)
+        fast_answer = await asyncio.to_thread(self.fast_path.try_answer, query)
+        if fast_answer is not None:
+            return fast_answer
+        try:
+            vector, entry = await self._asemantic_lookup(query)
+            if entry is not None:
+                result = await self._aexecute_sql(entry["sql"])
+                if await asyncio.to_thread(self._semantic_result, entry, result):
+                    return await self.semantic_answer_chain.ainvoke(
+                        {"question": query, "sql": entry["sql"], "result": result},
+                        config={"callbacks": [self.langfuse_handler]}
+                    )
+            
+            executed = []
+            token = _executed_queries.set(executed)
+            try:
+                response = await self.agent_executor.ainvoke(
+                    {"messages": [("user", query)]},
+                    config={"callbacks": [self.langfuse_handler]}
+                )
+            finally:
+                _executed_queries.reset(token)
+            await asyncio.to_thread(self._remember_sql, query, vector, executed)
             return response["messages"][-1].content
         except Exception as e:
             logger.error(f"Error executing query: {str(e)}")
@@ -0,0 +1,403 @@
+"""
+Deterministic fast path for high-frequency job-statistics questions.
+
+Questions such as "how many python jobs are there", "lowongan di Bandung",
+"top companies hiring" or "salary range for data analyst" are matched locally
+with anchored patterns (English and Indonesian) and answered with one
+parameterized query on jobs_table, skipping the LLM/tool loop entirely.
+Anything that does not match a pattern end-to-end falls back to the agent,
+as do locations that are not a known location name (or a word of one) and
+vague title keywords. Title keywords match whole words through the FTS index.
+
+When the ingestion-built aggregate tables are available (job_stats.JobStats),
+unfiltered or single-filter counts, the top-companies list and salary
+percentiles for a known title are read from them instead of jobs_table.
+"""
+
+import re
+import time
+import logging
+import threading
+from typing import Optional
+
+from src.database.jobs_db import JOBS_TABLE, get_readonly_pool, like_escape
+from src.ingestion.schema import FTS_TABLE
+from src.retrieval.filters import location_keys, normalize_key
+from src.retrieval.query_parser import WORK_TYPE_SYNONYMS
+
+logger = logging.getLogger(__name__)
+
+_JOB_NOUNS = r"(?:jobs?|vacanc(?:y|ies)|positions?|openings?|job postings?|postings?|roles?|job openings?)"
+_ID_JOB_NOUNS = r"(?:lowongan(?: kerja| pekerjaan)?|loker|pekerjaan|posisi)"
+# "di Bandung" after the job noun is the location, never the start of a keyword
+_ID_LOCATION_PREFIX = r"(?:di|yang ada di|untuk wilayah)"
+
+# Filler that does not change the meaning of a stats question
+_NOISE = re.compile(
+    r"\b(?:in the database|in database|in our database|di database|dalam database|"
+    r"right now|currently|at the moment|saat ini|sekarang|available|tersedia|"
+    r"please|tolong|dong|ya)\b"
+)
+
+# Words that signal a constraint the fast path does not understand
+_UNSUPPORTED = re.compile(
+    r"\b(?:and|or|with|without|above|below|over|under|more than|less than|between|remote|hybrid|"
+    r"average|per|vs|versus|compare|skills?|requirements?|"
+    r"dan|atau|dengan|tanpa|di atas|di bawah|lebih|kurang|antara|rata|persyaratan|syarat|keahlian)\b"
+)
+
+# Title keywords too vague to count on: such questions go to the agent
+_STOP_WORDS = {
+    "a", "an", "the", "any", "some", "all", "new", "latest", "recent", "good", "best", "open", "other",
+    "more", "many", "me", "my", "i", "you", "it", "is", "are", "for", "of", "to", "this", "that", "these",
+    "those", "there", "yang", "baru", "terbaru", "ini", "itu", "ada", "saya", "aku", "untuk", "semua",
+    "total", "apa", "saja", "lain",
+}
+_MIN_KEYWORD_CHARS = 2
+
+PATTERNS = [
+    # --- counts ---
+    ("count_jobs", "en", re.compile(
+        rf"^(?:how many|number of|count of|total(?: number of)?)(?: open)? (?:(?P<kw>.+?) )?{_JOB_NOUNS}"
+        rf"(?: (?:are|is))?(?: there)?(?: (?:in|at|for) (?P<loc>.+?))?(?: (?:are|is) there| there are| in total)?$")),
+    ("count_jobs", "id", re.compile(
+        rf"^(?:ada )?(?:berapa|jumlah)(?: banyak| jumlah| total)? {_ID_JOB_NOUNS}(?: (?!{_ID_LOCATION_PREFIX} )(?P<kw>.+?))?"
+        rf"(?: {_ID_LOCATION_PREFIX} (?P<loc>.+?))?(?: yang ada| ada)?$")),
+    # --- listings in a location ---
+    ("jobs_in_location", "en", re.compile(
+        rf"^(?:(?:show|list|find|give)(?: me)?(?: the)?(?: some| all)? |what are(?: the)? |any )?"
+        rf"(?:(?P<kw>.+?) )?{_JOB_NOUNS} (?:in|at|around|near) (?P<loc>.+?)$")),
+    ("jobs_in_location", "id", re.compile(
+        rf"^(?:(?:tampilkan|tunjukkan|cari|carikan|daftar|lihat)(?: saya)? )?{_ID_JOB_NOUNS}(?: (?P<kw>.+?))?"
+        rf" (?:di|daerah|wilayah|sekitar) (?P<loc>.+?)$")),
+    # --- top hiring companies ---
+    ("top_companies", "en", re.compile(
+        r"^(?:(?:what|which) are |show(?: me)? |list )?(?:the )?(?:top|biggest|most active)(?: (?P<n>\d+))? "
+        r"(?:hiring )?(?:companies|employers|recruiters)(?: (?:that are )?hiring(?: the most)?| with the most "
+        rf"{_JOB_NOUNS})?(?: (?:for|in) (?P<target>.+?))?$")),
+    ("top_companies", "en", re.compile(
+        rf"^(?:which|what) compan(?:y|ies) (?:(?:is|are) hiring the most|(?:has|have) the most {_JOB_NOUNS})"
+        r"(?: (?:for|in) (?P<target>.+?))?$")),
+    ("top_companies", "id", re.compile(
+        r"^(?:top(?: (?P<n>\d+))? perusahaan(?: yang paling banyak (?:membuka lowongan|merekrut|mencari karyawan))?|"
+        r"perusahaan (?:apa|mana)(?: saja)? yang paling banyak (?:membuka lowongan|merekrut|mencari karyawan|lowongannya))"
+        r"(?: (?:untuk|di) (?P<target>.+?))?$")),
+    # --- salary range ---
+    ("salary_range", "en", re.compile(
+        r"^(?:what(?: is|'s)? )?(?:the )?salary(?: range)? (?:for|of) (?:an? )?(?P<kw>.+?)"
+        rf"(?: {_JOB_NOUNS})?(?: (?:in|at) (?P<loc>.+?))?$")),
+    ("salary_range", "en", re.compile(
+        r"^how much (?:does|do|can)(?: an?)? (?P<kw>.+?) (?:earn|make|get paid)(?: (?:in|at) (?P<loc>.+?))?$")),
+    ("salary_range", "id", re.compile(
+        r"^(?:berapa )?(?:kisaran |range |rentang )?gaji(?: untuk| seorang| posisi| lowongan)? (?P<kw>.+?)"
+        r"(?: di (?P<loc>.+?))?$")),
+]
+
+
+def _normalize(question: str) -> str:
+    text = question.lower().strip()
+    text = re.sub(r"[?!.,;:\"]+", " ", text)
+    text = _NOISE.sub(" ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _format_idr(value) -> str:
+    return "Rp " + f"{int(value):,}".replace(",", ".")
+
+
+def _plural(count: int, noun: str) -> str:
+    return noun if count == 1 else noun + "s"
+
+
+def _keyword_tokens(keyword: str) -> Optional[list]:
+    """Words of a title keyword, or None when it is too short or vague to match on."""
+    tokens = re.findall(r"\w+", keyword)
+    if not tokens or any(len(t) < _MIN_KEYWORD_CHARS or t in _STOP_WORDS for t in tokens):
+        return None
+    return tokens
+
+
+class SQLFastPath:
+    """
+    Local intent matcher that answers common stats questions with a single
+    parameterized query. try_answer() returns None on a miss.
+    """
+
+    def __init__(self, db_path: str, catalog=None, result_cache=None, list_limit: int = 5, job_stats=None):
+        self.db_path = db_path
+        self.pool = get_readonly_pool(db_path)
+        self.job_stats = job_stats
+        self.catalog = catalog
+        self.result_cache = result_cache
+        self.list_limit = list_limit
+        self._locations = None
+        self._locations_version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.intent_hits = {}
+
+    # ---------- vocabulary ----------
+
+    @staticmethod
+    def _location_keys(values) -> set:
+        """Whole location names and their word sequences ("jakarta", "jakarta selatan", "selatan")."""
+        return {key for value in values if value for key in location_keys(value, None)}
+
+    def _known_locations(self) -> set:
+        if self.catalog is not None:
+            # Reuse the schema catalog's vocabulary; it is rebuilt when jobs.db changes
+            if self._locations is None or self._locations_version is not self.catalog.tables:
+                self._locations = self._location_keys(self.catalog.distinct_values(JOBS_TABLE, "clean_location"))
+                self._locations_version = self.catalog.tables
+            return self._locations
+        if self._locations is None:
+            rows = self.pool.execute(
+                f"SELECT DISTINCT clean_location FROM {JOBS_TABLE} WHERE clean_location IS NOT NULL"
+            )
+            self._locations = self._location_keys(r[0] for r in rows)
+        return self._locations
+
+    def _is_location(self, phrase: str) -> bool:
+        return normalize_key(phrase) in self._known_locations()
+
+    @staticmethod
+    def _extract_work_type(keyword: str):
+        """Splits a work-type phrase (e.g. 'full time') out of the keyword."""
+        if not keyword:
+            return keyword, None
+        for canonical, phrases in WORK_TYPE_SYNONYMS.items():
+            for phrase in phrases:
+                if re.search(rf"\b{re.escape(phrase)}\b", keyword):
+                    rest = re.sub(rf"\b{re.escape(phrase)}\b", " ", keyword)
+                    return re.sub(r"\s+", " ", rest).strip() or None, canonical
+        return keyword, None
+
+    # ---------- matching ----------
+
+    def match(self, question: str) -> Optional[dict]:
+        """
+        Returns {"intent", "lang", "keyword", "location", "work_type", "limit"} or None.
+        """
+        text = _normalize(question)
+        if not text or _UNSUPPORTED.search(text):
+            return None
+
+        for intent, lang, pattern in PATTERNS:
+            m = pattern.match(text)
+            if not m:
+                continue
+            groups = m.groupdict()
+            keyword = (groups.get("kw") or "").strip() or None
+            location = (groups.get("loc") or "").strip() or None
+            target = (groups.get("target") or "").strip() or None
+
+            # "for X" / "in X" on company questions: location if we know it, otherwise a title keyword
+            if target:
+                if self._is_location(target):
+                    location = target
+                else:
+                    keyword = target
+
+            if keyword in ("all", "the", "semua", "total"):
+                keyword = None
+            keyword, work_type = self._extract_work_type(keyword)
+            if keyword:
+                keyword = re.sub(r"^(?:the|a|an|all)\s+", "", keyword)
+                if _keyword_tokens(keyword) is None:
+                    return None
+
+            # Only answer when the location is one we actually have
+            if location and not self._is_location(location):
+                return None
+            if intent == "salary_range" and not keyword:
+                return None
+
+            limit = int(groups["n"]) if groups.get("n") else self.list_limit
+            return {
+                "intent": intent,
+                "lang": lang,
+                "keyword": keyword,
+                "location": location,
+                "work_type": work_type,
+                "limit": max(1, min(limit, 50)),
+            }
+        return None
+
+    # ---------- execution ----------
+
+    @staticmethod
+    def _where(match: dict):
+        clauses, params = [], []
+        if match["keyword"]:
+            # Phrase query on the title column of the FTS index: whole words only
+            clauses.append(f"id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?)")
+            params.append(f'job_title : "{" ".join(_keyword_tokens(match["keyword"]))}"')
+        if match["location"]:
+            clauses.append("' ' || LOWER(clean_location) || ' ' LIKE ? ESCAPE '\\'")
+            params.append(f"% {like_escape(match['location'])} %")
+        if match["work_type"]:
+            clauses.append("work_type = ?")
+            params.append(match["work_type"])
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _describe(self, match: dict) -> str:
+        parts = []
+        if match["work_type"]:
+            parts.append(match["work_type"])
+        if match["keyword"]:
+            parts.append(f"'{match['keyword']}'")
+        return " ".join(parts)
+
+    def _fetch(self, sql: str, params: list) -> list:
+        """Runs a read-only query (through the result cache when available) and returns dict rows."""
+        def run():
+            return [dict(r) for r in self.pool.execute(sql, params)]
+
+        if self.result_cache is None:
+            return run()
+        return self.result_cache.get_or_run(sql, run, params=tuple(params))
+
+    def _count(self, match: dict, where: str, params: list) -> int:
+        count = None
+        if self.job_stats is not None and not match["keyword"]:
+            count = self.job_stats.count_jobs(location=match["location"], work_type=match["work_type"])
+        if count is None:
+            count = self._fetch(f"SELECT COUNT(*) AS n FROM {JOBS_TABLE}{where}", params)[0]["n"]
+        return count
+
+    def _title_salary(self, match: dict, en: bool) -> Optional[str]:
+        """
+        Salary percentiles of an exactly known title from the aggregate tables.
+        Unlike the LIKE fallback this excludes related titles ("Senior Data Analyst"),
+        so the answer states its scope.
+        """
+        if self.job_stats is None or match["location"] or match["work_type"]:
+            return None
+        row = self.job_stats.title_stats(match["keyword"])
+        if not row or not row["with_salary"]:
+            return None
+        if en:
+            return (f"Salary for postings titled exactly '{row['job_title']}' (related titles not included): "
+                    f"{_format_idr(row['salary_min'])} – {_format_idr(row['salary_max'])} "
+                    f"per month (median {_format_idr(row['salary_median'])}, middle half "
+                    f"{_format_idr(row['salary_p25'])} – {_format_idr(row['salary_p75'])}, "
+                    f"based on {row['with_salary']} of {row['jobs']} {_plural(row['jobs'], 'posting')} "
+                    f"with salary information).")
+        return (f"Gaji untuk lowongan dengan judul persis '{row['job_title']}' (judul terkait tidak termasuk): "
+                f"{_format_idr(row['salary_min'])} – {_format_idr(row['salary_max'])} "
+                f"per bulan (median {_format_idr(row['salary_median'])}, separuh tengah "
+                f"{_format_idr(row['salary_p25'])} – {_format_idr(row['salary_p75'])}, "
+                f"berdasarkan {row['with_salary']} dari {row['jobs']} lowongan yang mencantumkan gaji).")
+
+    def _run_intent(self, match: dict) -> str:
+        where, params = self._where(match)
+        en = match["lang"] == "en"
+        what = self._describe(match)
+        loc = match["location"].title() if match["location"] else None
+
+        if match["intent"] == "count_jobs":
+            count = self._count(match, where, params)
+            if en:
+                return (f"There {'is' if count == 1 else 'are'} {count} {what + ' ' if what else ''}"
+                        f"{_plural(count, 'job posting')}{f' in {loc}' if loc else ''} in the database.")
+            return f"Terdapat {count} lowongan {what + ' ' if what else ''}{f'di {loc} ' if loc else ''}di database."
+
+        if match["intent"] == "jobs_in_location":
+            total = self._count(match, where, params)
+            rows = self._fetch(
+                f"SELECT job_title, company_name, clean_location, work_type FROM {JOBS_TABLE}{where} LIMIT ?",
+                params + [match["limit"]],
+            )
+            if not rows:
+                return (f"No {what + ' ' if what else ''}job postings found in {loc}." if en
+                        else f"Tidak ada lowongan {what + ' ' if what else ''}di {loc}.")
+            lines = [f"- {r['job_title']} — {r['company_name']} ({r['clean_location']}, {r['work_type']})" for r in rows]
+            header = (f"Found {total} {what + ' ' if what else ''}{_plural(total, 'job posting')} in {loc}. "
+                      f"Showing {len(rows)}:" if en
+                      else f"Ditemukan {total} lowongan {what + ' ' if what else ''}di {loc}. Menampilkan {len(rows)}:")
+            return "\n".join([header] + lines)
+
+        if match["intent"] == "top_companies":
+            rows = None
+            if self.job_stats is not None and not where:
+                rows = [{"company_name": r["company_name"], "n": r["jobs"]}
+                        for r in self.job_stats.top_companies(match["limit"])] or None
+            if rows is None:
+                rows = self._fetch(
+                    f"SELECT company_name, COUNT(*) AS n FROM {JOBS_TABLE}{where} "
+                    f"GROUP BY company_name ORDER BY n DESC, company_name LIMIT ?",
+                    params + [match["limit"]],
+                )
+            if not rows:
+                return "No matching job postings found." if en else "Tidak ada lowongan yang cocok."
+            lines = [f"{i}. {r['company_name']} — {r['n']} {_plural(r['n'], 'opening') if en else 'lowongan'}"
+                     for i, r in enumerate(rows, 1)]
+            scope = " ".join(filter(None, [what, f"in {loc}" if en and loc else (f"di {loc}" if loc else "")]))
+            header = (f"Top hiring companies{f' ({scope})' if scope else ''}:" if en
+                      else f"Perusahaan dengan lowongan terbanyak{f' ({scope})' if scope else ''}:")
+            return "\n".join([header] + lines)
+
+        if match["intent"] == "salary_range":
+            answer = self._title_salary(match, en)
+            if answer:
+                return answer
+            salary_where = where + (" AND " if where else " WHERE ") + "(min_salary IS NOT NULL OR max_salary IS NOT NULL)"
+            row = self._fetch(
+                f"SELECT COUNT(*) AS n, MIN(COALESCE(min_salary, max_salary)) AS lo, "
+                f"MAX(COALESCE(max_salary, min_salary)) AS hi, "
+                f"AVG((COALESCE(min_salary, max_salary) + COALESCE(max_salary, min_salary)) / 2.0) AS mid "
+                f"FROM {JOBS_TABLE}{salary_where}",
+                params,
+            )[0]
+            if not row["n"]:
+                return (f"No salary information is available for {what}{f' in {loc}' if loc else ''}." if en
+                        else f"Belum ada informasi gaji untuk {what}{f' di {loc}' if loc else ''}.")
+            if en:
+                return (f"Salary range for {what}{f' in {loc}' if loc else ''}: {_format_idr(row['lo'])} – "
+                        f"{_format_idr(row['hi'])} per month (midpoint average {_format_idr(row['mid'])}, "
+                        f"based on {row['n']} {_plural(row['n'], 'posting')} with salary information).")
+            return (f"Kisaran gaji untuk {what}{f' di {loc}' if loc else ''}: {_format_idr(row['lo'])} – "
+                    f"{_format_idr(row['hi'])} per bulan (rata-rata nilai tengah {_format_idr(row['mid'])}, "
+                    f"dari {row['n']} lowongan yang mencantumkan gaji).")
+
+        raise ValueError(f"Unknown intent {match['intent']}")
+
+    def try_answer(self, question: str) -> Optional[str]:
+        """
+        Answers the question directly if it matches a known shape, otherwise returns None.
+        """
+        start = time.perf_counter()
+        try:
+            match = self.match(question)
+            if match is None:
+                self._record(None)
+                return None
+            answer = self._run_intent(match)
+        except Exception as e:
+            logger.warning(f"SQL fast path failed, falling back to agent: {e}")
+            self._record(None)
+            return None
+
+        self._record(match["intent"])
+        logger.info(f"SQL fast path hit ({match['intent']}) in {1000 * (time.perf_counter() - start):.1f} ms")
+        return answer
+
+    def _record(self, intent: Optional[str]):
+        with self._lock:
+            if intent is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.intent_hits[intent] = self.intent_hits.get(intent, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "intent_hits": dict(self.intent_hits),
+            }
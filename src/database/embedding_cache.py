@@ -0,0 +1,217 @@
+"""
+Persistent embedding cache shared by ingestion and RAG queries.
+
+Vectors are stored as float32 blobs in a SQLite file keyed by
+(model, dimensions, sha256(text)), so re-ingesting unchanged postings and
+repeated user queries never call the embedding API again. The file is
+bounded by EMBEDDING_CACHE_MAX_MB; when it grows past the budget the least
+recently used vectors are evicted.
+
+CachedEmbeddings wraps any LangChain Embeddings object with the cache and
+can be used wherever OpenAIEmbeddings was used before.
+"""
+
+import os
+import asyncio
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.database.jobs_db import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "embedding_cache.db")
+DEFAULT_MAX_MB = 512
+
+# last_used is refreshed at most this often per entry, so reads rarely write
+_TOUCH_INTERVAL = 3600
+_MAX_PARAMS = 900
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed (model, dims, sha256) -> float32 vector store with LRU eviction by size.
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = None):
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.max_bytes = max_bytes or int(os.getenv("EMBEDDING_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embedding_cache (
+                model TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                text_hash BLOB NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, dims, text_hash)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used ON embedding_cache (last_used)")
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embedding_cache").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, model: str, dims: int, texts: List[str]) -> List[Optional[List[float]]]:
+        """Returns one vector (or None on a miss) per text, in order."""
+        digests = [text_digest(t) for t in texts]
+        found = {}
+        now = time.time()
+        with self._lock:
+            stale = []
+            unique = list(dict.fromkeys(digests))
+            for start in range(0, len(unique), _MAX_PARAMS):
+                chunk = unique[start:start + _MAX_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                for digest, blob, last_used in self._conn.execute(
+                    f"SELECT text_hash, vector, last_used FROM embedding_cache "
+                    f"WHERE model = ? AND dims = ? AND text_hash IN ({placeholders})",
+                    [model, dims, *chunk],
+                ):
+                    found[digest] = np.frombuffer(blob, dtype=np.float32).tolist()
+                    if now - last_used > _TOUCH_INTERVAL:
+                        stale.append((now, model, dims, digest))
+            if stale:
+                self._conn.executemany(
+                    "UPDATE embedding_cache SET last_used = ? WHERE model = ? AND dims = ? AND text_hash = ?", stale
+                )
+                self._conn.commit()
+            hits = sum(1 for d in digests if d in found)
+            self.hits += hits
+            self.misses += len(digests) - hits
+        return [found.get(d) for d in digests]
+
+    def put_many(self, model: str, dims: int, texts: List[str], vectors: List[List[float]]):
+        now = time.time()
+        rows = [
+            (model, dims, text_digest(t), np.asarray(v, dtype=np.float32).tobytes(), now)
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embedding_cache VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+            self._bytes += sum(len(r[3]) for r in rows)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Recount (INSERT OR REPLACE may have overwritten entries) and trim to 90% of the budget
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embedding_cache").fetchone()[0]
+        target = int(self.max_bytes * 0.9)
+        while self._bytes > target:
+            rows = self._conn.execute(
+                "SELECT model, dims, text_hash, LENGTH(vector) FROM embedding_cache ORDER BY last_used LIMIT 500"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for model, dims, digest, size in rows:
+                victims.append((model, dims, digest))
+                self._bytes -= size
+                if self._bytes <= target:
+                    break
+            self._conn.executemany(
+                "DELETE FROM embedding_cache WHERE model = ? AND dims = ? AND text_hash = ?", victims
+            )
+            self.evictions += len(victims)
+        self._conn.commit()
+        logger.info(f"Embedding cache trimmed to {self._bytes / 1024 / 1024:.1f} MB")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache instance (one SQLite connection per process)."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = EmbeddingCache()
+        return _shared_cache
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain Embeddings wrapper that serves repeated texts from EmbeddingCache.
+    Only cache misses reach the wrapped model, in one batched call.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache = None, model: str = None, dims: int = None):
+        self.embeddings = embeddings
+        self.cache = cache or get_embedding_cache()
+        self.model = model or getattr(embeddings, "model", type(embeddings).__name__)
+        # 0 = the model's native size (OpenAIEmbeddings(dimensions=None))
+        self.dims = dims if dims is not None else (getattr(embeddings, "dimensions", None) or 0)
+
+    def _split(self, texts: List[str]):
+        vectors = self.cache.get_many(self.model, self.dims, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        return vectors, missing
+
+    def _merge(self, texts, vectors, missing, computed) -> List[List[float]]:
+        if missing:
+            self.cache.put_many(self.model, self.dims, missing, computed)
+            by_text = dict(zip(missing, computed))
+            vectors = [v if v is not None else by_text[t] for t, v in zip(texts, vectors)]
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing = self._split(texts)
+        computed = self.embeddings.embed_documents(missing) if missing else []
+        return self._merge(texts, vectors, missing, computed)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get_many(self.model, self.dims, [text])[0]
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put_many(self.model, self.dims, [text], [vector])
+        return vector
+
+    # The async twins run the SQLite reads and writes in a worker thread;
+    # only the embedding API call is awaited on the event loop
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors, missing = await asyncio.to_thread(self._split, texts)
+        computed = await self.embeddings.aembed_documents(missing) if missing else []
+        return await asyncio.to_thread(self._merge, texts, vectors, missing, computed)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        vector = (await asyncio.to_thread(self.cache.get_many, self.model, self.dims, [text]))[0]
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await asyncio.to_thread(self.cache.put_many, self.model, self.dims, [text], [vector])
+        return vector
@@ -0,0 +1,135 @@
+"""
+Read API for the precomputed job-market statistics in jobs.db.
+
+Ingestion (src/ingestion/aggregates.py) materializes counts by location, work
+type, company and normalized title plus salary percentiles per title into
+small stats_* tables. Every method here is a primary-key or LIMIT lookup on
+those tables, so the cost does not grow with the number of postings.
+
+Databases built before the tables existed have none of them: available() is
+False and the lookups return None / [], so callers can fall back to querying
+jobs_table.
+"""
+
+import re
+import threading
+from typing import Optional
+
+from src.database.jobs_db import get_readonly_pool, db_version, like_escape, resolve_db_path
+
+STATS_SUMMARY_TABLE = "stats_summary"
+STATS_LOCATION_TABLE = "stats_by_location"
+STATS_WORK_TYPE_TABLE = "stats_by_work_type"
+STATS_COMPANY_TABLE = "stats_by_company"
+STATS_TITLE_TABLE = "stats_by_title"
+
+STATS_TABLES = [
+    STATS_SUMMARY_TABLE,
+    STATS_LOCATION_TABLE,
+    STATS_WORK_TYPE_TABLE,
+    STATS_COMPANY_TABLE,
+    STATS_TITLE_TABLE,
+]
+
+_BRACKETS = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_NON_WORD = re.compile(r"[^\w+#&]+")
+
+
+def title_key(title) -> Optional[str]:
+    """
+    Normalized job title used to group postings: "GRAPHIC DESIGNER (Remote)"
+    and "Graphic Designer" both become "graphic designer".
+    """
+    if title is None or title != title:
+        return None
+    text = _NON_WORD.sub(" ", _BRACKETS.sub(" ", str(title).lower()))
+    return " ".join(text.split()) or None
+
+
+class JobStats:
+    """
+    Lookups on the stats_* tables of one database.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = resolve_db_path(db_path)
+        self.pool = get_readonly_pool(self.db_path)
+        self._available = None
+        self._version = None
+
+    def available(self) -> bool:
+        """True when the database has the aggregate tables (re-checked when the file changes)."""
+        version = db_version(self.db_path)
+        if self._available is None or version != self._version:
+            names = {r[0] for r in self.pool.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            self._available = set(STATS_TABLES) <= names
+            self._version = version
+        return self._available
+
+    def _rows(self, sql: str, params=()) -> list:
+        if not self.available():
+            return []
+        return [dict(r) for r in self.pool.execute(sql, params)]
+
+    def summary(self) -> Optional[dict]:
+        """{"total_jobs", "with_salary", "companies", "locations", "titles", "built_at"}."""
+        rows = self._rows(f"SELECT * FROM {STATS_SUMMARY_TABLE}")
+        return rows[0] if rows else None
+
+    def jobs_by_location(self, limit: int = None) -> list:
+        return self._rows(
+            f"SELECT * FROM {STATS_LOCATION_TABLE} ORDER BY jobs DESC, clean_location LIMIT ?", (limit or -1,)
+        )
+
+    def jobs_by_work_type(self) -> list:
+        return self._rows(f"SELECT * FROM {STATS_WORK_TYPE_TABLE} ORDER BY jobs DESC")
+
+    def top_companies(self, limit: int = 10) -> list:
+        return self._rows(f"SELECT * FROM {STATS_COMPANY_TABLE} ORDER BY jobs DESC, company_name LIMIT ?", (limit,))
+
+    def top_titles(self, limit: int = 10) -> list:
+        return self._rows(f"SELECT * FROM {STATS_TITLE_TABLE} ORDER BY jobs DESC, title_key LIMIT ?", (limit,))
+
+    def count_jobs(self, location: str = None, work_type: str = None) -> Optional[int]:
+        """
+        Number of postings, optionally in locations containing `location` as
+        whole words (case-insensitive, like the fast path's filter) or of one
+        work type. Returns None for combinations that are not materialized.
+        """
+        if not self.available() or (location and work_type):
+            return None
+        if location:
+            sql, params = (f"SELECT COALESCE(SUM(jobs), 0) AS n FROM {STATS_LOCATION_TABLE} "
+                           f"WHERE ' ' || LOWER(clean_location) || ' ' LIKE ? ESCAPE '\\'",
+                           (f"% {like_escape(location.lower())} %",))
+        elif work_type:
+            sql, params = f"SELECT COALESCE(SUM(jobs), 0) AS n FROM {STATS_WORK_TYPE_TABLE} WHERE work_type = ?", (work_type,)
+        else:
+            sql, params = f"SELECT total_jobs AS n FROM {STATS_SUMMARY_TABLE}", ()
+        rows = self._rows(sql, params)
+        return rows[0]["n"] if rows else None
+
+    def title_stats(self, title: str) -> Optional[dict]:
+        """
+        Counts and salary percentiles (monthly IDR, over salary_mid) for a job
+        title, matched on its normalized form. None when the title is unknown.
+        """
+        key = title_key(title)
+        if not key:
+            return None
+        rows = self._rows(f"SELECT * FROM {STATS_TITLE_TABLE} WHERE title_key = ?", (key,))
+        return rows[0] if rows else None
+
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def get_job_stats(db_path: str = None) -> JobStats:
+    """Process-wide JobStats per database file."""
+    path = resolve_db_path(db_path)
+    with _shared_lock:
+        stats = _shared.get(path)
+        if stats is None:
+            stats = _shared[path] = JobStats(path)
+        return stats
@@ -0,0 +1,222 @@
+"""
+Read access helpers for the processed jobs database (data/processed/jobs.db).
+
+Every reader (SQL agent, fast path, schema catalog, dashboard) goes through
+read-only connections: opened with mode=ro, locked down with query_only, and
+tuned with memory-mapped I/O and a larger page cache. ReadOnlyPool keeps one
+such connection per thread so concurrent requests do not serialize on a
+single handle.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_DB_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "jobs.db")
+
+JOBS_TABLE = "jobs_table"
+
+# SQLite's default limit on bound parameters per statement is 999
+_MAX_PARAMS = 900
+
+# Read-side tuning (override with SQLITE_MMAP_MB / SQLITE_CACHE_MB)
+DEFAULT_MMAP_MB = 256
+DEFAULT_CACHE_MB = 64
+
+
+def resolve_db_path(db_path: str = None) -> str:
+    """
+    Returns the absolute path of the jobs database.
+    Order: explicit argument, SQLITE_DB_PATH environment variable, default location.
+    """
+    return os.path.abspath(db_path or os.getenv("SQLITE_DB_PATH") or DEFAULT_DB_PATH)
+
+
+def _read_pragmas() -> list:
+    mmap_bytes = int(os.getenv("SQLITE_MMAP_MB", DEFAULT_MMAP_MB)) * 1024 * 1024
+    cache_kib = int(os.getenv("SQLITE_CACHE_MB", DEFAULT_CACHE_MB)) * 1024
+    return [
+        "PRAGMA query_only = ON",
+        f"PRAGMA mmap_size = {mmap_bytes}",
+        f"PRAGMA cache_size = -{cache_kib}",  # negative = KiB
+        "PRAGMA temp_store = MEMORY",
+    ]
+
+
+def open_readonly(db_path: str) -> sqlite3.Connection:
+    """
+    Opens a raw read-only connection (plain tuple rows) with the read pragmas applied.
+    Both mode=ro and query_only refuse writes, so generated SQL cannot modify the data.
+    """
+    uri = f"file:{db_path}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    for pragma in _read_pragmas():
+        conn.execute(pragma)
+    return conn
+
+
+def connect_readonly(db_path: str) -> sqlite3.Connection:
+    """
+    Opens a read-only connection to the jobs database. Rows support access by column name.
+    """
+    conn = open_readonly(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class ReadOnlyPool:
+    """
+    One read-only connection per thread for a database file.
+
+    A connection is reopened when the file is replaced on disk (new inode),
+    e.g. when ingestion rebuilds jobs.db and renames it into place.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _inode(self):
+        try:
+            return os.stat(self.db_path).st_ino
+        except OSError:
+            return None
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection (sqlite3.Row rows), opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        inode = self._inode()
+        if conn is not None and self._local.inode != inode:
+            self._discard(conn)
+            conn = None
+        if conn is None:
+            conn = connect_readonly(self.db_path)
+            self._local.conn = conn
+            self._local.inode = inode
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+        self._local.conn = None
+
+    def execute(self, sql: str, params=()) -> list:
+        """Runs a query on this thread's connection and returns all rows."""
+        return self.connection().execute(sql, params).fetchall()
+
+    def close_all(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"db_path": self.db_path, "open_connections": len(self._connections)}
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_readonly_pool(db_path: str = None) -> ReadOnlyPool:
+    """Process-wide pool for a database file, shared by all readers."""
+    path = resolve_db_path(db_path)
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ReadOnlyPool(path)
+        return pool
+
+
+def create_readonly_engine(db_path: str):
+    """
+    SQLAlchemy engine over read-only connections, for LangChain's SQLDatabase.
+    SingletonThreadPool keeps one connection per thread, like ReadOnlyPool.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import SingletonThreadPool
+
+    path = resolve_db_path(db_path)
+    return create_engine(
+        "sqlite://",
+        creator=lambda: open_readonly(path),
+        poolclass=SingletonThreadPool,
+        pool_size=32,
+    )
+
+
+def like_escape(text: str) -> str:
+    """Escapes LIKE wildcards in text, for patterns used with ESCAPE '\\'."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def db_version(db_path: str) -> tuple:
+    """
+    Version stamp of the database file: changes whenever ingestion rewrites it.
+    Includes the WAL file, since WAL-mode writes do not touch the main file until checkpoint.
+    """
+    stamp = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(path)
+            stamp.extend((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamp.extend((None, None))
+    return tuple(stamp)
+
+
+@dataclass
+class JobRecord:
+    """One row of jobs_table."""
+    id: int
+    job_title: Optional[str] = None
+    company_name: Optional[str] = None
+    clean_location: Optional[str] = None
+    work_type: Optional[str] = None
+    min_salary: Optional[float] = None
+    max_salary: Optional[float] = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "JobRecord":
+        keys = row.keys()
+        return cls(**{name: row[name] for name in cls.__dataclass_fields__ if name in keys})
+
+
+def fetch_jobs_by_ids(ids, db_path: str = None) -> dict:
+    """
+    Fetches several jobs in one parameterized IN (...) query.
+    Returns {id: JobRecord}; ids that do not exist are simply absent.
+    """
+    wanted = []
+    for job_id in ids:
+        if job_id is None:
+            continue
+        try:
+            job_id = int(job_id)
+        except (TypeError, ValueError):
+            continue
+        if job_id not in wanted:
+            wanted.append(job_id)
+
+    pool = get_readonly_pool(db_path)
+    records = {}
+    for start in range(0, len(wanted), _MAX_PARAMS):
+        chunk = wanted[start:start + _MAX_PARAMS]
+        placeholders = ", ".join("?" * len(chunk))
+        for row in pool.execute(f"SELECT * FROM {JOBS_TABLE} WHERE id IN ({placeholders})", chunk):
+            record = JobRecord.from_row(row)
+            records[record.id] = record
+    return records
@@ -0,0 +1,109 @@
+"""
+Columnar snapshot of the processed jobs for analytics.
+
+Ingestion writes jobs_table to a Parquet dataset partitioned by region
+(data/processed/jobs_parquet/region=.../part-0.parquet) with the typed
+schema below: categorical strings are dictionary-encoded, salaries are
+float64 and scraped_at is a timestamp. Loading it memory-maps the files into
+Arrow instead of parsing CSV or pulling rows through SQLite, so notebooks and
+dashboards get the whole table in milliseconds.
+
+    from src.database.jobs_snapshot import load_jobs_table, load_jobs_frame
+    table = load_jobs_table(columns=["clean_location", "min_salary", "max_salary"])
+    df = load_jobs_frame(filters=[("region", "=", "Jakarta Raya")])
+"""
+
+import os
+import json
+import threading
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.database.jobs_db import PROJECT_ROOT
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "jobs_parquet")
+MANIFEST_FILE = "_snapshot.json"
+PARTITION_COLUMN = "region"
+
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("job_title", pa.string()),
+    ("title_key", _CATEGORY),
+    ("company_name", _CATEGORY),
+    ("clean_location", _CATEGORY),
+    ("region", _CATEGORY),
+    ("work_arrangement", _CATEGORY),
+    ("work_type", _CATEGORY),
+    ("min_salary", pa.float64()),
+    ("max_salary", pa.float64()),
+    ("salary_mid", pa.float64()),
+    ("canonical_id", pa.int64()),       # set for near-duplicate variants (job_aliases)
+    ("scraped_at", pa.timestamp("us")),
+    ("job_description", pa.large_string()),
+])
+
+
+def resolve_snapshot_path(path: str = None) -> str:
+    """Explicit argument, JOBS_SNAPSHOT_PATH environment variable, default location."""
+    return os.path.abspath(path or os.getenv("JOBS_SNAPSHOT_PATH") or DEFAULT_SNAPSHOT_PATH)
+
+
+def read_manifest(path: str = None) -> dict:
+    """{"rows", "files", "partition_by", "created_at", "source"} of the current snapshot."""
+    with open(os.path.join(resolve_snapshot_path(path), MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def snapshot_partitioning():
+    """The region column lives in the directory names (hive partitioning); used for writing."""
+    return ds.partitioning(pa.schema([(PARTITION_COLUMN, _CATEGORY)]), flavor="hive")
+
+
+def _read_partitioning():
+    # Discovery collects the region dictionary from the directory names
+    return ds.HivePartitioning.discover(infer_dictionary=True)
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def load_jobs_table(path: str = None, columns: list = None, filters=None) -> pa.Table:
+    """
+    Memory-maps the snapshot into an Arrow table. columns selects a subset
+    (only those column chunks are read); filters are pyarrow expressions or
+    DNF tuples like [("region", "=", "Bali")] and prune whole partitions.
+    Unfiltered full loads are cached per process until the snapshot changes.
+    """
+    path = resolve_snapshot_path(path)
+    cacheable = columns is None and filters is None
+    if cacheable:
+        version = os.stat(os.path.join(path, MANIFEST_FILE)).st_mtime_ns
+        with _tables_lock:
+            cached = _tables.get(path)
+            if cached and cached[0] == version:
+                return cached[1]
+
+    table = pq.read_table(
+        path,
+        columns=columns,
+        filters=filters,
+        memory_map=True,
+        partitioning=_read_partitioning(),
+        ignore_prefixes=[".", "_"],
+    )
+    # The partition column comes back last; restore the schema's column order
+    table = table.select([name for name in SNAPSHOT_SCHEMA.names if name in table.column_names])
+    if cacheable:
+        with _tables_lock:
+            _tables[path] = (version, table)
+    return table
+
+
+def load_jobs_frame(path: str = None, columns: list = None, filters=None):
+    """Snapshot as a pandas DataFrame; dictionary columns become pandas categoricals."""
+    return load_jobs_table(path, columns, filters).to_pandas()
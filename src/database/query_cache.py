@@ -0,0 +1,83 @@
+"""
+Result cache for read-only SQL executed against the jobs database.
+
+jobs.db is effectively read-only between ingestions, so identical SQL returns
+identical rows. Results are cached under (normalized SQL, parameters, database
+version stamp); when ingestion rewrites the file the stamp changes and the
+whole cache is dropped on the next lookup.
+"""
+
+import os
+import re
+import logging
+
+from src.database.jobs_db import db_version
+from src.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_MB = 32
+
+# Single-quoted literals, double-quoted identifiers, or anything else
+_SQL_TOKEN = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|([^'\"]+)")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Canonical form of a statement for cache keys: keywords/identifiers outside
+    quotes are lower-cased, whitespace is collapsed and trailing semicolons are
+    removed. Quoted literals are kept verbatim.
+    """
+    parts = []
+    for quoted, bare in _SQL_TOKEN.findall(sql.strip().rstrip(";").strip()):
+        if quoted:
+            parts.append(quoted)
+        else:
+            bare = re.sub(r"\s+", " ", bare.lower())
+            bare = re.sub(r"\s*([(),=<>])\s*", r"\1", bare)
+            parts.append(bare)
+    return "".join(parts).strip()
+
+
+class QueryResultCache:
+    """
+    Byte-budgeted LRU of query results, invalidated by the database version stamp.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = None):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("SQL_RESULT_CACHE_MB", DEFAULT_CACHE_MB)) * 1024 * 1024)
+        self.db_path = db_path
+        self._cache = LRUCache(max_bytes=max_bytes)
+        self._version = db_version(db_path)
+        self.invalidations = 0
+
+    def _check_version(self):
+        version = db_version(self.db_path)
+        if version != self._version:
+            logger.info("jobs.db changed on disk, dropping cached query results")
+            self._cache.clear()
+            self._version = version
+            self.invalidations += 1
+        return version
+
+    def get(self, sql: str, params: tuple = ()):
+        version = self._check_version()
+        return self._cache.get((normalize_sql(sql), tuple(params), version))
+
+    def put(self, sql: str, result, params: tuple = ()):
+        version = self._check_version()
+        self._cache.put((normalize_sql(sql), tuple(params), version), result)
+
+    def get_or_run(self, sql: str, runner, params: tuple = ()):
+        """Returns the cached result or calls runner() and caches its result."""
+        cached = self.get(sql, params)
+        if cached is not None:
+            return cached
+        result = runner()
+        if result is not None:
+            self.put(sql, result, params)
+        return result
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "invalidations": self.invalidations}
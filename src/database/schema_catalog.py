@@ -0,0 +1,190 @@
+"""
+Precomputed schema and data dictionary for the jobs database.
+
+The SQL agent used to spend two tool round trips per question
+(sql_db_list_tables + sql_db_schema) rediscovering a schema that only changes
+at ingestion. SchemaCatalog introspects the database once, renders a compact
+prompt-ready description (column types, sample values, categorical
+vocabularies, numeric ranges) and rebuilds itself only when the database
+file's modification time (see jobs_db.db_version) changes.
+"""
+
+import re
+import threading
+import logging
+
+from src.database.jobs_db import get_readonly_pool, db_version
+
+logger = logging.getLogger(__name__)
+
+# Columns whose full vocabulary is kept (and listed in the prompt) regardless of cardinality
+DICTIONARY_COLUMNS = {
+    "jobs_table": ["clean_location", "work_type", "region", "work_arrangement"],
+}
+
+# Ingestion bookkeeping (MinHash signatures / LSH buckets), not useful for answering questions
+HIDDEN_TABLES = {"job_minhash", "job_minhash_bands"}
+
+_FTS5 = re.compile(r"USING\s+fts5", re.IGNORECASE)
+_FTS_CONTENT = re.compile(r"content\s*=\s*'([^']+)'", re.IGNORECASE)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _short(value, width: int = 60) -> str:
+    text = str(value).replace("\n", " ")
+    return text if len(text) <= width else text[: width - 3] + "..."
+
+
+class SchemaCatalog:
+    """
+    Cached data dictionary of a SQLite database, invalidated by the file's mtime.
+    """
+
+    def __init__(self, db_path: str, sample_values: int = 3, max_listed_values: int = 40):
+        self.db_path = db_path
+        self.sample_values = sample_values
+        self.max_listed_values = max_listed_values
+        self._lock = threading.Lock()
+        self._version = None
+        self.tables = {}
+        self.text = ""
+        self.refresh(force=True)
+
+    def is_stale(self) -> bool:
+        return db_version(self.db_path) != self._version
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Rebuilds the catalog if the database changed since the last build.
+        Returns True when a rebuild happened.
+        """
+        if not force and not self.is_stale():
+            return False
+        with self._lock:
+            version = db_version(self.db_path)
+            if not force and version == self._version:
+                return False
+            tables = self._introspect()
+            self.tables = tables
+            self.text = self._render(tables)
+            self._version = version
+        logger.info(f"Schema catalog built for {self.db_path} ({len(tables)} tables)")
+        return True
+
+    def distinct_values(self, table: str, column: str) -> list:
+        """Full vocabulary of a dictionary column (e.g. jobs_table.clean_location)."""
+        col = self.tables.get(table, {}).get("columns", {}).get(column, {})
+        return [value for value, _ in col.get("values", [])]
+
+    def row_count(self, table: str) -> int:
+        return self.tables.get(table, {}).get("rows", 0)
+
+    # ---------- introspection ----------
+
+    def _introspect(self) -> dict:
+        conn = get_readonly_pool(self.db_path).connection()
+        objects = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'view') "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        ).fetchall()
+        fts = {name: sql for name, sql in objects if _FTS5.search(sql or "")}
+        tables = {}
+        for name, _ in objects:
+            if name in HIDDEN_TABLES or any(name.startswith(f + "_") for f in fts):
+                continue  # bookkeeping and FTS shadow tables
+            tables[name] = self._describe_fts(conn, name, fts[name]) if name in fts else self._describe_table(conn, name)
+        return tables
+
+    def _describe_fts(self, conn, table: str, sql: str) -> dict:
+        content = _FTS_CONTENT.search(sql)
+        return {
+            "rows": conn.execute(f"SELECT COUNT(*) FROM {_quote(table)}").fetchone()[0],
+            "fts": {
+                "columns": [r["name"] for r in conn.execute(f"PRAGMA table_info({_quote(table)})")],
+                "content": content.group(1) if content else None,
+            },
+            "columns": {},
+        }
+
+    def _describe_table(self, conn, table: str) -> dict:
+        qt = _quote(table)
+        rows = conn.execute(f"SELECT COUNT(*) FROM {qt}").fetchone()[0]
+        dictionary_columns = DICTIONARY_COLUMNS.get(table, [])
+        columns = {}
+
+        # table_xinfo also lists generated columns (hidden = 2 virtual, 3 stored)
+        for info in conn.execute(f"PRAGMA table_xinfo({qt})").fetchall():
+            if info["hidden"] == 1:
+                continue
+            name, col_type = info["name"], (info["type"] or "").upper()
+            qc = _quote(name)
+            col = {"type": col_type or "ANY"}
+            if info["hidden"] in (2, 3):
+                col["generated"] = True
+
+            non_null, distinct = conn.execute(
+                f"SELECT COUNT({qc}), COUNT(DISTINCT {qc}) FROM {qt}"
+            ).fetchone()
+            col["non_null"] = non_null
+            col["distinct"] = distinct
+
+            numeric = any(t in col_type for t in ("INT", "REAL", "FLOA", "DOUB", "NUM"))
+            if numeric and non_null:
+                lo, hi, avg = conn.execute(f"SELECT MIN({qc}), MAX({qc}), AVG({qc}) FROM {qt}").fetchone()
+                col["range"] = (lo, hi, avg)
+            elif name in dictionary_columns or (0 < distinct <= self.max_listed_values):
+                col["values"] = [
+                    (r[0], r[1]) for r in conn.execute(
+                        f"SELECT {qc}, COUNT(*) AS n FROM {qt} WHERE {qc} IS NOT NULL "
+                        f"GROUP BY {qc} ORDER BY n DESC"
+                    )
+                ]
+            elif non_null:
+                col["samples"] = [
+                    r[0] for r in conn.execute(
+                        f"SELECT DISTINCT {qc} FROM {qt} WHERE {qc} IS NOT NULL LIMIT ?", (self.sample_values,)
+                    )
+                ]
+            columns[name] = col
+
+        return {"rows": rows, "columns": columns}
+
+    # ---------- rendering ----------
+
+    def _render(self, tables: dict) -> str:
+        lines = []
+        for table, meta in tables.items():
+            if "fts" in meta:
+                fts = meta["fts"]
+                lines.append(f"Full-text index {table} over {', '.join(fts['columns'])}"
+                             + (f" (rowid = {fts['content']}.id)" if fts["content"] else ""))
+                if fts["content"]:
+                    lines.append(f"  - keyword search: {fts['content']}.id IN "
+                                 f"(SELECT rowid FROM {table} WHERE {table} MATCH 'python')")
+                lines.append("")
+                continue
+            lines.append(f"Table {table} ({meta['rows']} rows)")
+            for name, col in meta["columns"].items():
+                desc = f"  - {name} {col['type']}"
+                if col.get("generated"):
+                    desc += " (generated)"
+                if col["non_null"] < meta["rows"]:
+                    desc += f", {meta['rows'] - col['non_null']} NULL"
+                if "range" in col:
+                    lo, hi, avg = col["range"]
+                    desc += f", range {lo} .. {hi} (avg {avg:.0f})" if avg is not None else ""
+                elif "values" in col:
+                    listed = col["values"][: self.max_listed_values]
+                    rendered = ", ".join(f"'{_short(v, 40)}' ({n})" for v, n in listed)
+                    more = len(col["values"]) - len(listed)
+                    desc += f", {col['distinct']} distinct values: {rendered}"
+                    if more > 0:
+                        desc += f" ... and {more} more"
+                elif col.get("samples"):
+                    desc += ", e.g. " + ", ".join(f"'{_short(v)}'" for v in col["samples"])
+                lines.append(desc)
+            lines.append("")
+        return "\n".join(lines).strip()
@@ -0,0 +1,190 @@
+"""
+Semantic cache mapping natural-language stats questions to validated SQL.
+
+Users ask the same question in many phrasings (English or Indonesian). Each
+answered question is stored with its embedding and the SQL that successfully
+answered it; a new question whose embedding is close enough to a stored one
+reuses that SQL instead of paying for NL->SQL generation again.
+
+Entries persist in a small SQLite file so they survive restarts and are shared
+by all uvicorn workers; each worker keeps an in-memory matrix of normalized
+vectors and reloads it when another process writes to the store.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+from typing import Optional
+
+import numpy as np
+
+from src.database.jobs_db import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "semantic_sql_cache.db")
+DEFAULT_THRESHOLD = 0.93
+DEFAULT_MAX_ENTRIES = 2000
+
+_SQL_LITERAL = re.compile(r"'((?:[^']|'')*)'")
+_NUMBER = re.compile(r"\b\d+\b")
+# Quoted phrases, not apostrophes inside words ("what's", "analyst's")
+_QUOTED = re.compile(r"(?:^|(?<=\s))[\"“'‘]([^\"“”'‘’]+)[\"”'’](?=$|[\s?!.,;:])")
+
+
+def literals_match(question: str, sql: str, entities=()) -> bool:
+    """
+    Guards against near-identical questions about different entities
+    ("python jobs" vs "java jobs" embed very closely): every string literal
+    in the stored SQL and every number in the question must carry over, and
+    so must the question's entities - `entities` (e.g. locations found by the
+    query parser) and quoted titles or companies - which must each appear in
+    a SQL literal ("data analyst jobs in Bandung" cannot reuse unfiltered SQL).
+    """
+    text = question.lower()
+    literals = [literal.replace("''", "'").lower() for literal in _SQL_LITERAL.findall(sql)]
+    for literal in literals:
+        core = literal.strip("%_ ")
+        if core and core not in text:
+            return False
+    sql_numbers = set(_NUMBER.findall(sql))
+    if not all(n in sql_numbers for n in _NUMBER.findall(question)):
+        return False
+    wanted = [e.lower().strip() for e in list(entities) + _QUOTED.findall(question)]
+    return all(any(entity in literal for literal in literals) for entity in wanted if entity)
+
+
+class SemanticSQLCache:
+    """
+    Persistent question-embedding -> SQL store with cosine-similarity lookup and LRU eviction.
+    """
+
+    def __init__(self, path: str = None, threshold: float = None, max_entries: int = None):
+        self.path = path or os.getenv("SQL_SEMANTIC_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.threshold = float(threshold or os.getenv("SQL_SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD))
+        self.max_entries = int(max_entries or os.getenv("SQL_SEMANTIC_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS semantic_sql_cache (
+                id INTEGER PRIMARY KEY,
+                question TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                sql TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._ids = []
+        self._sqls = []
+        self._questions = []
+        self._matrix = None
+        self._data_version = None
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    # ---------- in-memory index ----------
+
+    def _reload_if_changed(self):
+        # data_version changes when another connection (another worker) commits;
+        # our own inserts/deletes reset _data_version explicitly.
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        rows = self._conn.execute("SELECT id, question, sql, embedding FROM semantic_sql_cache").fetchall()
+        self._ids = [r[0] for r in rows]
+        self._questions = [r[1] for r in rows]
+        self._sqls = [r[2] for r in rows]
+        self._matrix = np.vstack([np.frombuffer(r[3], dtype=np.float32) for r in rows]) if rows else None
+        self._data_version = version
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    # ---------- public API ----------
+
+    def lookup(self, question: str, vector, entities=()) -> Optional[dict]:
+        """
+        Returns {"id", "sql", "question", "similarity"} of the closest stored
+        question above the threshold whose SQL passes literals_match(), or None.
+        """
+        query = self._normalize(vector)
+        with self._lock:
+            self._reload_if_changed()
+            if self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+            scores = self._matrix @ query
+            for idx in np.argsort(-scores)[:5]:
+                score = float(scores[idx])
+                if score < self.threshold:
+                    break
+                if not literals_match(question, self._sqls[idx], entities):
+                    self.rejected += 1
+                    continue
+                entry_id = self._ids[idx]
+                self._conn.execute(
+                    "UPDATE semantic_sql_cache SET last_used = ?, hits = hits + 1 WHERE id = ?",
+                    (time.time(), entry_id),
+                )
+                self._conn.commit()
+                self.hits += 1
+                return {
+                    "id": entry_id,
+                    "sql": self._sqls[idx],
+                    "question": self._questions[idx],
+                    "similarity": score,
+                }
+            self.misses += 1
+            return None
+
+    def store(self, question: str, vector, sql: str):
+        """Records a question and the SQL that answered it, evicting the least recently used entries."""
+        blob = self._normalize(vector).tobytes()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO semantic_sql_cache (question, embedding, sql, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (question, blob, sql, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM semantic_sql_cache WHERE id IN ("
+                "SELECT id FROM semantic_sql_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+            self._data_version = None
+
+    def invalidate(self, entry_id: int):
+        """Drops an entry whose SQL no longer runs (e.g. after a schema change)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM semantic_sql_cache WHERE id = ?", (entry_id,))
+            self._conn.commit()
+            self._data_version = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM semantic_sql_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "rejected_by_literal_check": self.rejected,
+            }
@@ -1,15 +1,28 @@
 import os
 import logging
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.http.models import Distance, PayloadSchemaType, VectorParams
 from dotenv import load_dotenv
 
+from src.retrieval.filters import DATETIME_FIELDS, FLOAT_FIELDS, KEYWORD_FIELDS
+
 load_dotenv()
 
+# Payload fields that JobFilter conditions are evaluated on (src/retrieval/filters.py)
+PAYLOAD_INDEXES = {
+    **{field: PayloadSchemaType.KEYWORD for field in KEYWORD_FIELDS},
+    **{field: PayloadSchemaType.FLOAT for field in FLOAT_FIELDS},
+    **{field: PayloadSchemaType.DATETIME for field in DATETIME_FIELDS},
+}
+
 # Logger configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def is_local_client(client) -> bool:
+    """True for QdrantClient(path=...) / ":memory:", which runs in-process."""
+    return type(getattr(client, "_client", None)).__name__ == "QdrantLocal"
+
 def get_qdrant_client():
     """
     Returns a QdrantClient instance based on environment variables.
@@ -26,15 +39,34 @@ def get_qdrant_client():
     logger.info("QDRANT_URL not set. Using local storage in 'data/qdrant_storage'.")
     return QdrantClient(path="data/qdrant_storage")
 
-def setup_collection(collection_name: str, vector_size: int = 1536):
+def get_async_qdrant_client():
+    """
+    Returns an AsyncQdrantClient for server deployments (QDRANT_URL set).
+    
+    Returns None in local storage mode: the on-disk store is guarded by a
+    file lock that the synchronous client already holds, so async callers
+    should run the sync client in a thread instead.
     """
-    Creates a Qdrant collection if it doesn't already exist.
+    qdrant_url = os.getenv("QDRANT_URL")
+    qdrant_api_key = os.getenv("QDRANT_API_KEY")
+    
+    if qdrant_url:
+        logger.info(f"Connecting async client to Qdrant at {qdrant_url}")
+        return AsyncQdrantClient(url=qdrant_url, api_key=qdrant_api_key)
+    
+    return None
+
+def setup_collection(collection_name: str, vector_size: int = 1536, client: QdrantClient = None):
+    """
+    Creates a Qdrant collection if it doesn't already exist, and the payload
+    indexes used by filtered retrieval.
     
     Args:
         collection_name (str): Name of the collection.
         vector_size (int): Dimension of vectors (default 1536 for OpenAI text-embedding-3-small/large or ada-002).
+        client (QdrantClient): Existing client to reuse (required in local mode, where only one client may hold the storage lock).
     """
-    client = get_qdrant_client()
+    client = client or get_qdrant_client()
     
     collections = client.get_collections().collections
     exists = any(c.name == collection_name for c in collections)
@@ -48,6 +80,22 @@ def setup_collection(collection_name: str, vector_size: int = 1536):
         logger.info(f"Collection '{collection_name}' created successfully.")
     else:
         logger.info(f"Collection '{collection_name}' already exists.")
+    create_payload_indexes(collection_name, client)
+
+def create_payload_indexes(collection_name: str, client: QdrantClient = None):
+    """
+    Indexes the filterable payload fields that are not indexed yet, so filtered
+    searches look up candidates instead of checking every point's payload.
+    Skipped in local mode, where Qdrant has no payload indexes.
+    """
+    client = client or get_qdrant_client()
+    if is_local_client(client):
+        return
+    existing = client.get_collection(collection_name).payload_schema or {}
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        if field_name not in existing:
+            logger.info(f"Creating {schema.value} payload index on '{field_name}' in '{collection_name}'")
+            client.create_payload_index(collection_name, field_name=field_name, field_schema=schema, wait=True)
 
 if __name__ == "__main__":
     # Example setup
@@ -0,0 +1,198 @@
+"""
+Execution guard for LLM-generated SQL against the jobs database.
+
+Generated queries run through three checks before their results reach the
+prompt:
+
+1. Plan check: EXPLAIN QUERY PLAN is inspected and queries whose full table
+   scans (multiplied across nested loops, e.g. a cross join) would touch more
+   rows than the budget are rejected before they run.
+2. Time budget: SQLite's progress handler interrupts a query that exceeds its
+   wall-clock budget.
+3. Result caps: at most max_rows rows / max_bytes of text are returned; the
+   rest is cut off with a note telling the agent to aggregate or add LIMIT.
+
+Violations are reported as "Error: {json}" strings so the agent can read the
+reason and rewrite the query (and so the result cache never stores them).
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+
+from src.database.jobs_db import get_readonly_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_MS = 2000
+DEFAULT_MAX_ROWS = 200
+DEFAULT_MAX_BYTES = 20000
+DEFAULT_MAX_SCAN_ROWS = 250000
+
+# SQLite >= 3.36 prints "SCAN jobs_table", older versions "SCAN TABLE jobs_table"
+_SCAN = re.compile(r"^SCAN (?:TABLE )?([\w\"]+)")
+# "FROM jobs_table j", "JOIN jobs_table AS b", "FROM jobs_table a, jobs_table b"
+_TABLE_REF = re.compile(r'(?:\bFROM|\bJOIN|,)\s*"?(\w+)"?(?:\s+(?:AS\s+)?"?(\w+)"?)?', re.IGNORECASE)
+_READ_STATEMENT = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_PROGRESS_STEPS = 1000
+
+
+class SQLGuardError(Exception):
+    """A generated query was rejected; carries a machine-readable reason and a rewrite hint."""
+
+    def __init__(self, code: str, message: str, hint: str = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.hint = hint
+
+    def to_json(self) -> str:
+        return json.dumps({"error": self.code, "message": self.message, "hint": self.hint})
+
+
+class SQLGuard:
+    """
+    Runs read-only SQL with a plan check, a wall-clock budget and row/byte caps.
+    """
+
+    def __init__(self, db_path: str, catalog=None, timeout_ms: int = None, max_rows: int = None,
+                 max_bytes: int = None, max_scan_rows: int = None):
+        self.db_path = db_path
+        self.catalog = catalog
+        self.pool = get_readonly_pool(db_path)
+        self.timeout = int(timeout_ms or os.getenv("SQL_GUARD_TIMEOUT_MS", DEFAULT_TIMEOUT_MS)) / 1000
+        self.max_rows = int(max_rows or os.getenv("SQL_GUARD_MAX_ROWS", DEFAULT_MAX_ROWS))
+        self.max_bytes = int(max_bytes or os.getenv("SQL_GUARD_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_scan_rows = int(max_scan_rows or os.getenv("SQL_GUARD_MAX_SCAN_ROWS", DEFAULT_MAX_SCAN_ROWS))
+        self.counters = {"executed": 0, "rejected_plan": 0, "timeouts": 0, "truncated": 0, "errors": 0}
+
+    # ---------- checks ----------
+
+    def _row_count(self, conn, table: str) -> int:
+        if self.catalog is not None and table in self.catalog.tables:
+            return self.catalog.row_count(table)
+        try:
+            return conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+        except sqlite3.Error:
+            return 0  # subquery/CTE names are not real tables
+
+    def _aliases(self, conn, sql: str) -> dict:
+        """Maps aliases to table names; the query plan reports scans by alias."""
+        tables = {r[0].lower() for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return {
+            alias.lower(): table
+            for table, alias in _TABLE_REF.findall(sql)
+            if alias and table.lower() in tables
+        }
+
+    def check_statement(self, sql: str):
+        # mode=ro/query_only already refuse writes; this gives the agent a clearer message
+        if not _READ_STATEMENT.match(sql):
+            raise SQLGuardError("not_a_query", "Only SELECT (or WITH ... SELECT) statements are allowed.")
+
+    def check_plan(self, conn, sql: str):
+        """Rejects plans whose scanned rows (product over nested scans) exceed max_scan_rows."""
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        aliases = self._aliases(conn, sql)
+        scanned = []
+        for row in plan:
+            match = _SCAN.match(row[3])
+            # FTS5 (virtual table) lookups report "SCAN jobs_fts VIRTUAL TABLE INDEX ..." but use their own index
+            if match and "VIRTUAL TABLE" not in row[3]:
+                name = match.group(1).strip('"')
+                table = aliases.get(name.lower(), name)
+                rows = self._row_count(conn, table)
+                if rows:
+                    scanned.append((table, rows))
+        estimate = 1
+        for _, rows in scanned:
+            estimate *= rows
+        if scanned and estimate > self.max_scan_rows:
+            tables = ", ".join(f"{t} ({n} rows)" for t, n in scanned)
+            hint = "Add a selective WHERE on an indexed column, avoid joining a table with itself " \
+                   "without a join condition, or aggregate with COUNT/GROUP BY."
+            if len(scanned) > 1:
+                hint = "The query scans several tables in nested loops (likely a missing join condition). " + hint
+            raise SQLGuardError(
+                "plan_too_expensive",
+                f"Query would scan about {estimate} rows ({tables}); the limit is {self.max_scan_rows}.",
+                hint,
+            )
+
+    # ---------- execution ----------
+
+    def execute(self, sql: str) -> tuple:
+        """
+        Runs the query under all checks.
+        Returns (rows as tuples, truncation reason or None).
+        """
+        self.check_statement(sql)
+        conn = self.pool.connection()
+        self.check_plan(conn, sql)
+
+        deadline = time.monotonic() + self.timeout
+        conn.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, _PROGRESS_STEPS)
+        try:
+            cursor = conn.execute(sql)
+            rows, size, truncated = [], 0, None
+            for row in cursor:
+                row = tuple(row)
+                size += len(repr(row))
+                if len(rows) >= self.max_rows:
+                    truncated = f"more than {self.max_rows} rows"
+                    break
+                if size > self.max_bytes:
+                    truncated = f"more than {self.max_bytes} bytes"
+                    break
+                rows.append(row)
+        except sqlite3.OperationalError as e:
+            if "interrupted" in str(e):
+                raise SQLGuardError(
+                    "timeout",
+                    f"Query exceeded the {int(self.timeout * 1000)} ms time budget.",
+                    "Simplify the query: filter earlier, avoid leading-wildcard LIKE on large columns, or aggregate.",
+                ) from e
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+        return rows, truncated
+
+    def run(self, sql: str) -> str:
+        """
+        Tool-facing entry point: the result as a string in SQLDatabase.run's format,
+        or "Error: ..." (JSON for guard violations) for the agent to act on.
+        """
+        try:
+            rows, truncated = self.execute(sql)
+        except SQLGuardError as e:
+            key = {"plan_too_expensive": "rejected_plan", "timeout": "timeouts"}.get(e.code, "errors")
+            self.counters[key] += 1
+            logger.info(f"SQL guard rejected query ({e.code}): {sql}")
+            return f"Error: {e.to_json()}"
+        except sqlite3.Error as e:
+            self.counters["errors"] += 1
+            return f"Error: {e}"
+
+        self.counters["executed"] += 1
+        result = str(rows) if rows else ""
+        if truncated:
+            self.counters["truncated"] += 1
+            note = {
+                "warning": "result_truncated",
+                "message": f"Result had {truncated}; only the first {len(rows)} rows are shown.",
+                "hint": "Use COUNT/GROUP BY or a LIMIT if you need an overview rather than every row.",
+            }
+            result += "\n" + json.dumps(note)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            **self.counters,
+            "timeout_ms": int(self.timeout * 1000),
+            "max_rows": self.max_rows,
+            "max_bytes": self.max_bytes,
+            "max_scan_rows": self.max_scan_rows,
+        }
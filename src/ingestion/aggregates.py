@@ -0,0 +1,158 @@
+"""
+Materialized job-market statistics, rebuilt at the end of every ingestion run.
+
+Stats questions ("jobs per city", "top hiring companies", "salary for a Data
+Analyst") used to aggregate jobs_table on every request. build_aggregates()
+computes them once per load into the stats_* tables read by
+src/database/job_stats.py and the SQL agent. Counts come from GROUP BY
+queries; salary percentiles per normalized title (SQLite has no percentile
+aggregate) are computed with numpy while streaming salary_mid sorted by title,
+so memory is bounded by the largest title group.
+"""
+
+import time
+import logging
+from itertools import groupby
+
+import numpy as np
+
+from src.database.jobs_db import JOBS_TABLE
+from src.database.job_stats import (
+    STATS_COMPANY_TABLE,
+    STATS_LOCATION_TABLE,
+    STATS_SUMMARY_TABLE,
+    STATS_TITLE_TABLE,
+    STATS_WORK_TYPE_TABLE,
+)
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+AGGREGATE_DDL = {
+    STATS_SUMMARY_TABLE: f"""
+        CREATE TABLE {STATS_SUMMARY_TABLE} (
+            total_jobs INTEGER,
+            with_salary INTEGER,
+            companies INTEGER,
+            locations INTEGER,
+            titles INTEGER,
+            built_at TEXT
+        )""",
+    STATS_LOCATION_TABLE: f"""
+        CREATE TABLE {STATS_LOCATION_TABLE} (
+            clean_location TEXT COLLATE NOCASE PRIMARY KEY,
+            region TEXT,
+            jobs INTEGER,
+            with_salary INTEGER,
+            avg_salary_mid REAL
+        )""",
+    STATS_WORK_TYPE_TABLE: f"""
+        CREATE TABLE {STATS_WORK_TYPE_TABLE} (
+            work_type TEXT PRIMARY KEY,
+            jobs INTEGER,
+            with_salary INTEGER,
+            avg_salary_mid REAL
+        )""",
+    STATS_COMPANY_TABLE: f"""
+        CREATE TABLE {STATS_COMPANY_TABLE} (
+            company_name TEXT PRIMARY KEY,
+            jobs INTEGER,
+            locations INTEGER
+        )""",
+    STATS_TITLE_TABLE: f"""
+        CREATE TABLE {STATS_TITLE_TABLE} (
+            title_key TEXT PRIMARY KEY,
+            job_title TEXT,
+            jobs INTEGER,
+            companies INTEGER,
+            with_salary INTEGER,
+            salary_min REAL,
+            salary_p10 REAL,
+            salary_p25 REAL,
+            salary_median REAL,
+            salary_p75 REAL,
+            salary_p90 REAL,
+            salary_max REAL,
+            salary_avg REAL
+        )""",
+}
+
+# Top-N lookups read these in order instead of sorting the table
+AGGREGATE_INDEXES = [
+    f"CREATE INDEX idx_{STATS_LOCATION_TABLE}_jobs ON {STATS_LOCATION_TABLE} (jobs DESC, clean_location)",
+    f"CREATE INDEX idx_{STATS_COMPANY_TABLE}_jobs ON {STATS_COMPANY_TABLE} (jobs DESC, company_name)",
+    f"CREATE INDEX idx_{STATS_TITLE_TABLE}_jobs ON {STATS_TITLE_TABLE} (jobs DESC, title_key)",
+]
+
+
+def _title_rows(conn) -> list:
+    """One stats_by_title row per normalized title, with salary percentiles."""
+    counts = {
+        key: (jobs, companies, low, high)
+        for key, jobs, companies, low, high in conn.execute(
+            f"SELECT title_key, COUNT(*), COUNT(DISTINCT company_name), MIN(salary_low), MAX(salary_high) "
+            f"FROM {JOBS_TABLE} WHERE title_key IS NOT NULL GROUP BY title_key"
+        )
+    }
+    # Most common spelling of each title, for display
+    display = {}
+    for key, title, n in conn.execute(
+        f"SELECT title_key, job_title, COUNT(*) AS n FROM {JOBS_TABLE} WHERE title_key IS NOT NULL "
+        f"GROUP BY title_key, job_title ORDER BY title_key, n DESC, job_title"
+    ):
+        display.setdefault(key, title)
+
+    salaries = {}
+    cursor = conn.execute(
+        f"SELECT title_key, salary_mid FROM {JOBS_TABLE} "
+        f"WHERE title_key IS NOT NULL AND salary_mid IS NOT NULL ORDER BY title_key"
+    )
+    for key, group in groupby(cursor, key=lambda row: row[0]):
+        values = np.fromiter((row[1] for row in group), dtype=float)
+        salaries[key] = (len(values), *np.percentile(values, PERCENTILES).round(), round(float(values.mean())))
+
+    rows = []
+    for key, (jobs, companies, low, high) in counts.items():
+        with_salary, *percentiles, avg = salaries.get(key, (0, *([None] * len(PERCENTILES)), None))
+        rows.append((key, display.get(key), jobs, companies, with_salary, low,
+                     *(float(p) if p is not None else None for p in percentiles), high, avg))
+    return rows
+
+
+def build_aggregates(conn):
+    """Recreates the stats_* tables from jobs_table (inside the caller's transaction)."""
+    started = time.perf_counter()
+    for table, ddl in AGGREGATE_DDL.items():
+        conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.execute(ddl)
+
+    conn.execute(
+        f"INSERT INTO {STATS_LOCATION_TABLE} "
+        f"SELECT clean_location, MIN(region), COUNT(*), COUNT(salary_mid), ROUND(AVG(salary_mid)) "
+        f"FROM {JOBS_TABLE} WHERE clean_location IS NOT NULL GROUP BY clean_location"
+    )
+    conn.execute(
+        f"INSERT INTO {STATS_WORK_TYPE_TABLE} "
+        f"SELECT work_type, COUNT(*), COUNT(salary_mid), ROUND(AVG(salary_mid)) "
+        f"FROM {JOBS_TABLE} WHERE work_type IS NOT NULL GROUP BY work_type"
+    )
+    conn.execute(
+        f"INSERT INTO {STATS_COMPANY_TABLE} "
+        f"SELECT company_name, COUNT(*), COUNT(DISTINCT clean_location) "
+        f"FROM {JOBS_TABLE} WHERE company_name IS NOT NULL GROUP BY company_name"
+    )
+    title_rows = _title_rows(conn)
+    conn.executemany(
+        f"INSERT INTO {STATS_TITLE_TABLE} VALUES ({', '.join('?' * (len(PERCENTILES) + 8))})", title_rows
+    )
+    conn.execute(
+        f"INSERT INTO {STATS_SUMMARY_TABLE} "
+        f"SELECT COUNT(*), COUNT(salary_mid), "
+        f"(SELECT COUNT(*) FROM {STATS_COMPANY_TABLE}), (SELECT COUNT(*) FROM {STATS_LOCATION_TABLE}), ?, "
+        f"strftime('%Y-%m-%dT%H:%M:%S', 'now') FROM {JOBS_TABLE}",
+        (len(title_rows),),
+    )
+    for ddl in AGGREGATE_INDEXES:
+        conn.execute(ddl)
+    logger.info(f"Aggregate tables rebuilt in {time.perf_counter() - started:.2f}s ({len(title_rows)} titles)")
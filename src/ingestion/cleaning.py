@@ -0,0 +1,82 @@
+"""
+Cleaning rules for scraped job postings (ported from data/data_cleaning.ipynb).
+
+clean_salary / clean_location are the original per-row rules, kept as the
+reference for benchmarks/normalize_benchmark.py; clean_chunk uses the
+vectorized normalizers in src/ingestion/normalize.py.
+"""
+
+import pandas as pd
+
+from src.ingestion.normalize import normalize_location, normalize_salary, normalize_title
+
+
+def parse_salary_number(num_str: str):
+    """Converts "10jt", "10 juta", "10m" or "500k" (already lowercased, no separators) to an int."""
+    num_str = num_str.strip()
+    multiplier = 1
+    if 'jt' in num_str or 'juta' in num_str:
+        multiplier = 1_000_000
+        num_str = num_str.replace('jt', '').replace('juta', '')
+    elif 'm' in num_str:  # M = million (juta) in these listings
+        multiplier = 1_000_000
+        num_str = num_str.replace('m', '')
+    elif 'k' in num_str:
+        multiplier = 1_000
+        num_str = num_str.replace('k', '')
+
+    try:
+        return int(float(num_str) * multiplier)
+    except ValueError:
+        return None
+
+
+def clean_salary(salary_str):
+    """
+    Parses a salary string such as "Rp 5.000.000 – Rp 7.000.000 per month".
+    Returns (min_salary, max_salary); a single value gives min == max.
+    """
+    if salary_str is None or pd.isna(salary_str) or salary_str == 'None':
+        return None, None
+
+    # Lowercase & remove noise
+    txt = str(salary_str).lower().replace('.', '').replace(',', '').replace('rp', '').replace('per month', '').strip()
+
+    # Split range (handling hyphen "-" and en-dash "–")
+    if '–' in txt:
+        parts = txt.split('–')
+    elif '-' in txt:
+        parts = txt.split('-')
+    else:
+        val = parse_salary_number(txt)
+        return val, val
+
+    return parse_salary_number(parts[0]), parse_salary_number(parts[1])
+
+
+def clean_location(loc):
+    """Simplifies "Jakarta Selatan, Jakarta Raya" to "Jakarta Selatan"."""
+    if loc is None or pd.isna(loc):
+        return "Unknown"
+    return str(loc).split(',')[0].strip()
+
+
+def clean_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds min_salary, max_salary (monthly IDR), clean_location, region,
+    work_arrangement and title_key to a chunk of raw postings.
+    Missing optional fields are filled so every chunk has the same columns.
+    """
+    df = df.copy()
+    for col in ("job_title", "company_name", "location", "work_type", "salary", "job_description"):
+        if col not in df.columns:
+            df[col] = None
+
+    salary = normalize_salary(df["salary"])
+    location = normalize_location(df["location"])
+    for col in salary.columns:
+        df[col] = salary[col]
+    for col in location.columns:
+        df[col] = location[col]
+    df["title_key"] = normalize_title(df["job_title"])
+    return df
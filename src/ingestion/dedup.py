@@ -0,0 +1,259 @@
+"""
+Near-duplicate posting detection with MinHash / LSH.
+
+Job boards repost the same role across cities and aggregators with an almost
+identical description. Each posting's job_description is reduced to word
+shingles and a MinHash signature (NUM_PERM 32-bit minima of universal hashes).
+Signatures are split into LSH bands; postings sharing a band bucket are
+candidates and are accepted as duplicates when the estimated Jaccard
+similarity (fraction of equal signature slots) reaches the threshold.
+
+The first posting of a cluster is the canonical one: only canonical postings
+are embedded and stored in Qdrant. Variants stay in jobs_table (they are real
+postings, e.g. in another city) and are recorded in job_aliases
+(alias_id -> canonical_id). Signatures and band buckets of canonical postings
+live in the same SQLite database, so later incremental runs match new
+postings against everything ingested before.
+"""
+
+import os
+import re
+import zlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.database.jobs_db import JOBS_TABLE
+from src.ingestion.schema import JOB_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 16                      # 16 bands x 8 rows: candidate pairs from ~0.7 Jaccard
+SHINGLE_SIZE = 3                # words per shingle
+MIN_TOKENS = 20                 # shorter descriptions are too generic to cluster
+DEFAULT_THRESHOLD = 0.8
+
+_TOKEN = re.compile(r"\w+")
+_ROLL = np.uint64(1_000_003)
+_BAND_KEY_MASK = np.uint64((1 << 63) - 1)
+_MAX_PARAMS = 900
+_SUB_BATCH = 512                # documents hashed together (bounds the temporary matrices)
+
+
+def _permutations(num_perm: int, seed: int = 1):
+    # Fixed seed: signatures stored in SQLite must stay comparable across runs
+    rng = np.random.default_rng(seed)
+    high = np.iinfo(np.uint64).max
+    a = rng.integers(0, high, size=num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    b = rng.integers(0, high, size=num_perm, dtype=np.uint64, endpoint=True)
+    return a, b
+
+
+def tokenize(text) -> list:
+    if text is None or text != text:
+        return []
+    return _TOKEN.findall(str(text).lower())
+
+
+def shingle_hashes(token_hashes: np.ndarray, k: int = SHINGLE_SIZE) -> np.ndarray:
+    """uint64 hashes of the k-word shingles of one document (rolling polynomial over token hashes)."""
+    n = len(token_hashes)
+    if n < k:
+        return np.empty(0, dtype=np.uint64)
+    shingles = token_hashes[: n - k + 1].copy()
+    for j in range(1, k):
+        shingles = shingles * _ROLL + token_hashes[j: n - k + 1 + j]
+    return np.unique(shingles)
+
+
+def minhash_signatures(texts: list, num_perm: int = NUM_PERM, k: int = SHINGLE_SIZE,
+                       min_tokens: int = MIN_TOKENS) -> tuple:
+    """
+    Returns (signatures uint32 [n, num_perm], valid bool [n]). Rows with fewer
+    than min_tokens words are not valid and must not be clustered.
+    """
+    docs = [tokenize(t) for t in texts]
+    # Hash each distinct token once, then broadcast with an integer take (as in normalize.py)
+    flat = [tok for doc in docs for tok in doc]
+    codes, uniques = pd.factorize(pd.Series(flat, dtype=object)) if flat else (np.empty(0, dtype=np.int64), [])
+    vocab_hashes = np.fromiter((zlib.crc32(u.encode("utf-8")) for u in uniques), dtype=np.uint64, count=len(uniques))
+    token_hashes = vocab_hashes[codes]
+
+    shingles, offset = [], 0
+    for doc in docs:
+        shingles.append(shingle_hashes(token_hashes[offset: offset + len(doc)], k))
+        offset += len(doc)
+
+    valid = np.array([len(doc) >= min_tokens for doc in docs], dtype=bool)
+    signatures = np.full((len(docs), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    a, b = _permutations(num_perm)
+    rows = np.flatnonzero(valid)
+    for start in range(0, len(rows), _SUB_BATCH):
+        batch = rows[start: start + _SUB_BATCH]
+        lengths = np.array([len(shingles[i]) for i in batch])
+        values = np.concatenate([shingles[i] for i in batch])
+        bounds = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        for p in range(0, num_perm, 16):
+            # Multiply-shift hashing: upper 32 bits of (a * x + b) mod 2**64
+            hashed = (a[p:p + 16, None] * values[None, :] + b[p:p + 16, None]) >> np.uint64(32)
+            signatures[batch, p:p + 16] = np.minimum.reduceat(hashed, bounds, axis=1).T.astype(np.uint32)
+    return signatures, valid
+
+
+def band_keys(signatures: np.ndarray, bands: int = BANDS) -> np.ndarray:
+    """int64 bucket key per (row, band)."""
+    rows_per_band = signatures.shape[1] // bands
+    _, b = _permutations(rows_per_band, seed=2)
+    mult = b | np.uint64(1)
+    sig = signatures[:, : bands * rows_per_band].astype(np.uint64).reshape(len(signatures), bands, rows_per_band)
+    keys = (sig * mult).sum(axis=2) & _BAND_KEY_MASK
+    return keys.astype(np.int64)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+
+class NearDuplicateIndex:
+    """
+    Assigns each posting to a canonical posting using the MinHash tables of
+    the jobs database (writes go through the caller's open transaction).
+    """
+
+    def __init__(self, conn, threshold: float = None, num_perm: int = NUM_PERM, bands: int = BANDS):
+        self.conn = conn
+        self.threshold = threshold or float(os.getenv("DEDUP_THRESHOLD", DEFAULT_THRESHOLD))
+        self.num_perm = num_perm
+        self.bands = bands
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS dedup_probe (row INTEGER, band INTEGER, bucket INTEGER)")
+        self.counts = {"canonical": 0, "aliases": 0, "demoted": 0, "promoted": 0}
+
+    # ---------- storage ----------
+
+    def _in(self, sql: str, ids: list) -> list:
+        rows = []
+        for start in range(0, len(ids), _MAX_PARAMS):
+            chunk = ids[start:start + _MAX_PARAMS]
+            rows.extend(self.conn.execute(sql.format(", ".join("?" * len(chunk))), chunk).fetchall())
+        return rows
+
+    def _signatures(self, ids: list) -> dict:
+        return {
+            job_id: np.frombuffer(blob, dtype=np.uint32)
+            for job_id, blob in self._in("SELECT id, signature FROM job_minhash WHERE id IN ({})", ids)
+        }
+
+    def _forget(self, ids: list):
+        """Removes postings from the index and from job_aliases (as aliases)."""
+        for sql in ("DELETE FROM job_minhash WHERE id IN ({})",
+                    "DELETE FROM job_minhash_bands WHERE id IN ({})",
+                    "DELETE FROM job_aliases WHERE alias_id IN ({})"):
+            self._in(sql, ids)
+
+    def _db_candidates(self, keys: np.ndarray, rows: np.ndarray) -> dict:
+        """{row: [canonical ids sharing a bucket]} for the given chunk rows."""
+        self.conn.execute("DELETE FROM dedup_probe")
+        self.conn.executemany(
+            "INSERT INTO dedup_probe VALUES (?, ?, ?)",
+            [(int(r), band, int(keys[r, band])) for r in rows for band in range(self.bands)],
+        )
+        candidates = {}
+        for row, job_id in self.conn.execute(
+            "SELECT DISTINCT p.row, b.id FROM dedup_probe p "
+            "JOIN job_minhash_bands b ON b.band = p.band AND b.bucket = p.bucket"
+        ):
+            candidates.setdefault(row, []).append(job_id)
+        return candidates
+
+    # ---------- assignment ----------
+
+    def assign(self, records: list) -> tuple:
+        """
+        Clusters new/changed postings against the index and each other.
+        Returns (canonical records to embed, ids of postings that became
+        aliases although they were canonical before, i.e. must leave Qdrant).
+        """
+        if not records:
+            return [], []
+        ids = [r["id"] for r in records]
+        was_canonical = {row[0] for row in self._in("SELECT id FROM job_minhash WHERE id IN ({})", ids)}
+        self._forget(ids)
+
+        signatures, valid = minhash_signatures([r.get("job_description") for r in records], self.num_perm)
+        keys = band_keys(signatures, self.bands)
+        valid_rows = np.flatnonzero(valid)
+        db_candidates = self._db_candidates(keys, valid_rows) if len(valid_rows) else {}
+        db_signatures = self._signatures(sorted({c for cs in db_candidates.values() for c in cs}))
+
+        canonical, aliases, demoted = [], [], []
+        signature_rows, band_rows = [], []
+        buckets = [{} for _ in range(self.bands)]   # chunk-local: bucket -> canonical rows
+        for i, record in enumerate(records):
+            match = None
+            if valid[i]:
+                best = self.threshold
+                for job_id in db_candidates.get(i, []):
+                    score = similarity(signatures[i], db_signatures[job_id])
+                    if score >= best:
+                        match, best = (job_id, score), score
+                seen = set()
+                for band in range(self.bands):
+                    for j in buckets[band].get(keys[i, band], ()):
+                        if j in seen:
+                            continue
+                        seen.add(j)
+                        score = similarity(signatures[i], signatures[j])
+                        if score >= best:
+                            match, best = (records[j]["id"], score), score
+
+            if match is None:
+                canonical.append(record)
+                if valid[i]:
+                    for band in range(self.bands):
+                        buckets[band].setdefault(keys[i, band], []).append(i)
+                    signature_rows.append((record["id"], signatures[i].tobytes()))
+                    band_rows.extend((band, int(keys[i, band]), record["id"]) for band in range(self.bands))
+            else:
+                canonical_id, score = match
+                aliases.append((record["id"], canonical_id, round(score, 3)))
+                if record["id"] in was_canonical:
+                    demoted.append(record["id"])
+
+        self.conn.executemany("INSERT INTO job_minhash (id, signature) VALUES (?, ?)", signature_rows)
+        self.conn.executemany("INSERT INTO job_minhash_bands (band, bucket, id) VALUES (?, ?, ?)", band_rows)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO job_aliases (alias_id, canonical_id, similarity) VALUES (?, ?, ?)", aliases
+        )
+        # Variants of a posting that just became an alias follow it to its canonical
+        self.conn.executemany(
+            "UPDATE job_aliases SET canonical_id = ? WHERE canonical_id = ?",
+            [(canonical_id, alias_id) for alias_id, canonical_id, _ in aliases],
+        )
+
+        self.counts["canonical"] += len(canonical)
+        self.counts["aliases"] += len(aliases)
+        self.counts["demoted"] += len(demoted)
+        return canonical, demoted
+
+    def remove(self, ids: list) -> list:
+        """
+        Drops deleted postings from the index. Aliases whose canonical posting
+        was deleted are clustered again; returns the ones that are now
+        canonical (they need embedding).
+        """
+        if not ids:
+            return []
+        orphans = [row[0] for row in self._in("SELECT alias_id FROM job_aliases WHERE canonical_id IN ({})", ids)]
+        self._forget(ids)
+        if not orphans:
+            return []
+        records = [
+            dict(zip(JOB_COLUMNS, row))
+            for row in self._in(f"SELECT {', '.join(JOB_COLUMNS)} FROM {JOBS_TABLE} WHERE id IN ({{}})", orphans)
+        ]
+        promoted, _ = self.assign(records)
+        self.counts["promoted"] += len(promoted)
+        return promoted
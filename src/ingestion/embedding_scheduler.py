@@ -0,0 +1,191 @@
+"""
+Concurrent, resumable embedding scheduler for ingestion.
+
+Texts are split into batches bounded by an estimated token count and item
+count, and the batches are embedded concurrently (bounded by a semaphore)
+while staying under requests-per-minute and tokens-per-minute limits.
+Failed calls are retried with exponential backoff and jitter.
+
+Every finished batch is written to the embedding cache right away, which is
+the checkpoint: after a crash the next run finds those texts in the cache
+and only the remaining ones reach the API.
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import List
+
+from src.database.embedding_cache import CachedEmbeddings, EmbeddingCache, get_embedding_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_TOKENS = 50_000    # OpenAI allows up to 300k tokens per request
+DEFAULT_BATCH_ITEMS = 512        # and up to 2048 inputs
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RPM = 3_000
+DEFAULT_TPM = 1_000_000
+DEFAULT_MAX_RETRIES = 5
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken missing or its encoding file not downloadable
+    _ENCODING = None
+
+
+def estimate_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def make_batches(texts: List[str], max_tokens: int = DEFAULT_BATCH_TOKENS, max_items: int = DEFAULT_BATCH_ITEMS) -> list:
+    """Splits texts into [(texts, estimated tokens)] batches, preserving order."""
+    batches = []
+    current, tokens = [], 0
+    for text in texts:
+        n = estimate_tokens(text)
+        if current and (tokens + n > max_tokens or len(current) >= max_items):
+            batches.append((current, tokens))
+            current, tokens = [], 0
+        current.append(text)
+        tokens += n
+    if current:
+        batches.append((current, tokens))
+    return batches
+
+
+class RateLimiter:
+    """
+    Token buckets for requests and tokens per minute. acquire() waits until
+    both budgets allow the next call.
+
+    One limiter lives for a whole ingestion run, across the event loops of
+    successive embed() calls, so its state is guarded by a thread lock and
+    the waiting happens outside it.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int):
+        tokens = min(tokens, self.tpm)  # a single oversized batch must still be able to run
+        while True:
+            with self._lock:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.rpm if self._requests < 1 else 0,
+                    (tokens - self._tokens) * 60 / self.tpm if self._tokens < tokens else 0,
+                )
+            await asyncio.sleep(wait)
+
+
+class EmbeddingScheduler:
+    """
+    Embeds large text lists with token-bounded batches, bounded concurrency,
+    RPM/TPM limits, retries and cache checkpointing.
+    """
+
+    def __init__(self, embeddings, cache: EmbeddingCache = None, concurrency: int = None, rpm: int = None,
+                 tpm: int = None, max_retries: int = DEFAULT_MAX_RETRIES, batch_tokens: int = DEFAULT_BATCH_TOKENS,
+                 batch_items: int = DEFAULT_BATCH_ITEMS):
+        if isinstance(embeddings, CachedEmbeddings):
+            # Use the wrapped model directly; cache lookups and writes are done per batch here
+            cached = embeddings
+            embeddings = cached.embeddings
+            cache = cache or cached.cache
+            self.model, self.dims = cached.model, cached.dims
+        else:
+            self.model = getattr(embeddings, "model", type(embeddings).__name__)
+            self.dims = getattr(embeddings, "dimensions", None) or 0
+        self.embeddings = embeddings
+        self.cache = cache or get_embedding_cache()
+        self.concurrency = concurrency or int(os.getenv("EMBED_CONCURRENCY", DEFAULT_CONCURRENCY))
+        self.rpm = rpm or int(os.getenv("EMBED_RPM", DEFAULT_RPM))
+        self.tpm = tpm or int(os.getenv("EMBED_TPM", DEFAULT_TPM))
+        # Shared by every embed() call, so the limits hold across the chunks of a run
+        self.limiter = RateLimiter(self.rpm, self.tpm)
+        self.max_retries = max_retries
+        self.batch_tokens = batch_tokens
+        self.batch_items = batch_items
+        self.counters = {"docs": 0, "cached": 0, "embedded": 0, "batches": 0, "retries": 0, "seconds": 0.0,
+                         "embed_seconds": 0.0}
+
+    async def _embed_batch(self, texts: List[str], tokens: int, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.limiter.acquire(tokens)
+                try:
+                    vectors = await self.embeddings.aembed_documents(texts)
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = min(60.0, 2 ** attempt) * (0.5 + random.random())
+                    self.counters["retries"] += 1
+                    logger.warning(f"Embedding batch of {len(texts)} failed ({e}); retry {attempt + 1} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+            # Checkpoint: finished batches survive a crash of the remaining run
+            self.cache.put_many(self.model, self.dims, texts, vectors)
+            self.counters["batches"] += 1
+            return vectors
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """Returns one vector per text, in order."""
+        started = time.perf_counter()
+        vectors = self.cache.get_many(self.model, self.dims, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        cached = sum(1 for v in vectors if v is not None)
+
+        if missing:
+            embed_started = time.perf_counter()
+            semaphore = asyncio.Semaphore(self.concurrency)
+            batches = make_batches(missing, self.batch_tokens, self.batch_items)
+            results = await asyncio.gather(
+                *(self._embed_batch(batch, tokens, semaphore) for batch, tokens in batches)
+            )
+            self.counters["embed_seconds"] += time.perf_counter() - embed_started
+            computed = {}
+            for (batch, _), batch_vectors in zip(batches, results):
+                computed.update(zip(batch, batch_vectors))
+            vectors = [v if v is not None else computed[t] for t, v in zip(texts, vectors)]
+
+        self.counters["docs"] += len(texts)
+        self.counters["cached"] += cached
+        self.counters["embedded"] += len(missing)
+        self.counters["seconds"] += time.perf_counter() - started
+        return vectors
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Synchronous entry point for scripts (must not be called from a running event loop)."""
+        return asyncio.run(self.aembed(texts))
+
+    def stats(self) -> dict:
+        """Counters; docs_per_sec is API throughput (cache hits are counted in `cached`, not here)."""
+        embed_seconds = self.counters["embed_seconds"]
+        return {
+            **self.counters,
+            "seconds": round(self.counters["seconds"], 2),
+            "embed_seconds": round(embed_seconds, 2),
+            "docs_per_sec": round(self.counters["embedded"] / embed_seconds, 1) if embed_seconds else 0.0,
+        }
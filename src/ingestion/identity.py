@@ -0,0 +1,46 @@
+"""
+Stable posting identity and change detection for incremental ingestion.
+
+A posting's ID is derived from what identifies it on the job board (title,
+company, raw location), so the same posting keeps its sql_id / Qdrant point
+ID across scrapes and rebuilds. The content hash covers every field that is
+stored or embedded; a different hash for a known ID means the posting changed.
+"""
+
+import hashlib
+
+import pandas as pd
+
+IDENTITY_FIELDS = ["job_title", "company_name", "location"]
+CONTENT_FIELDS = ["job_title", "company_name", "location", "work_type", "salary", "job_description"]
+
+# IDs are kept below 2**53 so they survive JSON round trips through JavaScript clients
+_ID_MASK = (1 << 53) - 1
+
+
+def _key(values) -> str:
+    # Unit separator between fields; whitespace/case differences do not create a new identity
+    return "\x1f".join("" if v is None or v != v else " ".join(str(v).split()).lower() for v in values)
+
+
+def stable_id(job_title, company_name, location) -> int:
+    """Deterministic 53-bit ID of a posting."""
+    digest = hashlib.sha256(_key((job_title, company_name, location)).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") & _ID_MASK
+
+
+def content_hash(values) -> str:
+    return hashlib.sha256("\x1f".join("" if v is None or v != v else str(v) for v in values).encode("utf-8")).hexdigest()
+
+
+def add_identity(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds id, content_hash and scraped_at to a cleaned chunk and drops repeated
+    postings inside the chunk (keeping the most recently scraped copy).
+    """
+    df = df.copy()
+    df["id"] = [stable_id(*row) for row in df[IDENTITY_FIELDS].itertuples(index=False, name=None)]
+    df["content_hash"] = [content_hash(row) for row in df[CONTENT_FIELDS].itertuples(index=False, name=None)]
+    scraped = df["_scrape_timestamp"] if "_scrape_timestamp" in df.columns else pd.Series(None, index=df.index)
+    df["scraped_at"] = scraped.astype(object).where(scraped.notna(), None)
+    return df.sort_values("scraped_at", na_position="first", kind="stable").drop_duplicates("id", keep="last")
@@ -0,0 +1,154 @@
+"""
+Vectorized salary and location normalization.
+
+Works on whole pandas columns with compiled regular expressions instead of
+per-row Python functions (see cleaning.clean_salary / clean_location for the
+original notebook rules). Salaries become numeric monthly IDR min/max
+columns; locations are split into city, region and work arrangement.
+
+Salary formats handled:
+    "Rp 5.000.000 – Rp 7.000.000 per month"   dot or comma thousands
+    "5 - 7 jt", "5,5 juta", "7.5jt"            jt/juta (million), decimal comma or dot
+    "500k", "800 rb", "800 ribu"               k/rb/ribu (thousand), "10m" = 10 million
+    "... per year" / "per hari" / "per jam"    converted to monthly
+Anything without a number ("Competitive", "None") gives NaN.
+
+Scraped dumps repeat the same strings many times, so both normalizers parse
+each distinct value once (pd.factorize) and broadcast the result back with
+an integer take.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.database.job_stats import title_key
+
+# One amount: digits with optional thousands groups and a 1-2 digit decimal part, plus a unit
+_AMOUNT = r"(\d+(?:[.,]\d{3})*(?:[.,]\d{1,2})?)\s*(juta|jt|ribu|rb|k|m)?\b"
+_RANGE_SEP = r"\s*(?:-|–|—|to|sampai|hingga|s/d|s\.d\.?)\s*(?:rp\.?\s*|idr\s*)?"
+SALARY_PATTERN = re.compile(_AMOUNT + r"(?:" + _RANGE_SEP + _AMOUNT + r")?", re.IGNORECASE)
+
+_NUMBER_PARTS = re.compile(r"^(?P<int>\d+(?:[.,]\d{3})*)(?:[.,](?P<frac>\d{1,2}))?$")
+
+UNIT_MULTIPLIERS = {
+    "juta": 1_000_000, "jt": 1_000_000, "m": 1_000_000,
+    "ribu": 1_000, "rb": 1_000, "k": 1_000,
+}
+
+# Conversion factors to a monthly amount (monthly is the default)
+PERIOD_PATTERNS = [
+    (re.compile(r"per\s*(?:year|annum|tahun)|/\s*(?:year|yr|tahun|thn)|\bannual", re.IGNORECASE), 1 / 12),
+    (re.compile(r"per\s*(?:week|minggu)|/\s*(?:week|minggu)", re.IGNORECASE), 52 / 12),
+    (re.compile(r"per\s*(?:day|hari)|/\s*(?:day|hari)", re.IGNORECASE), 22),
+    (re.compile(r"per\s*(?:hour|jam)|/\s*(?:hour|hr|jam)", re.IGNORECASE), 173),
+]
+
+_FOREIGN_CURRENCY = re.compile(r"\$|usd|sgd|eur|myr", re.IGNORECASE)
+
+ARRANGEMENT_PATTERN = re.compile(r"\((hibrid|hybrid|jarak jauh|remote|on-?site|di kantor)\)", re.IGNORECASE)
+ARRANGEMENTS = {
+    "hibrid": "hybrid", "hybrid": "hybrid",
+    "jarak jauh": "remote", "remote": "remote",
+    "onsite": "on-site", "on-site": "on-site", "di kantor": "on-site",
+}
+
+
+def _to_number(amounts: pd.Series) -> pd.Series:
+    """"5.000.000" / "5,000,000" / "7.5" / "5,5" -> float (NaN where missing)."""
+    parts = amounts.str.extract(_NUMBER_PARTS)
+    integer = pd.to_numeric(parts["int"].str.replace(r"[.,]", "", regex=True), errors="coerce")
+    frac = parts["frac"]
+    decimals = pd.to_numeric(frac, errors="coerce") / np.power(10.0, frac.str.len().fillna(0))
+    return integer + decimals.fillna(0)
+
+
+def _multiplier(units: pd.Series) -> pd.Series:
+    return units.str.lower().map(UNIT_MULTIPLIERS).astype(float)
+
+
+def _on_distinct(values: pd.Series, func) -> pd.DataFrame:
+    """Applies a column-wise normalizer to the distinct values only, then expands back."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    distinct = func(pd.Series(uniques, dtype=object).reset_index(drop=True))
+    # Append one all-missing row for the NA sentinel (-1)
+    distinct = pd.concat([distinct, distinct.iloc[:0].reindex([len(distinct)])], ignore_index=True)
+    codes = np.where(codes < 0, len(uniques), codes)
+    expanded = distinct.iloc[codes]
+    expanded.index = values.index
+    return expanded
+
+
+def normalize_salary(salaries: pd.Series) -> pd.DataFrame:
+    """
+    Returns a DataFrame with float columns min_salary and max_salary
+    (monthly IDR, NaN when no amount could be read), aligned to the input index.
+    """
+    return _on_distinct(salaries, _normalize_salary)
+
+
+def normalize_location(locations: pd.Series) -> pd.DataFrame:
+    """
+    Splits "Jakarta Selatan, Jakarta Raya\\n(Hibrid)" into
+    clean_location "Jakarta Selatan", region "Jakarta Raya" and work_arrangement "hybrid".
+    Missing locations give clean_location "Unknown".
+    """
+    result = _on_distinct(locations, _normalize_location)
+    result["clean_location"] = result["clean_location"].fillna("Unknown")
+    return result
+
+
+def normalize_title(titles: pd.Series) -> pd.Series:
+    """
+    Normalized title (lowercase, no bracketed notes or punctuation) that the
+    per-title aggregates are grouped by; see job_stats.title_key.
+    """
+    keys = _on_distinct(titles, lambda distinct: pd.DataFrame({"title_key": distinct.map(title_key)}))
+    return keys["title_key"].astype(object)
+
+
+def _normalize_salary(salaries: pd.Series) -> pd.DataFrame:
+    text = salaries.astype("string").str.replace("\xa0", " ", regex=False)
+    match = text.str.extract(SALARY_PATTERN)
+    low_amount, low_unit, high_amount, high_unit = (match[i] for i in range(4))
+
+    low = _to_number(low_amount)
+    high = _to_number(high_amount)
+
+    # "5 - 7 jt": a unit written only after the second amount applies to both
+    high_mult = _multiplier(high_unit)
+    low_mult = _multiplier(low_unit).fillna(high_mult).fillna(1.0)
+    low = low * low_mult
+    high = (high * high_mult.fillna(1.0)).fillna(low)
+
+    factor = pd.Series(1.0, index=salaries.index)
+    for pattern, to_monthly in PERIOD_PATTERNS:
+        factor = factor.mask(text.str.contains(pattern, na=False) & (factor == 1.0), to_monthly)
+    low, high = (low * factor).round(), (high * factor).round()
+
+    # Only IDR is normalized; amounts in other currencies are left out
+    foreign = text.str.contains(_FOREIGN_CURRENCY, na=False)
+    low, high = low.mask(foreign), high.mask(foreign)
+
+    swapped = high < low
+    return pd.DataFrame({
+        "min_salary": low.where(~swapped, high).astype(float),
+        "max_salary": high.where(~swapped, low).astype(float),
+    }, index=salaries.index)
+
+
+def _normalize_location(locations: pd.Series) -> pd.DataFrame:
+    text = locations.astype("string")
+    arrangement = text.str.extract(ARRANGEMENT_PATTERN, expand=False).str.lower().map(ARRANGEMENTS)
+    place = text.str.replace(ARRANGEMENT_PATTERN, "", regex=True).str.replace(r"\s+", " ", regex=True).str.strip()
+
+    city = place.str.extract(r"^([^,]+)", expand=False).str.strip()
+    region = place.str.extract(r",\s*([^,]+)$", expand=False).str.strip().fillna(city)
+
+    city = city.mask(city == "", pd.NA)
+    return pd.DataFrame({
+        "clean_location": city.fillna("Unknown").astype(object),
+        "region": region.astype(object),
+        "work_arrangement": arrangement.fillna("on-site").where(city.notna(), None).astype(object),
+    }, index=locations.index)
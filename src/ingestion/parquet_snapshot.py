@@ -0,0 +1,116 @@
+"""
+Exports jobs.db to the partitioned Parquet snapshot read by
+src/database/jobs_snapshot.py.
+
+Rows are streamed out of SQLite in record batches (ordered by region and
+location, which keeps dictionary pages small and row-group statistics
+selective) and written with pyarrow.dataset into a temporary directory that
+replaces the live snapshot only once it is complete, like the jobs.db rebuild.
+"""
+
+import os
+import json
+import time
+import shutil
+import sqlite3
+import logging
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.database.jobs_db import JOBS_TABLE
+from src.database.jobs_snapshot import (
+    MANIFEST_FILE,
+    PARTITION_COLUMN,
+    SNAPSHOT_SCHEMA,
+    resolve_snapshot_path,
+    snapshot_partitioning,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_ROWS = 50_000
+ROWS_PER_GROUP = 128 * 1024
+
+
+def _select_sql(conn) -> str:
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    canonical = "a.canonical_id" if "job_aliases" in tables else "NULL"
+    join = "LEFT JOIN job_aliases a ON a.alias_id = j.id " if "job_aliases" in tables else ""
+    columns = [f"j.{field.name}" for field in SNAPSHOT_SCHEMA if field.name != "canonical_id"]
+    columns.insert(SNAPSHOT_SCHEMA.get_field_index("canonical_id"), f"{canonical} AS canonical_id")
+    return (f"SELECT {', '.join(columns)} FROM {JOBS_TABLE} j {join}"
+            f"ORDER BY j.region, j.clean_location, j.id")
+
+
+def _to_array(values: tuple, field: pa.Field) -> pa.Array:
+    if pa.types.is_dictionary(field.type):
+        return pa.array(values, pa.string()).dictionary_encode()
+    if pa.types.is_timestamp(field.type):
+        return pa.array(values, pa.string()).cast(field.type)  # ISO 8601 text in SQLite
+    return pa.array(values, field.type)
+
+
+def iter_batches(conn, batch_rows: int = DEFAULT_BATCH_ROWS):
+    """Yields jobs_table as RecordBatches with SNAPSHOT_SCHEMA."""
+    cursor = conn.execute(_select_sql(conn))
+    while True:
+        rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            break
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [_to_array(values, field) for values, field in zip(columns, SNAPSHOT_SCHEMA)],
+            schema=SNAPSHOT_SCHEMA,
+        )
+
+
+def write_snapshot(db_path: str, path: str = None, batch_rows: int = DEFAULT_BATCH_ROWS) -> dict:
+    """Writes the snapshot of db_path and swaps it into place; returns the manifest."""
+    path = resolve_snapshot_path(path)
+    tmp_path, old_path = path + ".tmp", path + ".old"
+    for stale in (tmp_path, old_path):
+        shutil.rmtree(stale, ignore_errors=True)
+
+    started = time.perf_counter()
+    # write_dataset pulls the batch iterator from its own thread
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    written = []
+    try:
+        ds.write_dataset(
+            iter_batches(conn, batch_rows),
+            tmp_path,
+            schema=SNAPSHOT_SCHEMA,
+            format="parquet",
+            partitioning=snapshot_partitioning(),
+            basename_template="part-{i}.parquet",
+            file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+            max_rows_per_group=ROWS_PER_GROUP,
+            min_rows_per_group=min(ROWS_PER_GROUP, batch_rows),
+            file_visitor=lambda f: written.append((f.path, f.metadata.num_rows)),
+        )
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    finally:
+        conn.close()
+
+    manifest = {
+        "rows": sum(rows for _, rows in written),
+        "files": len(written),
+        "partition_by": PARTITION_COLUMN,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": os.path.abspath(db_path),
+    }
+    os.makedirs(tmp_path, exist_ok=True)  # an empty table writes no files
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    logger.info(f"Parquet snapshot: {manifest['rows']} rows in {manifest['files']} files -> {path} "
+                f"({time.perf_counter() - started:.2f}s)")
+    return manifest
@@ -0,0 +1,448 @@
+"""
+Streaming ingestion pipeline: data/raw/jobs.jsonl -> jobs.db (SQLite) + Qdrant.
+
+Replaces the manual steps in data/data_cleaning.ipynb. The JSONL file is
+read in fixed-size chunks, so memory stays flat regardless of the dump size;
+each chunk is cleaned, written to SQLite and embedded/upserted to Qdrant in
+batches before the next chunk is read.
+
+Postings have stable IDs and content hashes (src/ingestion/identity.py), so
+by default a run is incremental: only new or changed postings are written
+and embedded, and postings missing from the dump are deleted from both
+stores. A full rebuild (--full, or automatically when jobs.db does not exist
+or predates content hashes) builds the database in a temporary file and
+moves it into place only when the run succeeds.
+
+Near-duplicate postings (the same role reposted across cities and
+aggregators) are clustered with MinHash/LSH before embedding
+(src/ingestion/dedup.py): variants are kept in jobs_table and recorded in
+job_aliases, and only the canonical posting is embedded into Qdrant.
+
+After the database is committed, a partitioned Parquet snapshot of it is
+written for analytics (src/ingestion/parquet_snapshot.py) and the BM25 index
+used for hybrid retrieval is rebuilt (src/retrieval/bm25.py);
+--skip-snapshot and --skip-bm25 turn those off.
+
+With --vector-backend mmap (or VECTOR_BACKEND=mmap) the embeddings go to the
+memory-mapped vector index (src/retrieval/vector_index.py) instead of Qdrant.
+It is rebuilt after the database is committed; unchanged postings come from
+the embedding cache, so only new texts are sent to the API.
+
+Usage:
+    python -m src.ingestion.pipeline --input data/raw/jobs.jsonl
+    python -m src.ingestion.pipeline --full --skip-qdrant --chunk-size 20000
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import argparse
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from src.database.jobs_db import JOBS_TABLE, PROJECT_ROOT, resolve_db_path
+from src.ingestion.aggregates import build_aggregates
+from src.ingestion.cleaning import clean_chunk
+from src.ingestion.dedup import NearDuplicateIndex
+from src.ingestion.identity import add_identity
+from src.ingestion.schema import (
+    JOB_COLUMNS,
+    build_page_content,
+    create_schema,
+    finish_bulk_load,
+    has_incremental_columns,
+    upsert_sql,
+)
+from src.retrieval.filters import filter_payload
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_INPUT_PATH = os.path.join(PROJECT_ROOT, "data", "raw", "jobs.jsonl")
+DEFAULT_CHUNK_SIZE = 5000
+EMBEDDING_MODEL = "text-embedding-3-small"
+VECTOR_SIZE = 1536
+VECTOR_BACKENDS = ("qdrant", "mmap")
+
+
+def make_embedding_scheduler(concurrency: int = None, rpm: int = None, tpm: int = None):
+    """EmbeddingScheduler over the cached ingestion embedding model."""
+    from langchain_openai import OpenAIEmbeddings
+    from src.database.embedding_cache import CachedEmbeddings
+    from src.ingestion.embedding_scheduler import EmbeddingScheduler
+
+    # Texts embedded by an earlier run (e.g. a --full rebuild) come from the cache
+    embeddings = CachedEmbeddings(OpenAIEmbeddings(model=EMBEDDING_MODEL, api_key=os.getenv("OPENAI_API_KEY")))
+    return EmbeddingScheduler(embeddings, concurrency=concurrency, rpm=rpm, tpm=tpm)
+
+
+def iter_chunks(input_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yields DataFrames of at most chunk_size raw postings."""
+    with pd.read_json(input_path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def to_records(df: pd.DataFrame) -> list:
+    """DataFrame -> list of dicts with NaN replaced by None (SQLite/JSON friendly)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+class SQLiteSink:
+    """
+    Writes cleaned chunks to jobs.db and reports which postings actually changed.
+
+    full=True builds a fresh database at <db_path>.tmp and atomically replaces
+    the live file on finish(). full=False updates the live database in place
+    in one transaction: new and changed postings are upserted, unchanged ones
+    only get their scraped_at refreshed, and postings absent from the dump can
+    be deleted with delete_missing().
+    """
+
+    def __init__(self, db_path: str, full: bool = True):
+        self.db_path = db_path
+        self.full = full
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        if full:
+            self.path = db_path + ".tmp"
+            for path in (self.path, self.path + "-journal"):
+                if os.path.exists(path):
+                    os.remove(path)
+        else:
+            self.path = db_path
+        self.conn = sqlite3.connect(self.path, isolation_level=None)
+        if full:
+            # Bulk build of a throwaway file: durability only matters at the final rename
+            self.conn.execute("PRAGMA journal_mode = OFF")
+            self.conn.execute("PRAGMA synchronous = OFF")
+        create_schema(self.conn, bulk=full)
+        self.conn.execute("CREATE TEMP TABLE ingest_seen (id INTEGER PRIMARY KEY)")
+        self.conn.execute("BEGIN")
+        self._upsert = upsert_sql()
+        self.counts = {"new": 0, "changed": 0, "unchanged": 0, "stale": 0, "deleted": 0}
+
+    def _existing(self, ids: list) -> dict:
+        """{id: (content_hash, scraped_at)} for ids already in the database."""
+        existing = {}
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.conn.execute(
+                f"SELECT id, content_hash, scraped_at FROM {JOBS_TABLE} WHERE id IN ({placeholders})", chunk
+            ):
+                existing[row[0]] = (row[1], row[2])
+        return existing
+
+    def write(self, records: list) -> list:
+        """Stores a chunk; returns the records that are new or changed (they need embedding)."""
+        existing = self._existing([r["id"] for r in records])
+        changed, touched = [], []
+        for r in records:
+            old = existing.get(r["id"])
+            if old is None:
+                self.counts["new"] += 1
+                changed.append(r)
+            elif old[1] and r["scraped_at"] and r["scraped_at"] < old[1]:
+                self.counts["stale"] += 1  # an older copy than the one stored
+            elif old[0] != r["content_hash"]:
+                self.counts["changed"] += 1
+                changed.append(r)
+            else:
+                self.counts["unchanged"] += 1
+                touched.append((r["scraped_at"], r["id"]))
+
+        self.conn.executemany(self._upsert, [[r.get(c) for c in JOB_COLUMNS] for r in changed])
+        self.conn.executemany(
+            f"UPDATE {JOBS_TABLE} SET scraped_at = ? WHERE id = ? AND (scraped_at IS NULL OR scraped_at < ?)",
+            [(ts, job_id, ts) for ts, job_id in touched if ts is not None],
+        )
+        self.conn.executemany("INSERT OR IGNORE INTO ingest_seen (id) VALUES (?)", [(r["id"],) for r in records])
+        return changed
+
+    def delete_missing(self) -> list:
+        """Deletes postings that were not in this dump; returns their ids."""
+        ids = [row[0] for row in self.conn.execute(
+            f"SELECT id FROM {JOBS_TABLE} WHERE id NOT IN (SELECT id FROM ingest_seen)"
+        )]
+        self.conn.execute(f"DELETE FROM {JOBS_TABLE} WHERE id NOT IN (SELECT id FROM ingest_seen)")
+        self.counts["deleted"] += len(ids)
+        return ids
+
+    @property
+    def modified(self) -> bool:
+        """True when this run changed the stored postings."""
+        return self.full or bool(self.counts["new"] or self.counts["changed"] or self.counts["deleted"])
+
+    def finish(self):
+        if self.full:
+            finish_bulk_load(self.conn)
+        if self.modified:
+            build_aggregates(self.conn)
+        self.conn.execute("COMMIT")
+        # Planner statistics for the new indexes (sqlite_stat1)
+        self.conn.execute("ANALYZE")
+        self.conn.close()
+        if self.full:
+            os.replace(self.path, self.db_path)
+        logger.info(f"SQLite ({'full' if self.full else 'incremental'}): {self.counts} -> {self.db_path}")
+
+    def abort(self):
+        if self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+        self.conn.close()
+        if self.full and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class QdrantSink:
+    """
+    Embeds chunk texts through the EmbeddingScheduler and streams the points
+    into the collection through a QdrantBulkLoader (id = sql_id).
+    """
+
+    def __init__(self, collection_name: str, upsert_batch_size: int = None, recreate: bool = True,
+                 concurrency: int = None, rpm: int = None, tpm: int = None, upsert_parallel: int = None):
+        from qdrant_client.http import models
+        from src.database.setup_qdrant import get_qdrant_client, setup_collection
+        from src.ingestion.qdrant_loader import QdrantBulkLoader
+
+        self.models = models
+        self.collection_name = collection_name
+        self.client = get_qdrant_client()
+        self.scheduler = make_embedding_scheduler(concurrency, rpm, tpm)
+
+        if recreate and self.client.collection_exists(collection_name):
+            logger.info(f"Dropping existing collection '{collection_name}'")
+            self.client.delete_collection(collection_name)
+        setup_collection(collection_name, vector_size=VECTOR_SIZE, client=self.client)
+        self.loader = QdrantBulkLoader(self.client, collection_name, batch_size=upsert_batch_size, parallel=upsert_parallel)
+        self.deleted = 0
+
+    def write(self, records: list):
+        texts = [build_page_content(r) for r in records]
+        vectors = self.scheduler.embed(texts)
+        # Uploads of this chunk overlap with cleaning/embedding of the next one
+        self.loader.add_many(
+            self.models.PointStruct(
+                id=r["id"],
+                vector=vector,
+                payload={
+                    "page_content": text,
+                    "sql_id": r["id"],
+                    "company": r.get("company_name"),
+                    "title": r.get("job_title"),
+                    # Fields filtered retrieval conditions on (indexed by setup_collection)
+                    **filter_payload(r),
+                },
+            )
+            for r, text, vector in zip(records, texts, vectors)
+        )
+
+    def delete(self, ids: list):
+        # Pending upserts must land first so deletes are applied after them
+        self.loader.flush()
+        batch_size = self.loader.batch_size
+        for start in range(0, len(ids), batch_size):
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=self.models.PointIdsList(points=ids[start:start + batch_size]),
+            )
+        self.deleted += len(ids)
+
+    def finish(self):
+        self.loader.close()
+        stats = self.loader.stats()
+        logger.info(f"Qdrant: {stats['points']} points upserted, {self.deleted} deleted in '{self.collection_name}' ({stats})")
+        logger.info(f"Embedding: {self.scheduler.stats()}")
+
+    def abort(self):
+        self.loader.abort()
+
+
+def needs_full_rebuild(db_path: str) -> bool:
+    """True when there is no database to update incrementally."""
+    if not os.path.exists(db_path):
+        return True
+    conn = sqlite3.connect(db_path)
+    try:
+        return not has_incremental_columns(conn)
+    finally:
+        conn.close()
+
+
+def run_pipeline(input_path: str = None, db_path: str = None, collection_name: str = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, upsert_batch_size: int = None, upsert_parallel: int = None,
+                 skip_qdrant: bool = False, full: bool = False, delete_missing: bool = True,
+                 embed_concurrency: int = None, embed_rpm: int = None, embed_tpm: int = None,
+                 dedup: bool = True, dedup_threshold: float = None,
+                 skip_snapshot: bool = False, snapshot_path: str = None,
+                 skip_bm25: bool = False, bm25_path: str = None,
+                 vector_backend: str = None, vector_index_path: str = None) -> dict:
+    """
+    Runs the ingestion (incremental unless full=True or no usable jobs.db exists).
+    Returns {"mode", "rows", "chunks", "new", "changed", "unchanged", "stale", "deleted",
+    "canonical", "aliases", "demoted", "promoted", "embedded", "embedding_docs_per_sec", "seconds"}.
+    """
+    input_path = input_path or DEFAULT_INPUT_PATH
+    db_path = resolve_db_path(db_path)
+    collection_name = collection_name or os.getenv("QDRANT_COLLECTION_NAME", "job_market")
+    full = full or needs_full_rebuild(db_path)
+    vector_backend = (vector_backend or os.getenv("VECTOR_BACKEND", VECTOR_BACKENDS[0])).lower()
+    if vector_backend not in VECTOR_BACKENDS:
+        raise ValueError(f"Unknown vector backend '{vector_backend}' (expected one of {VECTOR_BACKENDS})")
+
+    sql_sink = SQLiteSink(db_path, full=full)
+    duplicates = NearDuplicateIndex(sql_sink.conn, threshold=dedup_threshold) if dedup else None
+    vector_sink = None if skip_qdrant or vector_backend != "qdrant" else QdrantSink(
+        collection_name, upsert_batch_size, recreate=full, upsert_parallel=upsert_parallel,
+        concurrency=embed_concurrency, rpm=embed_rpm, tpm=embed_tpm,
+    )
+
+    started = time.perf_counter()
+    rows = 0
+    chunks = 0
+    embedded = 0
+    try:
+        for raw in iter_chunks(input_path, chunk_size):
+            df = add_identity(clean_chunk(raw))
+            records = to_records(df)
+            changed = sql_sink.write(records)
+            to_embed, demoted = duplicates.assign(changed) if duplicates is not None else (changed, [])
+            if vector_sink is not None:
+                if demoted:
+                    vector_sink.delete(demoted)
+                if to_embed:
+                    vector_sink.write(to_embed)
+            rows += len(raw)
+            embedded += len(to_embed)
+
+            chunks += 1
+            progress = (f"Chunk {chunks}: {len(records)} postings, {len(changed)} new/changed, "
+                        f"{len(changed) - len(to_embed)} near-duplicates ({rows} rows read)")
+            if vector_sink is not None:
+                progress += f", embedding {vector_sink.scheduler.stats()['docs_per_sec']} docs/sec"
+            logger.info(progress)
+
+        if delete_missing and not full:
+            removed = sql_sink.delete_missing()
+            # Variants of a deleted canonical posting take its place in Qdrant
+            promoted = duplicates.remove(removed) if duplicates is not None else []
+            embedded += len(promoted)
+            if vector_sink is not None and removed:
+                vector_sink.delete(removed)
+            if vector_sink is not None and promoted:
+                vector_sink.write(promoted)
+        # Buffered points and wait=False upload errors surface here. This must
+        # happen before the SQL commit: once the new content hashes are stored,
+        # the next incremental run treats these postings as already embedded.
+        if vector_sink is not None:
+            vector_sink.finish()
+    except Exception:
+        sql_sink.abort()
+        if vector_sink is not None:
+            vector_sink.abort()
+        raise
+
+    sql_sink.finish()
+    if not skip_snapshot:
+        from src.database.jobs_snapshot import MANIFEST_FILE, resolve_snapshot_path
+        from src.ingestion.parquet_snapshot import write_snapshot
+
+        snapshot_path = resolve_snapshot_path(snapshot_path)
+        if sql_sink.modified or not os.path.exists(os.path.join(snapshot_path, MANIFEST_FILE)):
+            write_snapshot(db_path, snapshot_path)
+    if not skip_bm25:
+        from src.retrieval.bm25 import TERMS_FILE, build_index, resolve_index_path
+
+        bm25_path = resolve_index_path(bm25_path)
+        if sql_sink.modified or not os.path.exists(os.path.join(bm25_path, TERMS_FILE)):
+            build_index(db_path, bm25_path)
+    scheduler = vector_sink.scheduler if vector_sink is not None else None
+    if vector_backend == "mmap" and not skip_qdrant:
+        from src.retrieval import vector_index
+
+        vector_index_path = vector_index.resolve_index_path(vector_index_path)
+        if sql_sink.modified or not os.path.exists(os.path.join(vector_index_path, vector_index.META_FILE)):
+            scheduler = make_embedding_scheduler(embed_concurrency, embed_rpm, embed_tpm)
+            embedded = vector_index.build_index(db_path, scheduler.embed, vector_index_path, model=EMBEDDING_MODEL)["count"]
+            logger.info(f"Embedding: {scheduler.stats()}")
+
+    if scheduler is None:
+        embedded = 0  # skip_qdrant: postings were counted for embedding, but nothing embedded them
+    elapsed = time.perf_counter() - started
+    if duplicates is not None:
+        logger.info(f"Near-duplicates: {duplicates.counts}")
+    logger.info(f"Ingestion finished: {rows} rows, {embedded} embedded in {elapsed:.1f}s")
+    return {
+        "mode": "full" if full else "incremental",
+        "rows": rows,
+        "chunks": chunks,
+        **sql_sink.counts,
+        **(duplicates.counts if duplicates is not None else {}),
+        "embedded": embedded,
+        "embedding_docs_per_sec": scheduler.stats()["docs_per_sec"] if scheduler is not None else 0.0,
+        "seconds": round(elapsed, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest scraped job postings into SQLite and Qdrant.")
+    parser.add_argument("--input", default=DEFAULT_INPUT_PATH, help="Path to the raw JSONL dump")
+    parser.add_argument("--db", default=None, help="Target SQLite database (default: SQLITE_DB_PATH or data/processed/jobs.db)")
+    parser.add_argument("--collection", default=None, help="Qdrant collection (default: QDRANT_COLLECTION_NAME or job_market)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows read per chunk")
+    parser.add_argument("--upsert-batch-size", type=int, default=None, help="Points per Qdrant upsert (default: QDRANT_UPSERT_BATCH_SIZE or 256)")
+    parser.add_argument("--upsert-parallel", type=int, default=None, help="Parallel Qdrant upserts (default: QDRANT_UPSERT_PARALLEL or 4)")
+    parser.add_argument("--embed-concurrency", type=int, default=None, help="Parallel embedding requests (default: EMBED_CONCURRENCY or 4)")
+    parser.add_argument("--embed-rpm", type=int, default=None, help="Embedding requests per minute (default: EMBED_RPM or 3000)")
+    parser.add_argument("--embed-tpm", type=int, default=None, help="Embedding tokens per minute (default: EMBED_TPM or 1000000)")
+    parser.add_argument("--skip-qdrant", action="store_true", help="Only update the SQLite database (the vector store will not receive these changes)")
+    parser.add_argument("--vector-backend", choices=VECTOR_BACKENDS, default=None,
+                        help="Where embeddings are stored (default: VECTOR_BACKEND or qdrant)")
+    parser.add_argument("--vector-index-path", default=None,
+                        help="Memory-mapped vector index directory for --vector-backend mmap "
+                             "(default: VECTOR_INDEX_PATH or data/processed/vector_index)")
+    parser.add_argument("--full", action="store_true", help="Rebuild jobs.db and recreate the collection from scratch")
+    parser.add_argument("--keep-missing", action="store_true",
+                        help="Do not delete postings absent from the input (for partial dumps)")
+    parser.add_argument("--skip-snapshot", action="store_true", help="Do not write the Parquet analytics snapshot")
+    parser.add_argument("--snapshot-path", default=None,
+                        help="Parquet snapshot directory (default: JOBS_SNAPSHOT_PATH or data/processed/jobs_parquet)")
+    parser.add_argument("--skip-bm25", action="store_true", help="Do not rebuild the BM25 index for hybrid retrieval")
+    parser.add_argument("--bm25-path", default=None,
+                        help="BM25 index directory (default: BM25_INDEX_PATH or data/processed/bm25_index)")
+    parser.add_argument("--no-dedup", action="store_true", help="Embed near-duplicate postings instead of aliasing them")
+    parser.add_argument("--dedup-threshold", type=float, default=None,
+                        help="Estimated Jaccard similarity of descriptions for near-duplicates (default: DEDUP_THRESHOLD or 0.8)")
+    args = parser.parse_args(argv)
+
+    run_pipeline(
+        input_path=args.input,
+        db_path=args.db,
+        collection_name=args.collection,
+        chunk_size=args.chunk_size,
+        upsert_batch_size=args.upsert_batch_size,
+        upsert_parallel=args.upsert_parallel,
+        skip_qdrant=args.skip_qdrant,
+        full=args.full,
+        delete_missing=not args.keep_missing,
+        embed_concurrency=args.embed_concurrency,
+        embed_rpm=args.embed_rpm,
+        embed_tpm=args.embed_tpm,
+        dedup=not args.no_dedup,
+        dedup_threshold=args.dedup_threshold,
+        skip_snapshot=args.skip_snapshot,
+        snapshot_path=args.snapshot_path,
+        skip_bm25=args.skip_bm25,
+        bm25_path=args.bm25_path,
+        vector_backend=args.vector_backend,
+        vector_index_path=args.vector_index_path,
+    )
+
+
+if __name__ == "__main__":
+    main()
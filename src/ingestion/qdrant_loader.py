@@ -0,0 +1,150 @@
+"""
+Streaming bulk loader for Qdrant.
+
+Points are added one at a time as the embedding stage produces them, grouped
+into batches and upserted by a small thread pool with wait=False, so the
+server acknowledges a batch as soon as it is queued. A semaphore bounds the
+number of batches in flight: when uploads fall behind, add() blocks the
+producer instead of letting points pile up in memory.
+
+flush() waits for all submitted batches and then runs a consistency barrier:
+the last batch is upserted again with wait=True. Qdrant applies updates to a
+shard in order, so once that call returns every earlier batch is applied
+and searchable.
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.database.setup_qdrant import is_local_client
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_PARALLEL = 4
+DEFAULT_MAX_RETRIES = 3
+
+
+class QdrantBulkLoader:
+    """
+    Batched, parallel, back-pressured upserts into one collection.
+    """
+
+    def __init__(self, client, collection_name: str, batch_size: int = None, parallel: int = None,
+                 max_pending: int = None, max_retries: int = DEFAULT_MAX_RETRIES):
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = batch_size or int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+        parallel = parallel or int(os.getenv("QDRANT_UPSERT_PARALLEL", DEFAULT_PARALLEL))
+        # The local (embedded) mode does the indexing work in this process; threads only add contention
+        self.local = is_local_client(client)
+        self.parallel = 1 if self.local else parallel
+        self.max_pending = max_pending or self.parallel * 2
+        self.max_retries = max_retries
+
+        self._executor = ThreadPoolExecutor(max_workers=self.parallel, thread_name_prefix="qdrant-upsert")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._buffer = []
+        self._futures = []
+        self._last_batch = None
+        self._lock = threading.Lock()
+        self._started = None
+        self._finished = None
+        self.points = 0
+        self.batches = 0
+        self.blocked_seconds = 0.0
+
+    # ---------- producer side ----------
+
+    def add(self, point):
+        if self._started is None:
+            self._started = time.perf_counter()
+        self._finished = None
+        self._buffer.append(point)
+        if len(self._buffer) >= self.batch_size:
+            self._submit(self._buffer)
+            self._buffer = []
+
+    def add_many(self, points):
+        for point in points:
+            self.add(point)
+
+    def _submit(self, batch: list):
+        waited = time.perf_counter()
+        self._slots.acquire()  # back-pressure: blocks while max_pending batches are in flight
+        self.blocked_seconds += time.perf_counter() - waited
+        future = self._executor.submit(self._upload, batch)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures = [f for f in self._futures if not f.done() or f.exception()]
+        self._futures.append(future)
+        self._last_batch = batch
+
+    # ---------- upload side ----------
+
+    def _upload(self, batch: list):
+        # upload_points (unlike upsert) inspects only the first point for local-inference
+        # models instead of walking every vector, and retries rate-limited requests itself
+        self.client.upload_points(
+            collection_name=self.collection_name,
+            points=batch,
+            batch_size=len(batch),
+            parallel=1,
+            max_retries=self.max_retries,
+            wait=False,
+        )
+        with self._lock:
+            self.points += len(batch)
+            self.batches += 1
+
+    def flush(self):
+        """Uploads buffered points, waits for every batch and applies the consistency barrier."""
+        if self._buffer:
+            self._submit(self._buffer)
+            self._buffer = []
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()  # re-raises the first failed batch
+        # Local mode applies upserts synchronously, so it needs no barrier
+        if self._last_batch is not None and not self.local:
+            self.client.upload_points(
+                collection_name=self.collection_name,
+                points=self._last_batch,
+                batch_size=len(self._last_batch),
+                max_retries=self.max_retries,
+                wait=True,
+            )
+        self._last_batch = None
+        self._finished = time.perf_counter()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def abort(self):
+        """Drops buffered and not-yet-started batches (used when the ingestion run fails)."""
+        self._buffer = []
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def stats(self) -> dict:
+        end = self._finished or time.perf_counter()
+        seconds = end - self._started if self._started else 0.0
+        return {
+            "points": self.points,
+            "batches": self.batches,
+            "batch_size": self.batch_size,
+            "parallel": self.parallel,
+            "max_pending": self.max_pending,
+            "blocked_seconds": round(self.blocked_seconds, 2),
+            "points_per_sec": round(self.points / seconds, 1) if seconds else 0.0,
+        }
@@ -0,0 +1,187 @@
+"""
+Explicit SQLite schema for the processed jobs database.
+
+The notebook let pandas infer column types; the ingestion pipeline creates
+the table from this DDL so types (and the INTEGER PRIMARY KEY used for
+sql_id lookups) no longer depend on what the first chunk happened to contain.
+
+Beyond the table itself the schema has:
+  - generated salary columns (salary_low / salary_high / salary_mid) that fill
+    in a missing bound, so salary filters and averages need no COALESCE;
+  - B-tree indexes on the columns generated SQL filters on;
+  - jobs_fts, an FTS5 index over job_title and job_description, kept in sync
+    with jobs_table by triggers.
+
+A full rebuild creates the table bare (bulk=True) and adds the indexes, the
+FTS content and the triggers once in finish_bulk_load(), which is much faster
+than maintaining them row by row.
+"""
+
+from src.database.jobs_db import JOBS_TABLE
+
+# Insert order of the columns below (id first)
+JOB_COLUMNS = [
+    "id",
+    "job_title",
+    "company_name",
+    "clean_location",
+    "work_type",
+    "min_salary",
+    "max_salary",
+    "job_description",
+    "region",
+    "work_arrangement",
+    "title_key",
+    "content_hash",
+    "scraped_at",
+]
+
+JOBS_DDL = f"""
+CREATE TABLE IF NOT EXISTS {JOBS_TABLE} (
+    id INTEGER PRIMARY KEY,
+    -- NOCASE: "= 'jakarta selatan'" and prefix LIKE (case-insensitive) can both use the indexes
+    job_title TEXT COLLATE NOCASE,
+    company_name TEXT,
+    clean_location TEXT COLLATE NOCASE,
+    work_type TEXT,
+    min_salary REAL,
+    max_salary REAL,
+    job_description TEXT,
+    region TEXT,
+    work_arrangement TEXT,
+    title_key TEXT,
+    content_hash TEXT,
+    scraped_at TEXT,
+    salary_low REAL GENERATED ALWAYS AS (COALESCE(min_salary, max_salary)) VIRTUAL,
+    salary_high REAL GENERATED ALWAYS AS (COALESCE(max_salary, min_salary)) VIRTUAL,
+    salary_mid REAL GENERATED ALWAYS AS ((salary_low + salary_high) / 2.0) VIRTUAL
+)
+"""
+
+INDEX_DDL = [
+    f"CREATE INDEX IF NOT EXISTS idx_jobs_job_title ON {JOBS_TABLE} (job_title)",
+    f"CREATE INDEX IF NOT EXISTS idx_jobs_clean_location ON {JOBS_TABLE} (clean_location)",
+    f"CREATE INDEX IF NOT EXISTS idx_jobs_work_type ON {JOBS_TABLE} (work_type)",
+    f"CREATE INDEX IF NOT EXISTS idx_jobs_min_salary ON {JOBS_TABLE} (min_salary)",
+    f"CREATE INDEX IF NOT EXISTS idx_jobs_max_salary ON {JOBS_TABLE} (max_salary)",
+    f"CREATE INDEX IF NOT EXISTS idx_jobs_salary_mid ON {JOBS_TABLE} (salary_mid)",
+    f"CREATE INDEX IF NOT EXISTS idx_jobs_title_key ON {JOBS_TABLE} (title_key)",
+]
+
+FTS_TABLE = "jobs_fts"
+
+# External-content FTS5 table: the text lives only in jobs_table, rowid = jobs_table.id
+FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"job_title, job_description, content='{JOBS_TABLE}', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')"
+)
+
+FTS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {JOBS_TABLE}_fts_insert AFTER INSERT ON {JOBS_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, job_title, job_description)
+        VALUES (new.id, new.job_title, new.job_description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {JOBS_TABLE}_fts_delete AFTER DELETE ON {JOBS_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, job_title, job_description)
+        VALUES ('delete', old.id, old.job_title, old.job_description);
+    END
+    """,
+    # Only text changes touch the index (incremental runs also refresh scraped_at)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {JOBS_TABLE}_fts_update AFTER UPDATE OF job_title, job_description ON {JOBS_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, job_title, job_description)
+        VALUES ('delete', old.id, old.job_title, old.job_description);
+        INSERT INTO {FTS_TABLE} (rowid, job_title, job_description)
+        VALUES (new.id, new.job_title, new.job_description);
+    END
+    """,
+]
+
+# Near-duplicate clustering (src/ingestion/dedup.py): MinHash signatures and LSH
+# buckets of canonical postings, and the variants that were folded into them
+DEDUP_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS job_aliases (
+        alias_id INTEGER PRIMARY KEY,
+        canonical_id INTEGER NOT NULL,
+        similarity REAL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_job_aliases_canonical ON job_aliases (canonical_id)",
+    """
+    CREATE TABLE IF NOT EXISTS job_minhash (
+        id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS job_minhash_bands (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (band, bucket, id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_job_minhash_bands_id ON job_minhash_bands (id)",
+]
+
+
+def create_schema(conn, bulk: bool = False):
+    """
+    Creates the jobs and near-duplicate tables on a writable connection.
+    With bulk=True the indexes and FTS triggers are left to finish_bulk_load().
+    """
+    conn.execute(JOBS_DDL)
+    conn.execute(FTS_DDL)
+    for ddl in DEDUP_DDL:
+        conn.execute(ddl)
+    if not bulk:
+        for ddl in INDEX_DDL + FTS_TRIGGERS:
+            conn.execute(ddl)
+    conn.commit()
+
+
+def finish_bulk_load(conn):
+    """Builds the indexes and the full-text index of a bulk-loaded table and installs the FTS triggers."""
+    for ddl in INDEX_DDL:
+        conn.execute(ddl)
+    conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    for ddl in FTS_TRIGGERS:
+        conn.execute(ddl)
+
+
+def has_incremental_columns(conn) -> bool:
+    """
+    False for databases built before content hashes, near-duplicate tables
+    or the indexed/FTS schema existed (they need a full rebuild).
+    """
+    # table_xinfo also lists generated columns
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({JOBS_TABLE})")}
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return {"content_hash", "scraped_at", "salary_mid", "title_key"} <= columns and {"job_minhash", FTS_TABLE} <= tables
+
+
+def upsert_sql() -> str:
+    """Insert-or-update by id; an older scrape never overwrites a newer one."""
+    placeholders = ", ".join("?" * len(JOB_COLUMNS))
+    updates = ", ".join(f"{c} = excluded.{c}" for c in JOB_COLUMNS if c != "id")
+    return (
+        f"INSERT INTO {JOBS_TABLE} ({', '.join(JOB_COLUMNS)}) VALUES ({placeholders}) "
+        f"ON CONFLICT(id) DO UPDATE SET {updates} "
+        f"WHERE excluded.scraped_at IS NULL OR {JOBS_TABLE}.scraped_at IS NULL "
+        f"OR excluded.scraped_at >= {JOBS_TABLE}.scraped_at"
+    )
+
+
+def build_page_content(row: dict) -> str:
+    """Text that is embedded and stored as the Qdrant payload's page_content (also what BM25 indexes)."""
+    return f"""
+    Job Title: {row.get('job_title') or ''}
+    Company: {row.get('company_name') or ''}
+    Location: {row.get('clean_location') or ''}
+    Description: {row.get('job_description') or ''}
+    """
@@ -0,0 +1,247 @@
+"""
+Okapi BM25 index over the embedded job texts, for exact-term retrieval.
+
+Dense search ranks "SAP ABAP" or "Tableau" by meaning, so postings that name
+the exact skill can lose to loosely related ones, and every query pays for an
+embedding call. This index scores the same texts that are embedded into
+Qdrant (src/retrieval/documents.py) by term overlap instead.
+
+Ingestion writes it as plain .npy arrays in data/processed/bm25_index:
+
+    doc_ids.npy     int64[docs]     jobs_table.id of each document
+    offsets.npy     int64[terms+1]  start of each term's postings
+    postings.npy    int32[n]        document numbers, grouped by term
+    weights.npy     float32[n]      BM25 term-frequency part of each posting
+    terms.json                      vocabulary (position = term id) + parameters
+
+The weights already include the k1/b length normalization, so scoring a
+query is idf * sum of weights over its terms' postings. Loading memory-maps
+the arrays; only the postings of the query terms are paged in.
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import sqlite3
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.database.jobs_db import PROJECT_ROOT
+from src.retrieval.documents import iter_documents
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "bm25_index")
+TERMS_FILE = "terms.json"
+K1 = 1.2
+B = 0.75
+BATCH_ROWS = 5000
+
+# "c++", "c#", "node.js" and ".net" stay single tokens
+_TOKEN = re.compile(r"\.?\w+(?:\.\w+)*[+#]*")
+
+# English and Indonesian function words; they match most postings and carry no signal
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have i in is it of on or our the this to we will with you your
+ada adalah akan anda atau bagi dalam dan dari dengan di ini itu ke kami kamu kita oleh pada para
+sebagai serta untuk yang
+""".split())
+
+# Words that mark a natural-language question rather than a keyword search
+QUESTION_WORDS = frozenset("""
+what which how why who where when whats does do can should
+apa apakah bagaimana gimana mengapa kenapa siapa dimana mana kapan berapa bisakah
+""".split())
+
+MAX_KEYWORD_TERMS = 4
+
+_IGNORED = STOPWORDS | QUESTION_WORDS
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens without accents, numbers, stopwords or question words."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return [t for t in _TOKEN.findall(text) if t not in _IGNORED and not t.strip(".").isdigit()]
+
+
+def resolve_index_path(path: str = None) -> str:
+    """Explicit argument, BM25_INDEX_PATH environment variable, default location."""
+    return os.path.abspath(path or os.getenv("BM25_INDEX_PATH") or DEFAULT_INDEX_PATH)
+
+
+def build_index(db_path: str, path: str = None, k1: float = K1, b: float = B) -> dict:
+    """
+    Builds the index of db_path into a temporary directory and swaps it into
+    place; returns {"docs", "terms", "postings", "avg_doc_len", "seconds"}.
+    """
+    path = resolve_index_path(path)
+    tmp_path, old_path = path + ".tmp", path + ".old"
+    for stale in (tmp_path, old_path):
+        shutil.rmtree(stale, ignore_errors=True)
+
+    started = time.perf_counter()
+    vocabulary = {}
+    doc_ids, doc_lens = [], []
+    term_parts, doc_parts, tf_parts = [], [], []
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        batch_terms, batch_docs, batch_tfs = [], [], []
+        for documents in iter_documents(conn, BATCH_ROWS):
+            for doc_id, text in documents:
+                tokens = tokenize(text)
+                doc_number = len(doc_ids)
+                doc_ids.append(doc_id)
+                doc_lens.append(len(tokens))
+                for term, tf in Counter(tokens).items():
+                    batch_terms.append(vocabulary.setdefault(term, len(vocabulary)))
+                    batch_docs.append(doc_number)
+                    batch_tfs.append(tf)
+            if len(batch_terms) >= 1_000_000:
+                term_parts.append(np.array(batch_terms, dtype=np.int32))
+                doc_parts.append(np.array(batch_docs, dtype=np.int32))
+                tf_parts.append(np.array(batch_tfs, dtype=np.float32))
+                batch_terms, batch_docs, batch_tfs = [], [], []
+        term_parts.append(np.array(batch_terms, dtype=np.int32))
+        doc_parts.append(np.array(batch_docs, dtype=np.int32))
+        tf_parts.append(np.array(batch_tfs, dtype=np.float32))
+    finally:
+        conn.close()
+
+    terms = np.concatenate(term_parts)
+    docs = np.concatenate(doc_parts)
+    tfs = np.concatenate(tf_parts)
+    lengths = np.array(doc_lens, dtype=np.float32)
+    avg_len = float(lengths.mean()) if len(lengths) else 0.0
+
+    # Group postings by term (stable: documents stay in ascending order within a term)
+    order = np.argsort(terms, kind="stable")
+    docs, tfs = docs[order], tfs[order]
+    offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(terms, minlength=len(vocabulary)), out=offsets[1:])
+    norm = k1 * (1 - b + b * lengths[docs] / avg_len) if avg_len else np.full(len(docs), k1, dtype=np.float32)
+    weights = (tfs * (k1 + 1) / (tfs + norm)).astype(np.float32)
+
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, "doc_ids.npy"), np.array(doc_ids, dtype=np.int64))
+    np.save(os.path.join(tmp_path, "offsets.npy"), offsets)
+    np.save(os.path.join(tmp_path, "postings.npy"), docs)
+    np.save(os.path.join(tmp_path, "weights.npy"), weights)
+    meta = {
+        "docs": len(doc_ids),
+        "terms": len(vocabulary),
+        "postings": int(len(docs)),
+        "avg_doc_len": round(avg_len, 2),
+        "k1": k1,
+        "b": b,
+        "source": os.path.abspath(db_path),
+    }
+    # Written last: its presence marks a complete index
+    with open(os.path.join(tmp_path, TERMS_FILE), "w", encoding="utf-8") as f:
+        json.dump({**meta, "vocabulary": sorted(vocabulary, key=vocabulary.get)}, f, ensure_ascii=False)
+
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    meta["seconds"] = round(time.perf_counter() - started, 2)
+    logger.info(f"BM25 index: {meta['docs']} docs, {meta['terms']} terms, {meta['postings']} postings "
+                f"-> {path} ({meta['seconds']:.2f}s)")
+    return meta
+
+
+class BM25Index:
+    """
+    Read side of the index: memory-mapped arrays plus the vocabulary.
+    Thread-safe (searches only read).
+    """
+
+    def __init__(self, path: str = None):
+        self.path = resolve_index_path(path)
+        with open(os.path.join(self.path, TERMS_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.term_ids = {term: i for i, term in enumerate(meta.pop("vocabulary"))}
+        self.meta = meta
+        self.doc_ids = np.load(os.path.join(self.path, "doc_ids.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(self.path, "offsets.npy"), mmap_mode="r")
+        self.postings = np.load(os.path.join(self.path, "postings.npy"), mmap_mode="r")
+        self.weights = np.load(os.path.join(self.path, "weights.npy"), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def known_terms(self, query: str) -> Tuple[List[str], List[str]]:
+        """(terms of the query present in the index, terms that are not)."""
+        known, unknown = [], []
+        for term in dict.fromkeys(tokenize(query)):
+            (known if term in self.term_ids else unknown).append(term)
+        return known, unknown
+
+    def is_keyword_query(self, query: str, max_terms: int = MAX_KEYWORD_TERMS) -> bool:
+        """
+        True for short keyword searches ("SAP ABAP", "tableau jakarta") whose
+        terms are all in the index: BM25 alone answers them well, so they need
+        no embedding. Questions and sentences are left to dense/hybrid search.
+        """
+        if "?" in query:
+            return False
+        words = _TOKEN.findall(query.lower())
+        if not words or len(words) > max_terms or any(w in _IGNORED for w in words):
+            return False
+        known, unknown = self.known_terms(query)
+        return bool(known) and not unknown
+
+    def search(self, query: str, limit: int = 10, allowed_ids=None) -> List[Tuple[int, float]]:
+        """
+        Top `limit` (jobs_table.id, score) pairs for the query, best first.
+        allowed_ids (e.g. JobFilter.matching_ids()) restricts the result to those postings.
+        """
+        known, _ = self.known_terms(query)
+        if not known or not len(self.doc_ids):
+            return []
+        n_docs = len(self.doc_ids)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        for term in known:
+            term_id = self.term_ids[term]
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            df = end - start
+            idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+            # A document appears once per term, so the fancy-indexed add is exact
+            scores[self.postings[start:end]] += idf * self.weights[start:end]
+        if allowed_ids is not None:
+            scores[~np.isin(self.doc_ids, allowed_ids)] = 0
+
+        limit = min(limit, n_docs)
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.doc_ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_bm25_index(path: str = None) -> Optional[BM25Index]:
+    """
+    Process-wide index per directory, reloaded when ingestion replaces it.
+    None when no index has been built.
+    """
+    path = resolve_index_path(path)
+    try:
+        version = os.stat(os.path.join(path, TERMS_FILE)).st_mtime_ns
+    except OSError:
+        return None
+    with _indexes_lock:
+        cached = _indexes.get(path)
+        if cached is None or cached[0] != version:
+            cached = _indexes[path] = (version, BM25Index(path))
+        return cached[1]
@@ -0,0 +1,62 @@
+"""
+The documents the retrieval indexes are built over, and their payloads.
+
+Every index (the Qdrant collection, BM25, the memory-mapped vector index)
+covers the same set: canonical postings (near-duplicate variants listed in
+job_aliases are left out), each represented by build_page_content(). Indexes
+other than Qdrant store only jobs_table ids; fetch_payloads() turns hits
+back into the payload shape the pipeline writes to Qdrant.
+"""
+
+from typing import Iterable
+
+from src.database.jobs_db import JOBS_TABLE, get_readonly_pool
+from src.ingestion.schema import build_page_content
+
+_COLUMNS = "id, job_title, company_name, clean_location, job_description"
+
+
+def _canonical_filter(conn) -> str:
+    tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return "WHERE id NOT IN (SELECT alias_id FROM job_aliases) " if "job_aliases" in tables else ""
+
+
+def count_documents(conn) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM {JOBS_TABLE} {_canonical_filter(conn)}").fetchone()[0]
+
+
+def iter_documents(conn, batch_rows: int = 5000):
+    """Yields lists of (id, text) for every canonical posting, in id order."""
+    cursor = conn.execute(f"SELECT {_COLUMNS} FROM {JOBS_TABLE} {_canonical_filter(conn)}ORDER BY id")
+    columns = [d[0] for d in cursor.description]
+    while True:
+        rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            break
+        batch = []
+        for row in rows:
+            record = dict(zip(columns, row))
+            batch.append((record["id"], build_page_content(record)))
+        yield batch
+
+
+def fetch_payloads(ids: Iterable[int], db_path: str = None) -> dict:
+    """
+    {id: {"page_content", "sql_id", "company", "title"}} for the given jobs_table
+    ids; ids deleted since an index was built are absent.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return {}
+    rows = get_readonly_pool(db_path).execute(
+        f"SELECT {_COLUMNS} FROM {JOBS_TABLE} WHERE id IN ({', '.join('?' * len(ids))})", ids
+    )
+    return {
+        row["id"]: {
+            "page_content": build_page_content(dict(row)),
+            "sql_id": row["id"],
+            "company": row["company_name"],
+            "title": row["job_title"],
+        }
+        for row in rows
+    }
@@ -0,0 +1,196 @@
+"""
+Structured filters for job retrieval, pushed down into the search.
+
+retrieve_documents used to take the top-k nearest postings and leave
+"remote, in Jakarta, above 10 jt" to the LLM, so most of the k slots went to
+postings the user had excluded. A JobFilter is applied inside the search
+instead: as a Qdrant payload filter on indexed fields (setup_collection
+creates the indexes), or as a SQL condition on jobs_table that selects the
+candidate ids for the BM25 and memory-mapped indexes.
+
+Both translations have the same semantics:
+
+  location           any of the names, as whole words of the posting's
+                     clean_location or region ("jakarta" matches
+                     "Jakarta Selatan"; "tangerang" matches "South Tangerang")
+  work_type,         any of the values, case-insensitive
+  work_arrangement,
+  company
+  min_salary         the posting can pay at least this much (upper bound >= min)
+  max_salary         the posting starts at or below this (lower bound <= max)
+  posted_within_days scraped at most this many days ago
+
+Postings without a salary never match a salary filter.
+
+The indexes hold canonical postings only (near-duplicate variants are listed
+in job_aliases), so a variant that passes the filter, e.g. the same opening
+posted in another city, is represented by its canonical posting.
+"""
+
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.database.jobs_db import JOBS_TABLE, get_readonly_pool, like_escape
+
+Values = Union[str, Sequence[str], None]
+
+# Payload fields written by the ingestion pipeline and indexed by setup_collection
+LOCATION_KEYS_FIELD = "location_keys"
+WORK_TYPE_FIELD = "work_type"
+WORK_ARRANGEMENT_FIELD = "work_arrangement"
+COMPANY_FIELD = "company_key"
+SALARY_LOW_FIELD = "salary_low"
+SALARY_HIGH_FIELD = "salary_high"
+SCRAPED_AT_FIELD = "scraped_at"
+
+KEYWORD_FIELDS = [LOCATION_KEYS_FIELD, WORK_TYPE_FIELD, WORK_ARRANGEMENT_FIELD, COMPANY_FIELD]
+FLOAT_FIELDS = [SALARY_LOW_FIELD, SALARY_HIGH_FIELD]
+DATETIME_FIELDS = [SCRAPED_AT_FIELD]
+
+
+def normalize_key(value) -> Optional[str]:
+    """Lower-cased, whitespace-collapsed form used for keyword payload fields."""
+    if value is None or value != value:
+        return None
+    return " ".join(str(value).lower().split()) or None
+
+
+def location_keys(clean_location, region) -> list:
+    """Every contiguous word sequence of the location and region names, normalized."""
+    keys = []
+    for name in (clean_location, region):
+        words = (normalize_key(name) or "").split()
+        for start in range(len(words)):
+            for end in range(start + 1, len(words) + 1):
+                keys.append(" ".join(words[start:end]))
+    return list(dict.fromkeys(keys))
+
+
+def filter_payload(record: dict) -> dict:
+    """Payload fields for a jobs_table record that JobFilter conditions are evaluated on."""
+    low = record.get("min_salary") if record.get("min_salary") is not None else record.get("max_salary")
+    high = record.get("max_salary") if record.get("max_salary") is not None else record.get("min_salary")
+    return {
+        LOCATION_KEYS_FIELD: location_keys(record.get("clean_location"), record.get("region")),
+        WORK_TYPE_FIELD: normalize_key(record.get("work_type")),
+        WORK_ARRANGEMENT_FIELD: normalize_key(record.get("work_arrangement")),
+        COMPANY_FIELD: normalize_key(record.get("company_name")),
+        SALARY_LOW_FIELD: float(low) if low is not None else None,
+        SALARY_HIGH_FIELD: float(high) if high is not None else None,
+        SCRAPED_AT_FIELD: record.get("scraped_at"),
+    }
+
+
+def _values(value: Values) -> Tuple[str, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        value = [value]
+    return tuple(dict.fromkeys(key for key in map(normalize_key, value) if key))
+
+
+def _has_aliases(pool) -> bool:
+    return bool(pool.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_aliases'"))
+
+
+@dataclass(frozen=True)
+class JobFilter:
+    """Conditions on postings; every field is optional and they are ANDed."""
+    location: Values = None
+    work_type: Values = None
+    work_arrangement: Values = None
+    company: Values = None
+    min_salary: Optional[float] = None
+    max_salary: Optional[float] = None
+    posted_within_days: Optional[float] = None
+
+    def __post_init__(self):
+        for name in ("location", "work_type", "work_arrangement", "company"):
+            object.__setattr__(self, name, _values(getattr(self, name)))
+
+    def __bool__(self):
+        return any(getattr(self, f.name) not in (None, ()) for f in fields(self))
+
+    def cutoff(self) -> Optional[str]:
+        """Oldest scraped_at that passes posted_within_days (ISO 8601, like jobs_table)."""
+        if self.posted_within_days is None:
+            return None
+        return (datetime.now() - timedelta(days=self.posted_within_days)).isoformat()
+
+    def to_qdrant(self, canonical_ids: Sequence[int] = ()):
+        """
+        qdrant_client Filter, or None when there are no conditions. Points with
+        one of canonical_ids (see alias_canonical_ids()) pass as well.
+        """
+        if not self:
+            return None
+        from qdrant_client.http import models
+
+        must = []
+        for field_name, values in ((LOCATION_KEYS_FIELD, self.location), (WORK_TYPE_FIELD, self.work_type),
+                                   (WORK_ARRANGEMENT_FIELD, self.work_arrangement), (COMPANY_FIELD, self.company)):
+            if values:
+                must.append(models.FieldCondition(key=field_name, match=models.MatchAny(any=list(values))))
+        if self.min_salary is not None:
+            must.append(models.FieldCondition(key=SALARY_HIGH_FIELD, range=models.Range(gte=self.min_salary)))
+        if self.max_salary is not None:
+            must.append(models.FieldCondition(key=SALARY_LOW_FIELD, range=models.Range(lte=self.max_salary)))
+        if self.posted_within_days is not None:
+            must.append(models.FieldCondition(key=SCRAPED_AT_FIELD, range=models.DatetimeRange(gte=self.cutoff())))
+        if canonical_ids:
+            return models.Filter(should=[models.Filter(must=must),
+                                         models.HasIdCondition(has_id=[int(i) for i in canonical_ids])])
+        return models.Filter(must=must)
+
+    def to_sql(self) -> Tuple[str, list]:
+        """(WHERE condition on jobs_table, parameters); ("1", []) when there are no conditions."""
+        conditions, params = [], []
+        if self.location:
+            words = []
+            for name in self.location:
+                words.append("(' ' || LOWER(clean_location) || ' ' LIKE ? ESCAPE '\\' "
+                             "OR ' ' || LOWER(region) || ' ' LIKE ? ESCAPE '\\')")
+                params += [f"% {like_escape(name)} %"] * 2
+            conditions.append(f"({' OR '.join(words)})")
+        for column, values in (("work_type", self.work_type), ("work_arrangement", self.work_arrangement),
+                               ("company_name", self.company)):
+            if values:
+                conditions.append(f"LOWER({column}) IN ({', '.join('?' * len(values))})")
+                params += list(values)
+        if self.min_salary is not None:
+            conditions.append("salary_high >= ?")
+            params.append(self.min_salary)
+        if self.max_salary is not None:
+            conditions.append("salary_low <= ?")
+            params.append(self.max_salary)
+        if self.posted_within_days is not None:
+            conditions.append("scraped_at >= ?")
+            params.append(self.cutoff())
+        return (" AND ".join(conditions) or "1"), params
+
+    def matching_ids(self, db_path: str = None) -> np.ndarray:
+        """
+        Ids of the indexed postings passing the filter (int64), for the BM25 and
+        mmap indexes: matching aliases are mapped to their canonical posting.
+        """
+        where, params = self.to_sql()
+        pool = get_readonly_pool(db_path)
+        if _has_aliases(pool):
+            sql = (f"SELECT DISTINCT COALESCE(a.canonical_id, j.id) FROM {JOBS_TABLE} j "
+                   f"LEFT JOIN job_aliases a ON a.alias_id = j.id WHERE {where}")
+        else:
+            sql = f"SELECT id FROM {JOBS_TABLE} WHERE {where}"
+        return np.fromiter((row[0] for row in pool.execute(sql, params)), dtype=np.int64)
+
+    def alias_canonical_ids(self, db_path: str = None) -> list:
+        """Canonical ids of the aliases passing the filter, for to_qdrant() (aliases are not in Qdrant)."""
+        pool = get_readonly_pool(db_path)
+        if not self or not _has_aliases(pool):
+            return []
+        where, params = self.to_sql()
+        rows = pool.execute(f"SELECT DISTINCT a.canonical_id FROM {JOBS_TABLE} j "
+                            f"JOIN job_aliases a ON a.alias_id = j.id WHERE {where}", params)
+        return [row[0] for row in rows]
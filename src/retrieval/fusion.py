@@ -0,0 +1,25 @@
+"""
+Reciprocal-rank fusion of several ranked result lists.
+
+BM25 scores and cosine similarities are on unrelated scales, so hybrid
+retrieval merges the lists by rank only: each list contributes 1 / (k + rank)
+to a document's score (Cormack et al., 2009). k = 60 damps the difference
+between the first few ranks so that neither list dominates.
+"""
+
+from typing import Hashable, List, Sequence
+
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Hashable]], limit: int = None, k: int = RRF_K) -> List[Hashable]:
+    """
+    Fuses ranked lists of document keys (best first) into one list, best first.
+    Ties keep the order in which the documents were first seen.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(dict.fromkeys(ranking), start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return fused[:limit] if limit is not None else fused
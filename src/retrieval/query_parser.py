@@ -0,0 +1,269 @@
+"""
+LLM-free extraction of structured constraints from a retrieval query.
+
+The orchestrator, the advisor and the RAG tool hand retrieve_documents free
+text such as "remote data analyst jobs in Jakarta di atas 10 jt". Embedded as
+a whole, the constraints only nudge the vector, and the top-k fills up with
+postings near in meaning but in the wrong city or salary band. parse() pulls
+out
+
+  location          names from the clean_location / region vocabulary of
+                    jobs.db, plus "south jakarta" / "jaksel" style variants
+  work_type,        English and Indonesian phrases for the jobs_table values
+  work_arrangement  ("full time", "kontrak", "remote", "wfh", "hibrid")
+  min/max_salary    "10 jt", "Rp 8.000.000", "di atas 10 juta",
+                    "under 15 million", "8-12 jt" (monthly IDR)
+
+as JobFilter arguments (src/retrieval/filters.py) and returns the rest of
+the text, which is what gets embedded and BM25-searched. It is regex and
+dictionary work, well under a millisecond per query.
+
+"magang" has no work_type value: internships are listed as part-time or
+contract postings with "Intern" in the title, so it stays in the text as
+"intern".
+"""
+
+import re
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.database.jobs_db import JOBS_TABLE, db_version, get_readonly_pool, resolve_db_path
+from src.retrieval.filters import normalize_key
+
+logger = logging.getLogger(__name__)
+
+# Canonical work_type values in jobs_table and the phrases users type for them
+WORK_TYPE_SYNONYMS = {
+    "Full time": ["full time", "full-time", "fulltime", "penuh waktu", "purna waktu"],
+    "Kontrak/Temporer": ["contract", "kontrak", "temporary", "temporer"],
+    "Paruh waktu": ["part time", "part-time", "parttime", "paruh waktu"],
+    "Kasual": ["casual", "kasual", "freelance", "lepas"],
+}
+
+# work_arrangement values written by src/ingestion/normalize.py
+WORK_ARRANGEMENT_SYNONYMS = {
+    "remote": ["remote", "wfh", "work from home", "kerja dari rumah", "jarak jauh"],
+    "hybrid": ["hybrid", "hibrid"],
+    "on-site": ["on-site", "onsite", "on site", "wfo", "work from office", "kerja di kantor"],
+}
+
+# Role words rewritten to the form job titles use
+TERM_REWRITES = {"magang": "intern", "pemagangan": "intern"}
+
+# Words that qualify a place name; "Jakarta Selatan" is also searchable as "jakarta"
+_GENERIC_PLACE_WORDS = frozenset("""
+barat timur utara selatan pusat tengah raya kota kabupaten district regency
+south central north east west di baru lama
+""".split())
+_DIRECTIONS = {"selatan": "south", "utara": "north", "timur": "east", "barat": "west", "pusat": "central"}
+_ENGLISH_DIRECTIONS = {"south": "selatan", "north": "utara", "east": "timur", "west": "barat"}
+# Local shorthand -> vocabulary key; only used when the key exists in the data
+PLACE_ALIASES = {
+    "jkt": "jakarta", "jaksel": "jakarta selatan", "jakbar": "jakarta barat", "jaktim": "jakarta timur",
+    "jakut": "jakarta utara", "jakpus": "jakarta pusat", "tangsel": "south tangerang",
+    "jogja": "yogyakarta", "jogjakarta": "yogyakarta", "yogya": "yogyakarta",
+}
+# Place names that are also common words; matched only after "di" / "in" etc.
+_NEEDS_PREPOSITION = frozenset({"galang", "karang"})
+_PLACE_PREPOSITIONS = r"in|at|around|near|di|daerah|wilayah|sekitar|area|kota"
+
+_MIN_WORDS = ["di atas", "diatas", "lebih dari", "minimal", "minimum", "min", "paling sedikit", "setidaknya",
+              "at least", "above", "over", "more than", "from", "starting at", "starting from", "mulai dari", "mulai"]
+_MAX_WORDS = ["di bawah", "dibawah", "kurang dari", "maksimal", "maximum", "max", "paling banyak", "at most",
+              "below", "under", "less than", "up to", "hingga", "sampai"]
+_RANGE_WORDS = ["between", "antara"]
+_UNITS = {"jt": 1e6, "juta": 1e6, "million": 1e6, "mio": 1e6, "m": 1e6,
+          "rb": 1e3, "ribu": 1e3, "k": 1e3, "thousand": 1e3}
+# Smallest amount read as a monthly salary; "5 years" or "top 10" are not
+MIN_SALARY_AMOUNT = 100_000
+
+
+def _alternation(phrases) -> str:
+    """Longest-first regex alternation of phrases, with flexible whitespace."""
+    return "|".join(re.escape(p).replace(r"\ ", r"\s+") for p in sorted(set(phrases), key=len, reverse=True))
+
+
+def _phrase_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+_NUMBER = r"\d+(?:[.,]\d+)*"
+_UNIT = rf"(?:{_alternation(_UNITS)})\b"
+_CURRENCY = r"(?:rp\.?|idr)\s*"
+_SALARY = re.compile(
+    rf"(?:\b(?:with|dengan)\s+)?(?:\b(?:a|an)\s+)?"
+    rf"(?:\b(?P<context>salary|gaji|gajinya|pay|upah|bayaran)(?:\s+(?:of|sebesar|range|kisaran))?\s+)?"
+    rf"(?:\b(?P<bound>{_alternation(_MIN_WORDS + _MAX_WORDS + _RANGE_WORDS)})\s+)?"
+    rf"(?<![\w.,])(?P<currency>{_CURRENCY})?(?P<low>{_NUMBER})\s*(?P<low_unit>{_UNIT})?"
+    rf"(?:\s*(?:-|–|\b(?:to|sampai|hingga|s/d|sd|and|dan)\b)\s*(?:{_CURRENCY})?(?P<high>{_NUMBER})\s*(?P<high_unit>{_UNIT})?)?"
+    rf"(?:\s*(?:/\s*|\bper\s+|\ba\s+)(?:month|bulan|bln)\b|\s+(?:sebulan|perbulan)\b)?",
+    re.IGNORECASE,
+)
+_MAX_BOUNDS = frozenset(map(_phrase_key, _MAX_WORDS))
+
+_WORK_TYPES = {_phrase_key(p): v for v, phrases in WORK_TYPE_SYNONYMS.items() for p in phrases}
+_ARRANGEMENTS = {_phrase_key(p): v for v, phrases in WORK_ARRANGEMENT_SYNONYMS.items() for p in phrases}
+_WORK_PATTERN = re.compile(rf"\b(?:{_alternation(list(_WORK_TYPES) + list(_ARRANGEMENTS))})\b", re.IGNORECASE)
+_REWRITE_PATTERN = re.compile(rf"\b(?:{_alternation(TERM_REWRITES)})\b", re.IGNORECASE)
+
+# Removed spans are replaced by a marker first, so that the connectors left
+# around them ("in", "dengan", "or", ",") can be dropped as well
+_MARK = "\x00"
+_CUT = f" {_MARK} "
+_CONNECTORS = r"and|or|dan|atau|with|dengan|yang|for|untuk|in|at|di|&"
+_BEFORE_MARK = re.compile(rf"(?:\b(?:{_CONNECTORS})\b|,)\s*{_MARK}", re.IGNORECASE)
+_AFTER_MARK = re.compile(rf"{_MARK}\s*(?:\b(?:and|or|dan|atau|&)\b|,)", re.IGNORECASE)
+_EDGE_NOISE = re.compile(rf"^(?:\s|,|\b(?:{_CONNECTORS})\b)+|(?:\s|,|\b(?:{_CONNECTORS})\b)+$", re.IGNORECASE)
+
+
+def _amount(number: str, unit: Optional[str]) -> float:
+    """'10,5' + 'jt' -> 10_500_000; '8.000.000' -> 8_000_000."""
+    multiplier = _UNITS.get((unit or "").lower(), 1)
+    if multiplier > 1 and not re.fullmatch(r"\d{1,3}(?:[.,]\d{3})+", number):
+        return float(number.replace(",", ".")) * multiplier  # decimal comma or point
+    return float(re.sub(r"[.,]", "", number)) * multiplier  # thousands separators
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    """Search text with the constraints removed, and the constraints as JobFilter arguments."""
+    text: str
+    filters: dict = field(default_factory=dict)
+
+
+class QueryParser:
+    """
+    Constraint extraction against the location vocabulary of one database
+    (reloaded when the file changes). parse() never raises on a missing or
+    unreadable database; location matching is just skipped.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = resolve_db_path(db_path)
+        self._version = None
+        self._places = {}
+        self._place_pattern = None
+        self._lock = threading.Lock()
+
+    # ---------- vocabulary ----------
+
+    def _load_places(self) -> dict:
+        """{phrase: location filter key} for every place name in jobs_table."""
+        rows = get_readonly_pool(self.db_path).execute(
+            f"SELECT DISTINCT clean_location, region FROM {JOBS_TABLE}"
+        )
+        places = {}
+        for name in sorted({normalize_key(value) for row in rows for value in row} - {None}):
+            places[name] = name
+            words = name.split()
+            stem = " ".join(w for w in words if w not in _GENERIC_PLACE_WORDS)
+            if stem and stem != name:
+                places.setdefault(stem, stem)
+            # "jakarta selatan" <-> "south jakarta"
+            if len(words) == 2 and words[1] in _DIRECTIONS:
+                places.setdefault(f"{_DIRECTIONS[words[1]]} {words[0]}", name)
+            if len(words) == 2 and words[0] in _ENGLISH_DIRECTIONS:
+                places.setdefault(f"{words[1]} {_ENGLISH_DIRECTIONS[words[0]]}", name)
+        for alias, key in PLACE_ALIASES.items():
+            if key in places:
+                places.setdefault(alias, places[key])
+        return places
+
+    def _place_matcher(self):
+        try:
+            version = db_version(self.db_path)
+            with self._lock:
+                if version != self._version:
+                    self._places = self._load_places()
+                    self._place_pattern = re.compile(
+                        rf"(?:\b(?P<prep>{_PLACE_PREPOSITIONS})\s+)?\b(?P<name>{_alternation(self._places)})\b",
+                        re.IGNORECASE,
+                    ) if self._places else None
+                    self._version = version
+                return self._places, self._place_pattern
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Query parser could not load the location vocabulary: {e}")
+            return {}, None
+
+    # ---------- parsing ----------
+
+    def parse(self, query: str) -> ParsedQuery:
+        """Splits query into search text and JobFilter arguments (only the ones found)."""
+        filters = {}
+        text = query
+        places, place_pattern = self._place_matcher()
+        if place_pattern is not None:
+            locations = []
+
+            def take_place(match):
+                name = _phrase_key(match.group("name"))
+                if name in _NEEDS_PREPOSITION and not match.group("prep"):
+                    return match.group(0)
+                locations.append(places[name])
+                return _CUT
+
+            text = place_pattern.sub(take_place, text)
+            if locations:
+                filters["location"] = list(dict.fromkeys(locations))
+
+        work_types, arrangements = [], []
+
+        def take_work(match):
+            phrase = _phrase_key(match.group(0))
+            (work_types if phrase in _WORK_TYPES else arrangements).append(
+                _WORK_TYPES.get(phrase) or _ARRANGEMENTS[phrase]
+            )
+            return _CUT
+
+        text = _WORK_PATTERN.sub(take_work, text)
+        if work_types:
+            filters["work_type"] = list(dict.fromkeys(work_types))
+        if arrangements:
+            filters["work_arrangement"] = list(dict.fromkeys(arrangements))
+
+        def take_salary(match):
+            low_unit = match.group("low_unit") or (match.group("high_unit") if match.group("high") else None)
+            low = _amount(match.group("low"), low_unit)
+            qualified = low_unit or match.group("currency") or match.group("context") or low >= 1_000_000
+            if low < MIN_SALARY_AMOUNT or not qualified:
+                return match.group(0)
+            bound = _phrase_key(match.group("bound") or "")
+            if match.group("high"):
+                high = _amount(match.group("high"), match.group("high_unit") or low_unit)
+                filters["min_salary"], filters["max_salary"] = min(low, high), max(low, high)
+            elif bound in _MAX_BOUNDS:
+                filters["max_salary"] = low
+            else:
+                # "10 jt" on its own: postings that can pay at least that much
+                filters["min_salary"] = low
+            return _CUT
+
+        text = _SALARY.sub(take_salary, text)
+        text = _REWRITE_PATTERN.sub(lambda m: TERM_REWRITES[m.group(0).lower()], text)
+
+        if filters:
+            previous = None
+            while previous != text:
+                previous = text
+                text = _AFTER_MARK.sub(_MARK, _BEFORE_MARK.sub(_MARK, text))
+            text = _EDGE_NOISE.sub("", " ".join(text.replace(_MARK, " ").split()))
+        else:
+            text = " ".join(text.split())
+        # Nothing but constraints ("remote di Jakarta"): search with the whole query
+        return ParsedQuery(text=text or " ".join(query.split()), filters=filters)
+
+
+_parsers = {}
+_parsers_lock = threading.Lock()
+
+
+def get_query_parser(db_path: str = None) -> QueryParser:
+    """Process-wide parser per database."""
+    path = resolve_db_path(db_path)
+    with _parsers_lock:
+        if path not in _parsers:
+            _parsers[path] = QueryParser(path)
+        return _parsers[path]
@@ -0,0 +1,295 @@
+"""
+Memory-mapped vector index: an in-process alternative to Qdrant local mode.
+
+Without QDRANT_URL the agents fall back to QdrantClient(path=...), which
+holds a file lock (one process only, so no `uvicorn --workers N`) and
+becomes slow as the collection grows. With VECTOR_BACKEND=mmap ingestion
+instead writes the embeddings of the canonical postings to
+data/processed/vector_index:
+
+    vectors.npy        float32[n, dims]  unit-normalized embeddings
+    ids.npy            int64[n]          jobs_table.id of each row
+    centroids.npy      float32[lists, dims]  (IVF only)
+    list_offsets.npy   int64[lists+1]        rows of list i: offsets[i]:offsets[i+1]
+    index.json         dims, count, lists, model
+
+Readers np.load the arrays with mmap_mode="r": every worker process maps the
+same page-cache pages, so N workers cost one copy of the vectors. Cosine
+similarity is a dot product of unit vectors, computed for a whole block of
+rows (or a batch of queries) with one matrix multiply.
+
+Above IVF_MIN_VECTORS rows the index adds an inverted-file layer: the
+vectors are clustered with spherical k-means and stored grouped by cluster,
+and a search scores only the rows of the nprobe clusters closest to the
+query. Smaller indexes are searched exhaustively (exact results).
+"""
+
+import os
+import json
+import time
+import shutil
+import sqlite3
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.database.jobs_db import PROJECT_ROOT
+from src.retrieval.documents import count_documents, iter_documents
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(PROJECT_ROOT, "data", "processed", "vector_index")
+META_FILE = "index.json"
+BATCH_ROWS = 2048
+SEARCH_BLOCK_ROWS = 65536   # rows scored per matrix multiply (bounds temporary memory)
+IVF_MIN_VECTORS = 50_000
+DEFAULT_NPROBE = 16
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+
+
+def resolve_index_path(path: str = None) -> str:
+    """Explicit argument, VECTOR_INDEX_PATH environment variable, default location."""
+    return os.path.abspath(path or os.getenv("VECTOR_INDEX_PATH") or DEFAULT_INDEX_PATH)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k best scores of each row, best first."""
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def _assign(vectors, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (highest dot product) of each row, block by block."""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+        block = np.asarray(vectors[start:start + SEARCH_BLOCK_ROWS])
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors, lists: int, seed: int = 0) -> np.ndarray:
+    """Centroids (unit-normalized) of `lists` clusters, trained on a sample of the rows."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), lists * KMEANS_SAMPLE_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        empty = np.bincount(labels, minlength=lists) == 0
+        # Re-seed empty clusters with random sample rows
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()), replace=False)]
+        centroids = _normalize(sums).astype(np.float32)
+    return centroids
+
+
+def write_index(batches, count: int, path: str = None, lists: int = None, **meta) -> dict:
+    """
+    Writes `count` rows arriving as (ids, vectors) batches into a temporary
+    directory that is swapped into place. Vectors are normalized here.
+
+    lists: IVF clusters; None = VECTOR_INDEX_IVF_LISTS or sqrt(n) above
+    IVF_MIN_VECTORS rows, 0 = exhaustive search only. Extra keyword
+    arguments are stored in index.json.
+    Returns {"count", "dims", "lists", ..., "seconds"}.
+    """
+    path = resolve_index_path(path)
+    tmp_path, old_path = path + ".tmp", path + ".old"
+    for stale in (tmp_path, old_path):
+        shutil.rmtree(stale, ignore_errors=True)
+    os.makedirs(tmp_path)
+    unsorted_path, final_path = os.path.join(tmp_path, "unsorted.npy"), os.path.join(tmp_path, "vectors.npy")
+
+    started = time.perf_counter()
+    ids = np.empty(count, dtype=np.int64)
+    vectors = None
+    row = 0
+    try:
+        for batch_ids, batch_vectors in batches:
+            block = _normalize(np.asarray(batch_vectors, dtype=np.float32))
+            if vectors is None:
+                # Rows are written straight to disk: memory stays at one batch
+                vectors = np.lib.format.open_memmap(unsorted_path, mode="w+", dtype=np.float32,
+                                                    shape=(count, block.shape[1]))
+            vectors[row:row + len(block)] = block
+            ids[row:row + len(block)] = batch_ids
+            row += len(block)
+    except Exception:
+        del vectors
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    dims = int(vectors.shape[1]) if vectors is not None else 0
+    if lists is None:
+        lists = int(os.getenv("VECTOR_INDEX_IVF_LISTS", 0)) or (int(np.sqrt(row)) if row >= IVF_MIN_VECTORS else 0)
+    lists = min(lists, row)
+
+    if vectors is None:
+        np.save(final_path, np.empty((0, 0), dtype=np.float32))
+    elif lists:
+        centroids = spherical_kmeans(vectors, lists)
+        labels = _assign(vectors, centroids)
+        order = np.argsort(labels, kind="stable")
+        offsets = np.zeros(lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=lists), out=offsets[1:])
+        # Store the rows grouped by cluster so each probed list is one contiguous slice
+        grouped = np.lib.format.open_memmap(final_path, mode="w+", dtype=np.float32, shape=vectors.shape)
+        for start in range(0, row, SEARCH_BLOCK_ROWS):
+            grouped[start:start + SEARCH_BLOCK_ROWS] = vectors[order[start:start + SEARCH_BLOCK_ROWS]]
+        grouped.flush()
+        del grouped, vectors
+        os.remove(unsorted_path)
+        ids = ids[order]
+        np.save(os.path.join(tmp_path, "centroids.npy"), centroids)
+        np.save(os.path.join(tmp_path, "list_offsets.npy"), offsets)
+    else:
+        vectors.flush()
+        del vectors
+        os.replace(unsorted_path, final_path)
+    np.save(os.path.join(tmp_path, "ids.npy"), ids)
+
+    meta = {"count": row, "dims": dims, "lists": lists, **meta}
+    # Written last: its presence marks a complete index
+    with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    meta["seconds"] = round(time.perf_counter() - started, 2)
+    logger.info(f"Vector index: {row} vectors x {dims} dims, {lists or 'no'} IVF lists -> {path} "
+                f"({meta['seconds']:.2f}s)")
+    return meta
+
+
+def build_index(db_path: str, embed, path: str = None, lists: int = None, model: str = None) -> dict:
+    """
+    Embeds the canonical postings of db_path with `embed` (texts -> vectors,
+    e.g. EmbeddingScheduler.embed, so cached texts cost nothing) and writes
+    the index with write_index().
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        batches = (
+            ([doc_id for doc_id, _ in documents], embed([text for _, text in documents]))
+            for documents in iter_documents(conn, BATCH_ROWS)
+        )
+        return write_index(batches, count_documents(conn), path, lists, model=model, source=os.path.abspath(db_path))
+    finally:
+        conn.close()
+
+
+class MmapVectorIndex:
+    """
+    Read side of the index. Searches only read the mapped arrays, so one
+    instance can be shared by all threads of a process.
+    """
+
+    def __init__(self, path: str = None, nprobe: int = None):
+        self.path = resolve_index_path(path)
+        with open(os.path.join(self.path, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.nprobe = nprobe or int(os.getenv("VECTOR_INDEX_NPROBE", DEFAULT_NPROBE))
+        self.vectors = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+        self.ids = np.load(os.path.join(self.path, "ids.npy"), mmap_mode="r")
+        self.centroids = self.list_offsets = None
+        if self.meta.get("lists"):
+            self.centroids = np.load(os.path.join(self.path, "centroids.npy"))
+            self.list_offsets = np.load(os.path.join(self.path, "list_offsets.npy"))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _search_flat(self, queries: np.ndarray, limit: int, rows: np.ndarray = None) -> List[List[Tuple[int, float]]]:
+        """Exhaustive search over all rows, or over the given row numbers only."""
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        total = len(self.vectors) if rows is None else len(rows)
+        for start in range(0, total, SEARCH_BLOCK_ROWS):
+            if rows is None:
+                block_rows = np.arange(start, min(start + SEARCH_BLOCK_ROWS, total))
+                block = self.vectors[start:start + SEARCH_BLOCK_ROWS]
+            else:
+                block_rows = rows[start:start + SEARCH_BLOCK_ROWS]
+                block = self.vectors[block_rows]
+            scores = queries @ block.T
+            top = _top_k(scores, limit)
+            # Merge this block's best rows with the best so far
+            best_rows = np.concatenate([best_rows, block_rows[top]], axis=1)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            keep = _top_k(best_scores, limit)
+            best_rows = np.take_along_axis(best_rows, keep, axis=1)
+            best_scores = np.take_along_axis(best_scores, keep, axis=1)
+        return [
+            [(int(self.ids[r]), float(s)) for r, s in zip(rows, scores)]
+            for rows, scores in zip(best_rows, best_scores)
+        ]
+
+    def _search_ivf(self, query: np.ndarray, limit: int, nprobe: int) -> List[Tuple[int, float]]:
+        probed = _top_k((self.centroids @ query)[None, :], nprobe)[0]
+        # Each list is a contiguous slice of the mapped file: scored in place, no gather copy
+        rows, scores = [], []
+        for i in probed:
+            start, end = self.list_offsets[i], self.list_offsets[i + 1]
+            if end > start:
+                rows.append(np.arange(start, end))
+                scores.append(self.vectors[start:end] @ query)
+        if not rows:
+            return []
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        top = _top_k(scores[None, :], limit)[0]
+        return [(int(self.ids[rows[i]]), float(scores[i])) for i in top]
+
+    def search_batch(self, queries, limit: int = 10, nprobe: int = None,
+                     allowed_ids=None) -> List[List[Tuple[int, float]]]:
+        """
+        Top `limit` (jobs_table.id, cosine similarity) pairs for each query
+        vector, best first. allowed_ids (e.g. JobFilter.matching_ids())
+        restricts the search to those postings; it is then exact, IVF or not.
+        """
+        queries = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        if not len(self.ids) or limit <= 0:
+            return [[] for _ in queries]
+        if allowed_ids is not None:
+            rows = np.flatnonzero(np.isin(self.ids, allowed_ids))
+            return self._search_flat(queries, limit, rows) if len(rows) else [[] for _ in queries]
+        if self.centroids is None:
+            return self._search_flat(queries, limit)
+        nprobe = nprobe or self.nprobe
+        return [self._search_ivf(query, limit, nprobe) for query in queries]
+
+    def search(self, query, limit: int = 10, nprobe: int = None, allowed_ids=None) -> List[Tuple[int, float]]:
+        return self.search_batch([query], limit, nprobe, allowed_ids)[0]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_vector_index(path: str = None) -> Optional[MmapVectorIndex]:
+    """
+    Process-wide index per directory, reloaded when ingestion replaces it.
+    None when no index has been built.
+    """
+    path = resolve_index_path(path)
+    try:
+        version = os.stat(os.path.join(path, META_FILE)).st_mtime_ns
+    except OSError:
+        return None
+    with _indexes_lock:
+        cached = _indexes.get(path)
+        if cached is None or cached[0] != version:
+            cached = _indexes[path] = (version, MmapVectorIndex(path))
+        return cached[1]
@@ -0,0 +1,196 @@
+"""
+Bounded execution pools for running blocking agent calls off the event loop.
+
+Every agent method (LLM chains, LangGraph agents, PDF parsing) is synchronous.
+Calling them directly from an ``async def`` endpoint blocks the uvicorn event
+loop, so a single CV analysis stalls ``/health`` and every other request on
+that worker. The pools below move those calls onto dedicated thread pools,
+one per workload, so a burst of slow CV analyses cannot starve chat traffic.
+
+Pools are created per process inside the FastAPI lifespan (never at import
+time), which keeps them correct under ``uvicorn --workers N``: each worker
+process owns its own threads, queues and metrics.
+
+Sizes are configurable per pool through environment variables:
+    AGENT_POOL_<NAME>_WORKERS   max concurrent calls (threads)
+    AGENT_POOL_<NAME>_QUEUE     max calls waiting for a free thread
+"""
+
+import os
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# name -> (default workers, default queue size)
+# Chat is not pooled: it runs natively async through Orchestrator.aroute_query.
+DEFAULT_POOL_SIZES = {
+    "cv": (2, 8),
+    "cover_letter": (4, 16),
+    "interview": (4, 32),
+}
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when a pool's wait queue is full and the call is rejected."""
+
+    def __init__(self, pool_name: str, queue_depth: int):
+        super().__init__(f"Execution pool '{pool_name}' is saturated ({queue_depth} calls waiting)")
+        self.pool_name = pool_name
+        self.queue_depth = queue_depth
+
+
+class AgentExecutorPool:
+    """
+    A thread pool with a bounded wait queue and wait/run time metrics.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"agent-{name}")
+        self._lock = threading.Lock()
+
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._cancelled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs ``func(*args, **kwargs)`` on the pool and awaits its result.
+        Raises PoolSaturatedError immediately if the wait queue is full.
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise PoolSaturatedError(self.name, self._queued)
+            self._queued += 1
+
+        submitted_at = time.perf_counter()
+        # Carry contextvars (Langfuse/LangGraph callbacks rely on them) into the worker thread
+        ctx = contextvars.copy_context()
+
+        def _task():
+            started_at = time.perf_counter()
+            wait = started_at - submitted_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+
+            ok = False
+            try:
+                result = ctx.run(func, *args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._total_run += time.perf_counter() - started_at
+                    if ok:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+
+        future = self._executor.submit(_task)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Drop the call if it has not started yet; running calls cannot be interrupted
+            if future.cancel():
+                with self._lock:
+                    self._queued -= 1
+                    self._cancelled += 1
+            raise
+
+    def stats(self) -> dict:
+        """Returns a snapshot of queue depth, utilisation and wait times."""
+        with self._lock:
+            started = self._completed + self._failed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "cancelled": self._cancelled,
+                "avg_wait_ms": round(1000 * self._total_wait / started, 2) if started else 0.0,
+                "max_wait_ms": round(1000 * self._max_wait, 2),
+                "avg_run_ms": round(1000 * self._total_run / (self._completed + self._failed), 2)
+                if (self._completed + self._failed) else 0.0,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pools = {}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        logger.warning(f"Invalid value for {name}, using default {default}")
+        return default
+
+
+def init_pools(sizes: dict = None) -> dict:
+    """
+    Creates the execution pools for this worker process.
+    Safe to call more than once; existing pools are kept.
+    """
+    sizes = sizes or DEFAULT_POOL_SIZES
+    for name, (workers, queue) in sizes.items():
+        if name in _pools:
+            continue
+        prefix = f"AGENT_POOL_{name.upper()}"
+        pool = AgentExecutorPool(
+            name,
+            max_workers=_env_int(f"{prefix}_WORKERS", workers),
+            max_queue=_env_int(f"{prefix}_QUEUE", queue),
+        )
+        _pools[name] = pool
+        logger.info(f"Execution pool '{name}' ready (pid={os.getpid()}, workers={pool.max_workers}, queue={pool.max_queue})")
+    return _pools
+
+
+def get_pool(name: str) -> AgentExecutorPool:
+    if name not in _pools:
+        init_pools()
+    if name not in _pools:
+        raise KeyError(f"Unknown execution pool '{name}'")
+    return _pools[name]
+
+
+async def run_in_pool(name: str, func, *args, **kwargs):
+    """Runs a blocking callable on the named pool without blocking the event loop."""
+    return await get_pool(name).run(func, *args, **kwargs)
+
+
+def pool_stats() -> dict:
+    """Per-pool metrics for the current worker process."""
+    return {
+        "pid": os.getpid(),
+        "pools": {name: pool.stats() for name, pool in _pools.items()},
+    }
+
+
+def shutdown_pools():
+    for pool in _pools.values():
+        pool.shutdown()
+    _pools.clear()
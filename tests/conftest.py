@@ -0,0 +1,46 @@
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Distinct enough that near-duplicate folding keeps every posting
+POSTINGS = [
+    ("Data Analyst", "PT Alpha", "Bandung, Jawa Barat", "Full time", "Rp 8.000.000 – Rp 12.000.000 per month",
+     "Analyze sales dashboards with SQL and Tableau for the retail team."),
+    ("Senior Data Analyst", "PT Beta", "Bandung, Jawa Barat", "Kontrak/Temporer", "None",
+     "Lead experimentation and build forecasting models in Python for logistics."),
+    ("Data Analyst", "PT Gamma", "Jakarta Selatan, Jakarta Raya", "Full time", "Rp 10.000.000 per month",
+     "Maintain financial reporting pipelines and reconcile ledgers every month."),
+    ("Backend Engineer", "PT Delta", "Jakarta Selatan, Jakarta Raya\n(Hibrid)", "Full time",
+     "Rp 15.000.000 – Rp 20.000.000 per month", "Build Go microservices, gRPC APIs and PostgreSQL schemas."),
+    ("Marketing Executive", "PT Epsilon", "Surabaya, Jawa Timur", "Paruh waktu", "None",
+     "Plan social media campaigns and coordinate events with local partners."),
+]
+
+
+def write_dump(path, postings=POSTINGS):
+    """Writes postings as a raw JSONL dump in the scraper's format."""
+    with open(path, "w", encoding="utf-8") as f:
+        for i, (title, company, location, work_type, salary, description) in enumerate(postings):
+            f.write(json.dumps({
+                "job_title": title, "company_name": company, "location": location, "work_type": work_type,
+                "salary": salary, "job_description": description,
+                "_scrape_timestamp": f"2025-11-24T12:00:{i:02d}",
+            }) + "\n")
+
+
+@pytest.fixture(scope="session")
+def jobs_db(tmp_path_factory):
+    """A jobs.db ingested by the pipeline from POSTINGS (no Qdrant, snapshot or BM25 index)."""
+    from src.ingestion.pipeline import run_pipeline
+
+    workdir = tmp_path_factory.mktemp("jobs")
+    input_path = workdir / "jobs.jsonl"
+    write_dump(input_path)
+    db_path = str(workdir / "jobs.db")
+    run_pipeline(input_path=str(input_path), db_path=db_path, skip_qdrant=True, full=True,
+                 skip_snapshot=True, skip_bm25=True)
+    return db_path
@@ -0,0 +1,37 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+from src.agents.orchestrator import Orchestrator
+
+
+class FailingAgent:
+    async def astream(self, *args, **kwargs):
+        raise RuntimeError("model unavailable")
+        yield
+
+
+def stream_events(client, message):
+    events = []
+    with client.stream("POST", "/chat/stream", json={"message": message}) as response:
+        assert response.status_code == 200
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+
+def test_failed_agent_run_ends_stream_with_error_status(monkeypatch):
+    orchestrator = Orchestrator.__new__(Orchestrator)
+    orchestrator.agent = FailingAgent()
+    orchestrator.langfuse_handler = None
+    monkeypatch.setitem(main.agents, "orchestrator", orchestrator)
+
+    events = stream_events(TestClient(main.app), "How many Python jobs are there?")
+    assert [event for event, _ in events] == ["error", "done"]
+    assert "model unavailable" in events[0][1]["detail"]
+    assert events[-1][1] == {"status": "error"}
@@ -0,0 +1,45 @@
+from src.database.embedding_cache import EmbeddingCache
+from src.ingestion import embedding_scheduler
+from src.ingestion.embedding_scheduler import EmbeddingScheduler
+
+
+class FakeEmbeddings:
+    model = "fake"
+    dimensions = 2
+
+    def __init__(self):
+        self.calls = 0
+
+    async def aembed_documents(self, texts):
+        self.calls += 1
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_rate_limits_hold_across_embed_calls(tmp_path, monkeypatch):
+    clock, waits = [0.0], []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(embedding_scheduler.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(embedding_scheduler.asyncio, "sleep", fake_sleep)
+    embeddings = FakeEmbeddings()
+    scheduler = EmbeddingScheduler(embeddings, cache=EmbeddingCache(str(tmp_path / "cache.db")), rpm=2, tpm=10_000)
+
+    # One request per call, like the pipeline's one embed() per chunk: the third has to wait
+    for chunk in (["first chunk"], ["second chunk"], ["third chunk"]):
+        scheduler.embed(chunk)
+    assert embeddings.calls == 3
+    assert len(waits) == 1 and waits[0] > 25
+
+
+def test_cache_hits_are_not_counted_as_embedded(tmp_path):
+    embeddings = FakeEmbeddings()
+    scheduler = EmbeddingScheduler(embeddings, cache=EmbeddingCache(str(tmp_path / "cache.db")))
+    scheduler.embed(["a posting", "another posting"])
+    scheduler.embed(["a posting", "another posting", "a new posting"])
+
+    stats = scheduler.stats()
+    assert (stats["docs"], stats["cached"], stats["embedded"]) == (5, 2, 3)
+    assert stats["docs_per_sec"] == round(3 / scheduler.counters["embed_seconds"], 1)
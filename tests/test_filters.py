@@ -0,0 +1,59 @@
+import sqlite3
+
+import pytest
+
+from src.ingestion.pipeline import run_pipeline
+from src.retrieval.filters import JobFilter, filter_payload
+from tests.conftest import POSTINGS, write_dump
+
+# A Bandung opening posted again in Medan: the variant is folded into it as an alias
+DESCRIPTION = ("Own the quarterly demand forecast for our retail stores, build dashboards in Looker, "
+               "write SQL against the warehouse and present findings to the regional sales leads every week.")
+BANDUNG = ("Demand Planner", "PT Zeta", "Bandung, Jawa Barat", "Full time", "None", DESCRIPTION)
+MEDAN_VARIANT = ("Demand Planner", "PT Zeta", "Medan, Sumatera Utara", "Full time", "None", DESCRIPTION)
+
+
+@pytest.fixture(scope="module")
+def alias_db(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("aliases")
+    write_dump(workdir / "jobs.jsonl", POSTINGS + [BANDUNG, MEDAN_VARIANT])
+    db_path = str(workdir / "jobs.db")
+    run_pipeline(input_path=str(workdir / "jobs.jsonl"), db_path=db_path, skip_qdrant=True, full=True,
+                 skip_snapshot=True, skip_bm25=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        (alias_id, canonical_id), = conn.execute("SELECT alias_id, canonical_id FROM job_aliases")
+    finally:
+        conn.close()
+    return db_path, alias_id, canonical_id
+
+
+def test_matching_ids_map_aliases_to_canonical(alias_db):
+    db_path, alias_id, canonical_id = alias_db
+    assert JobFilter(location="medan").matching_ids(db_path).tolist() == [canonical_id]
+    assert canonical_id in JobFilter(location="bandung").matching_ids(db_path)
+
+
+def test_qdrant_filter_admits_canonical_of_matching_alias(alias_db):
+    from qdrant_client import QdrantClient
+    from qdrant_client.http import models
+
+    db_path, alias_id, canonical_id = alias_db
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        records = [dict(r) for r in conn.execute(
+            "SELECT * FROM jobs_table WHERE id NOT IN (SELECT alias_id FROM job_aliases)")]
+    finally:
+        conn.close()
+
+    client = QdrantClient(":memory:")
+    client.create_collection("jobs", vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE))
+    client.upsert("jobs", [models.PointStruct(id=r["id"], vector=[1.0, 0.0], payload=filter_payload(r))
+                           for r in records])
+
+    job_filter = JobFilter(location="medan")
+    assert client.query_points("jobs", query=[1.0, 0.0], query_filter=job_filter.to_qdrant()).points == []
+    query_filter = job_filter.to_qdrant(canonical_ids=job_filter.alias_canonical_ids(db_path))
+    points = client.query_points("jobs", query=[1.0, 0.0], query_filter=query_filter).points
+    assert [p.id for p in points] == [canonical_id]
@@ -0,0 +1,78 @@
+import logging
+import sqlite3
+
+import pytest
+
+from src.ingestion import pipeline
+from tests.conftest import POSTINGS, write_dump
+
+
+class FakeScheduler:
+    def stats(self):
+        return {"docs_per_sec": 0.0}
+
+
+class FakeQdrantSink:
+    """Collects written records; finish() fails like a rejected wait=False upload when fail=True."""
+    fail = False
+    written = []
+
+    def __init__(self, *args, **kwargs):
+        self.scheduler = FakeScheduler()
+
+    def write(self, records):
+        FakeQdrantSink.written += [r["id"] for r in records]
+
+    def delete(self, ids):
+        pass
+
+    def finish(self):
+        if FakeQdrantSink.fail:
+            raise RuntimeError("upload failed")
+
+    def abort(self):
+        pass
+
+
+def content_hashes(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute("SELECT id, content_hash FROM jobs_table"))
+    finally:
+        conn.close()
+
+
+def test_failed_vector_flush_keeps_sqlite_unchanged(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "QdrantSink", FakeQdrantSink)
+    db_path = str(tmp_path / "jobs.db")
+    dump = tmp_path / "jobs.jsonl"
+    options = dict(input_path=str(dump), db_path=db_path, skip_snapshot=True, skip_bm25=True, vector_backend="qdrant")
+
+    write_dump(dump)
+    pipeline.run_pipeline(full=True, **options)
+    before = content_hashes(db_path)
+
+    edited = list(POSTINGS)
+    edited[0] = edited[0][:5] + (edited[0][5] + " Now also owns the marketing attribution model.",)
+    write_dump(dump, edited)
+    FakeQdrantSink.fail = True
+    with pytest.raises(RuntimeError):
+        pipeline.run_pipeline(**options)
+    assert content_hashes(db_path) == before
+
+    # The next run still sees the posting as changed and embeds it again
+    FakeQdrantSink.fail = False
+    FakeQdrantSink.written = []
+    stats = pipeline.run_pipeline(**options)
+    assert stats["changed"] == 1
+    assert len(FakeQdrantSink.written) == 1
+
+
+def test_summary_log_matches_returned_embedded_count(tmp_path, caplog):
+    dump = tmp_path / "jobs.jsonl"
+    write_dump(dump)
+    with caplog.at_level(logging.INFO, logger=pipeline.logger.name):
+        stats = pipeline.run_pipeline(input_path=str(dump), db_path=str(tmp_path / "jobs.db"), skip_qdrant=True,
+                                      full=True, skip_snapshot=True, skip_bm25=True)
+    assert stats["embedded"] == 0
+    assert "Ingestion finished: 5 rows, 0 embedded" in caplog.text
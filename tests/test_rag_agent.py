@@ -0,0 +1,30 @@
+import asyncio
+import threading
+
+from src.agents.rag_agent import RAGAgent
+from src.retrieval.filters import JobFilter
+
+
+class EmptyIndex:
+    def search(self, query, limit, allowed_ids=None):
+        return []
+
+
+def test_async_retrieval_plans_and_parses_off_the_event_loop(monkeypatch):
+    threads = {}
+
+    def plan(query, mode):
+        threads["plan"] = threading.current_thread()
+        return "lexical", EmptyIndex()
+
+    def understand(query, filters, parse_query):
+        threads["understand"] = threading.current_thread()
+        return query, JobFilter(), False
+
+    agent = RAGAgent.__new__(RAGAgent)
+    monkeypatch.setattr(agent, "_plan", plan)
+    monkeypatch.setattr(agent, "_understand", understand)
+
+    assert asyncio.run(agent.aretrieve_documents("data analyst di Bandung")) == []
+    assert set(threads) == {"plan", "understand"}
+    assert all(thread is not threading.main_thread() for thread in threads.values())
@@ -0,0 +1,26 @@
+import pytest
+
+from src.database.semantic_cache import SemanticSQLCache, literals_match
+
+SQL = "SELECT COUNT(*) FROM jobs_table WHERE job_title LIKE '%data analyst%'"
+
+
+@pytest.mark.parametrize("question, entities, reusable", [
+    ("how many data analyst jobs are there", [], True),
+    ("what's the number of data analyst jobs", [], True),
+    # A location or a quoted company the cached SQL does not filter on
+    ("how many data analyst jobs in Bandung", ["bandung"], False),
+    ('how many data analyst jobs at "PT Alpha"', [], False),
+    ("how many java developer jobs", [], False),
+])
+def test_literals_match(question, entities, reusable):
+    assert literals_match(question, SQL, entities) is reusable
+
+
+def test_lookup_rejects_question_with_extra_location(tmp_path):
+    cache = SemanticSQLCache(path=str(tmp_path / "semantic.db"))
+    cache.store("how many data analyst jobs", [1.0, 0.0], SQL)
+
+    assert cache.lookup("how many data analyst jobs in Bandung", [1.0, 0.0], ["bandung"]) is None
+    assert cache.lookup("number of data analyst jobs", [1.0, 0.0])["sql"] == SQL
+    assert cache.stats()["rejected_by_literal_check"] == 1
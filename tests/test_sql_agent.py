@@ -0,0 +1,52 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from src.agents.sql_agent import SQLAgent
+
+
+@pytest.fixture
+def sql_agent(jobs_db, tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("SQL_SEMANTIC_CACHE_PATH", str(tmp_path / "semantic_sql_cache.db"))
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "embedding_cache.db"))
+    return SQLAgent(jobs_db)
+
+
+def test_stats_after_fast_path_answer(sql_agent):
+    assert sql_agent.run("Berapa lowongan di Bandung?") == "Terdapat 2 lowongan di Bandung di database."
+    stats = sql_agent.stats()
+    assert stats["fast_path"]["hits"] == 1
+    assert stats["fast_path"]["intent_hits"] == {"count_jobs": 1}
+
+
+def test_arun_answers_fast_path_off_the_event_loop(sql_agent, monkeypatch):
+    threads = []
+    try_answer = sql_agent.fast_path.try_answer
+
+    def recording_try_answer(question):
+        threads.append(threading.current_thread())
+        return try_answer(question)
+
+    monkeypatch.setattr(sql_agent.fast_path, "try_answer", recording_try_answer)
+    answer = asyncio.run(sql_agent.arun("Berapa lowongan di Bandung?"))
+    assert answer == "Terdapat 2 lowongan di Bandung di database."
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_semantic_cache_needs_the_question_locations_in_the_sql(sql_agent):
+    sql = "SELECT COUNT(*) FROM jobs_table WHERE job_title LIKE '%data analyst%'"
+    sql_agent.semantic_cache.store("how many data analyst jobs", [1.0, 0.0], sql)
+    assert sql_agent._cache_lookup("how many data analyst jobs in Bandung", [1.0, 0.0]) is None
+    assert sql_agent._cache_lookup("number of data analyst jobs", [1.0, 0.0])["sql"] == sql
+
+
+def test_sql_metrics_endpoint(sql_agent, monkeypatch):
+    monkeypatch.setitem(main.agents, "orchestrator", SimpleNamespace(sql_agent=sql_agent))
+    response = TestClient(main.app).get("/metrics/sql")
+    assert response.status_code == 200
+    assert response.json()["fast_path"]["hits"] == 0
@@ -0,0 +1,73 @@
+import pytest
+
+from src.agents.sql_intents import SQLFastPath
+from src.database.job_stats import get_job_stats
+
+
+@pytest.fixture
+def fast_path(jobs_db):
+    return SQLFastPath(jobs_db)
+
+
+@pytest.mark.parametrize("question, keyword, location", [
+    # keyword only
+    ("how many data analyst jobs are there", "data analyst", None),
+    ("berapa lowongan data analyst", "data analyst", None),
+    # location only
+    ("How many jobs are there in Bandung?", None, "bandung"),
+    ("Berapa lowongan di Bandung?", None, "bandung"),
+    ("berapa lowongan di Jakarta Selatan", None, "jakarta selatan"),
+    ("jumlah lowongan yang ada di bandung", None, "bandung"),
+    ("ada berapa lowongan untuk wilayah surabaya", None, "surabaya"),
+    # keyword + location
+    ("how many data analyst jobs in jakarta selatan", "data analyst", "jakarta selatan"),
+    ("berapa lowongan data analyst di Bandung", "data analyst", "bandung"),
+])
+def test_count_jobs_matching(fast_path, question, keyword, location):
+    match = fast_path.match(question)
+    assert match["intent"] == "count_jobs"
+    assert (match["keyword"], match["location"]) == (keyword, location)
+
+
+@pytest.mark.parametrize("question, answer", [
+    ("Berapa lowongan di Bandung?", "Terdapat 2 lowongan di Bandung di database."),
+    ("berapa lowongan di Jakarta Selatan", "Terdapat 2 lowongan di Jakarta Selatan di database."),
+    ("berapa lowongan data analyst di Bandung", "Terdapat 2 lowongan 'data analyst' di Bandung di database."),
+    ("How many jobs are there in Bandung?", "There are 2 job postings in Bandung in the database."),
+])
+def test_count_jobs_answers(fast_path, question, answer):
+    assert fast_path.try_answer(question) == answer
+
+
+@pytest.mark.parametrize("question", [
+    "berapa lowongan di Medan",
+    # Fragments of known locations are not locations
+    "how many roles are there for me",
+    "jobs in a",
+    "how many jobs in ban",
+    # Stop-words and very short keywords
+    "how many new jobs are there",
+    "how many it jobs",
+    "how many c++ jobs",
+])
+def test_vague_questions_fall_back(fast_path, question):
+    assert fast_path.match(question) is None
+
+
+@pytest.mark.parametrize("question, answer", [
+    # Whole title words only: "market" is not "Marketing"
+    ("how many market jobs", "There are 0 'market' job postings in the database."),
+    ("how many analyst jobs", "There are 3 'analyst' job postings in the database."),
+    ("how many engineer jobs in jakarta", "There is 1 'engineer' job posting in Jakarta in the database."),
+    ("how many jobs in selatan", "There are 2 job postings in Selatan in the database."),
+])
+def test_whole_word_matching(fast_path, question, answer):
+    assert fast_path.try_answer(question) == answer
+
+
+def test_title_salary_states_exact_title_scope(jobs_db):
+    fast_path = SQLFastPath(jobs_db, job_stats=get_job_stats(jobs_db))
+    assert fast_path.try_answer("what is the salary for data analyst").startswith(
+        "Salary for postings titled exactly 'Data Analyst' (related titles not included): Rp 8.000.000 – Rp 12.000.000")
+    assert fast_path.try_answer("berapa gaji data analyst").startswith(
+        "Gaji untuk lowongan dengan judul persis 'Data Analyst' (judul terkait tidak termasuk): ")